@@ -0,0 +1,208 @@
+"""Benchmarks des chemins critiques (chargement, filtrage, indicateurs,
+statistiques, figures, analyse) sur des exports synthétiques de 1k à 10M lignes.
+
+Chaque étape est chronométrée isolément (meilleur de plusieurs répétitions),
+puis rejouée une fois sous tracemalloc pour mesurer son pic mémoire. Les
+résultats sont comparés aux références de benchmarks/baselines.json enregistrées
+sur la même machine (processeur, nombre de CPU, version de Python) ; sur une
+autre machine, aucune comparaison n'est faite.
+
+    python -m benchmarks.bench                     # tailles 1k et 100k
+    python -m benchmarks.bench --sizes 1k,1m,10m --stages load,filter
+    python -m benchmarks.bench --save-baseline     # enregistre les références
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_csv
+from dataviz import analysis, chunked, data, figures, indicators, levels, rollups
+from dataviz.range_stats import RangeStats
+
+WORK_DIR = Path(".cache") / "bench"
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+# Ralentissement toléré par rapport à la référence, et écart minimal signalé
+THRESHOLD = 0.25
+NOISE_FLOOR = 0.002
+
+STATS_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover']
+
+
+# Contexte partagé par les étapes d'une taille : chemins et données déjà chargées
+class Context:
+    def __init__(self, n, work_dir):
+        self.n = n
+        self.csv = synthetic_csv(n, work_dir)
+        self.work_dir = self.csv.parent / str(n)
+        self.cache = self.work_dir / "cache"
+        rollups.sync_rollups(self.cache, data.sync_cache(self.csv, self.cache))
+        self.df = data.read_columns(self.cache)
+        self.frame = self.df.assign(**indicators.compute(self.df['Close']))
+        dates = self.df['Date'].to_numpy()
+        self.start = dates[len(dates) // 4].astype('datetime64[D]')
+        self.end = dates[3 * len(dates) // 4].astype('datetime64[D]')
+        self.range_stats = RangeStats(self.df, STATS_COLUMNS)
+
+        # Export de la veille (sans la ligne la plus récente) et son cache, pour l'ajout incrémental
+        self.prev_csv = self.work_dir / "prev.csv"
+        self.prev_cache = self.work_dir / "prev_cache"
+        if not self.prev_csv.exists():
+            with open(self.csv, 'rb') as src, open(self.prev_csv, 'wb') as dst:
+                dst.write(src.readline())
+                src.readline()
+                shutil.copyfileobj(src, dst)
+        data.sync_cache(self.prev_csv, self.prev_cache)
+
+
+# Étapes : (préparation non chronométrée, fonction mesurée)
+def _fresh_dir(ctx):
+    path = ctx.work_dir / "ingest"
+    shutil.rmtree(path, ignore_errors=True)
+    return path
+
+
+def _append_setup(ctx):
+    path = ctx.work_dir / "append"
+    shutil.rmtree(path, ignore_errors=True)
+    shutil.copytree(ctx.prev_cache, path)
+    return path
+
+
+def _rollups_setup(ctx):
+    shutil.rmtree(rollups.rollup_dir(ctx.cache), ignore_errors=True)
+    return data.read_meta(ctx.cache)
+
+
+def _legacy_filter(ctx):
+    day = ctx.df['Date'].dt.date
+    start, end = ctx.start.item(), ctx.end.item()
+    return ctx.df[(day >= start) & (day <= end)]
+
+
+STAGES = {
+    'parse': (None, lambda ctx, _: data.parse_csv(ctx.csv)),
+    'ingest': (_fresh_dir, lambda ctx, path: data.sync_cache(ctx.csv, path)),
+    'append': (_append_setup, lambda ctx, path: data.sync_cache(ctx.csv, path)),
+    'load': (None, lambda ctx, _: float(data.read_columns(ctx.cache)['Close'].sum())),
+    'filter': (None, lambda ctx, _: data.date_slice(ctx.df, ctx.start, ctx.end)),
+    'filter_legacy': (None, lambda ctx, _: _legacy_filter(ctx)),
+    'indicators': (None, lambda ctx, _: indicators.compute(ctx.df['Close'])),
+    'range_stats_build': (None, lambda ctx, _: RangeStats(ctx.df, STATS_COLUMNS)),
+    'range_stats_query': (None, lambda ctx, _: ctx.range_stats.summary(STATS_COLUMNS, ctx.n // 4, 3 * ctx.n // 4)),
+    'chunked_stats': (None, lambda ctx, _: chunked.summary(ctx.cache, STATS_COLUMNS, ctx.n // 4, 3 * ctx.n // 4)),
+    'rollups_build': (_rollups_setup, lambda ctx, meta: rollups.sync_rollups(ctx.cache, meta)),
+    'rollup_stats': (None, lambda ctx, _: rollups.summary(ctx.cache, STATS_COLUMNS, ctx.n // 4, 3 * ctx.n // 4)),
+    'figures': (None, lambda ctx, _: (figures.price_figure(ctx.frame, 'SYNTH'), figures.vwap_figure(ctx.frame))),
+    'analyze': (None, lambda ctx, _: analysis.analyze(ctx.frame)),
+    'levels': (None, lambda ctx, _: levels.detect_levels(ctx.df)),
+}
+
+
+def measure(ctx, stage, repeat):
+    setup, func = STAGES[stage]
+    times = []
+    for _ in range(repeat):
+        arg = setup(ctx) if setup else None
+        t0 = time.perf_counter()
+        func(ctx, arg)
+        times.append(time.perf_counter() - t0)
+
+    arg = setup(ctx) if setup else None
+    tracemalloc.start()
+    func(ctx, arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_bytes': peak}
+
+
+# Description de la machine, clé des références dans baselines.json
+def machine_id():
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    return (f"{platform.system()} {platform.machine()}, {cpu or 'processeur inconnu'}, "
+            f"{os.cpu_count()} CPU, Python {platform.python_version()}")
+
+
+# Références de toutes les machines : {machine: {étape: résultat}}
+def load_baselines(path=BASELINE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Étapes plus lentes que la référence au-delà du seuil
+def regressions(results, baselines, threshold=THRESHOLD):
+    found = []
+    for key, result in results.items():
+        ref = baselines.get(key)
+        if ref is None:
+            continue
+        if result['seconds'] > ref['seconds'] * (1 + threshold) and result['seconds'] - ref['seconds'] > NOISE_FLOOR:
+            found.append((key, ref['seconds'], result['seconds']))
+    return found
+
+
+def _fmt_bytes(n):
+    for unit in ('o', 'Ko', 'Mo', 'Go'):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} To"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques du dashboard")
+    parser.add_argument('--sizes', default='1k,100k', help="tailles parmi " + ','.join(SIZES))
+    parser.add_argument('--stages', default=','.join(STAGES), help="étapes parmi " + ','.join(STAGES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="enregistre les résultats comme références")
+    args = parser.parse_args(argv)
+
+    machine = machine_id()
+    all_baselines = load_baselines(args.baseline)
+    baselines = all_baselines.get(machine, {})
+    if not baselines and not args.save_baseline:
+        print(f"Aucune référence pour cette machine ({machine}) : pas de comparaison")
+    results = {}
+    for size in args.sizes.split(','):
+        ctx = Context(SIZES[size], args.work_dir)
+        for stage in args.stages.split(','):
+            key = f"{size}/{stage}"
+            results[key] = measure(ctx, stage, args.repeat)
+            ref = baselines.get(key)
+            ratio = f"x{results[key]['seconds'] / ref['seconds']:.2f}" if ref else "-"
+            print(f"{key:<26} {results[key]['seconds'] * 1000:>10.2f} ms  "
+                  f"pic {_fmt_bytes(results[key]['peak_bytes']):>10}  réf {ratio}")
+        # Les caches de 1M/10M lignes occupent plusieurs centaines de Mo
+        del ctx
+
+    if args.save_baseline:
+        all_baselines[machine] = dict(baselines, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(all_baselines, f, indent=2, sort_keys=True)
+        return 0
+
+    found = regressions(results, baselines, args.threshold)
+    for key, ref, current in found:
+        print(f"RÉGRESSION {key} : {ref * 1000:.2f} ms -> {current * 1000:.2f} ms")
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
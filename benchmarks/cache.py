@@ -0,0 +1,61 @@
+"""Sessions concurrentes sur quelques périodes communes : statistiques de période
+(chunked.summary) recalculées à chaque requête, servies par un cache à la
+st.cache_data (copie par sérialisation à chaque lecture) ou par le cache
+partagé du processus (dataviz.cache, sans copie).
+
+    python -m benchmarks.cache
+    python -m benchmarks.cache --size 1m --sessions 200 --ranges 5 --threads 16
+"""
+import argparse
+import pickle
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench import SIZES, STATS_COLUMNS, WORK_DIR, Context
+from dataviz import chunked
+from dataviz.cache import SharedCache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache partagé et sessions concurrentes")
+    parser.add_argument('--size', default='1m', help="taille parmi " + ','.join(SIZES))
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--ranges', type=int, default=5, help="nombre de périodes distinctes demandées")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    args = parser.parse_args(argv)
+
+    ctx = Context(SIZES[args.size], args.work_dir)
+    n = ctx.n
+    ranges = [(i * n // (2 * args.ranges), n - i * n // (2 * args.ranges)) for i in range(args.ranges)]
+    requests = [ranges[i % len(ranges)] for i in range(args.sessions)]
+
+    def compute(lo, hi):
+        return chunked.summary(ctx.cache, STATS_COLUMNS, lo, hi)
+
+    pickled = {}
+
+    def copied(lo, hi):
+        if (lo, hi) not in pickled:
+            pickled[(lo, hi)] = pickle.dumps(compute(lo, hi))
+        return pickle.loads(pickled[(lo, hi)])
+
+    shared = SharedCache()
+
+    def from_shared(lo, hi):
+        return shared.get('range_summary', 'SYNTH', 'v', (lo, hi), lambda: compute(lo, hi))
+
+    print(f"{args.sessions} requêtes sur {args.ranges} périodes, {args.threads} threads, {n} lignes")
+    for label, func in (('sans cache', compute), ('copie (cache_data)', copied), ('cache partagé', from_shared)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(lambda r: func(*r), requests))
+        print(f"{label:<20} {time.perf_counter() - start:8.3f}s")
+    stats = shared.stats()
+    print(f"cache partagé : {stats['hits']} hits, {stats['misses']} misses, {stats['bytes']} octets")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
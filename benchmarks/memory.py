@@ -0,0 +1,53 @@
+"""Mémoire occupée par titre selon le profil de stockage (full / compact) :
+colonnes de prix et indicateurs tels que chargés par les pages
+(PriceStore.analysis_frame), sur l'export réel et des exports synthétiques.
+
+    python -m benchmarks.memory
+    python -m benchmarks.memory --sizes 1k,1m --real ''
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.bench import SIZES, WORK_DIR, _fmt_bytes
+from benchmarks.synthetic import synthetic_csv
+from dataviz.data import STORAGE_PROFILES
+from dataviz.settings import DATA_DIR
+from dataviz.store import CSV_SUFFIX, PriceStore
+
+
+# Octets des colonnes d'un titre, prix et indicateurs
+def symbol_bytes(store, symbol):
+    frame = store.analysis_frame(symbol)
+    return int(frame.memory_usage(index=False).sum()), len(frame)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire par titre selon le profil de stockage")
+    parser.add_argument('--sizes', default='1k,100k,1m', help="tailles synthétiques parmi " + ','.join(SIZES))
+    parser.add_argument('--real', default='BOUYGUES', help="titres réels (exports de --data), séparés par des virgules")
+    parser.add_argument('--data', default=DATA_DIR)
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir) / "memory"
+    sources = [(Path(args.data), symbol) for symbol in args.real.split(',') if symbol]
+    for size in filter(None, args.sizes.split(',')):
+        csv = synthetic_csv(SIZES[size], work_dir / "sources")
+        sources.append((csv.parent, csv.name[:-len(CSV_SUFFIX)]))
+
+    profiles = list(STORAGE_PROFILES)
+    print(f"{'titre':<14} {'lignes':>10} " + " ".join(f"{p:>12}" for p in profiles) + "   octets/ligne   gain")
+    for source_dir, symbol in sources:
+        sizes = {}
+        for profile in profiles:
+            store = PriceStore(work_dir / profile, source_dir, profile)
+            sizes[profile], rows = symbol_bytes(store, symbol)
+        per_row = " -> ".join(f"{sizes[p] / max(rows, 1):.0f}" for p in profiles)
+        print(f"{symbol:<14} {rows:>10} " + " ".join(f"{_fmt_bytes(sizes[p]):>12}" for p in profiles)
+              + f"   {per_row:>12}   {1 - sizes[profiles[-1]] / sizes[profiles[0]]:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
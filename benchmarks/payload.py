@@ -0,0 +1,95 @@
+"""Taille des graphiques envoyés au navigateur (JSON produit par plotly pour
+st.plotly_chart) selon le mode de rendu : 'svg' (dates ISO, Scatter) ou 'auto'
+(dates et valeurs en tableaux binaires base64, Scattergl au-delà du seuil).
+
+Graphiques mesurés : prix/volume et VWAP du dashboard, volatilité et moyennes
+mobiles de la page Analyses (séries complètes).
+
+Avec --html, une page par graphique et par mode est écrite ; ouverte dans un
+navigateur, elle affiche le temps du premier rendu et celui d'un redessin
+(zoom sur la moitié de la période), mesurés par plotly_afterplot.
+
+    python -m benchmarks.payload
+    python -m benchmarks.payload --sizes 1k,100k --html .cache/bench/payload
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from benchmarks.bench import SIZES, _fmt_bytes
+from benchmarks.synthetic import synthetic_prices
+from dataviz import figures, indicators
+
+MODES = ('svg', 'auto')
+
+# Mesure du rendu dans le navigateur : premier tracé puis zoom
+TIMING_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var first = performance.now();
+var range = gd.layout.xaxis.range || gd._fullLayout.xaxis.range;
+var mid = (gd._fullLayout.xaxis.r2l(range[0]) + gd._fullLayout.xaxis.r2l(range[1])) / 2;
+var t0 = performance.now();
+Plotly.relayout(gd, {'xaxis.range': [gd._fullLayout.xaxis.l2r(mid), range[1]]}).then(function() {
+    var msg = 'premier rendu ' + first.toFixed(0) + ' ms, zoom ' + (performance.now() - t0).toFixed(0) + ' ms';
+    document.title = msg;
+    document.body.insertAdjacentHTML('afterbegin', '<pre>' + msg + '</pre>');
+});
+"""
+
+
+def volatility_figure(df):
+    fig = go.Figure(figures.line_trace(df['Date'], df['Daily_Return'], mode='lines', name='Rendements Journaliers'))
+    return figures.date_axes(fig)
+
+
+def ma_figure(df):
+    fig = go.Figure()
+    for column in ('Close', 'MA20', 'MA50'):
+        fig.add_trace(figures.line_trace(df['Date'], df[column], name=column))
+    return figures.date_axes(fig)
+
+
+CHARTS = {
+    'prix': lambda df: figures.price_figure(df, 'SYNTH'),
+    'vwap': figures.vwap_figure,
+    'volatilite': volatility_figure,
+    'moyennes': ma_figure,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Taille des graphiques selon le mode de rendu")
+    parser.add_argument('--sizes', default='1k,100k,1m', help="tailles parmi " + ','.join(SIZES))
+    parser.add_argument('--html', default=None, help="répertoire des pages de mesure du rendu")
+    args = parser.parse_args(argv)
+
+    print(f"{'graphique':<20} " + " ".join(f"{m:>12} {'json ' + m:>10}" for m in MODES) + "   gain")
+    for size in args.sizes.split(','):
+        df = synthetic_prices(SIZES[size])
+        df = df.assign(**indicators.compute(df['Close']))
+        for name, build in CHARTS.items():
+            sizes = {}
+            cells = []
+            for mode in MODES:
+                figures.CHART_MODE = mode
+                fig = build(df)
+                start = time.perf_counter()
+                payload = pio.to_json(fig, validate=False)
+                elapsed = time.perf_counter() - start
+                sizes[mode] = len(payload)
+                cells.append(f"{_fmt_bytes(len(payload)):>12} {elapsed * 1000:>7.0f} ms")
+                if args.html:
+                    path = Path(args.html) / f"{size}_{name}_{mode}.html"
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fig.write_html(path, include_plotlyjs='cdn', post_script=TIMING_SCRIPT)
+            print(f"{size + '/' + name:<20} " + " ".join(cells)
+                  + f"   {1 - sizes['auto'] / sizes['svg']:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
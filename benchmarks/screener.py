@@ -0,0 +1,36 @@
+"""Temps de classement de l'univers (dataviz.screener.rank) sur des univers
+synthétiques déjà chargés en mémoire.
+
+    python -m benchmarks.screener
+    python -m benchmarks.screener --universes 500x2520,5000x2520 --repeat 5
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.bench import _fmt_bytes
+from benchmarks.synthetic import synthetic_universe
+from dataviz.screener import rank
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps de classement de l'univers")
+    parser.add_argument('--universes', default='500x2520,5000x2520', help="tailles titresxséances, séparées par des virgules")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'univers':<14} {'mémoire':>10} {'classement':>12}")
+    for size in args.universes.split(','):
+        symbols, days = (int(x) for x in size.split('x'))
+        universe = synthetic_universe(symbols, days)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rank(universe)
+            timings.append(time.perf_counter() - start)
+        print(f"{size:<14} {_fmt_bytes(universe.nbytes):>10} {min(timings) * 1000:>9.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
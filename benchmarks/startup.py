@@ -0,0 +1,104 @@
+"""Démarrage à froid des pages : temps d'import des modules, délai avant le
+premier élément envoyé au navigateur (first paint) et durée d'exécution
+complète, puis durée d'une réexécution (retour sur la page).
+
+Chaque page est mesurée dans un processus neuf (python -X importtime), avec le
+moteur de test de Streamlit (AppTest) ; l'import de Streamlit lui-même n'est
+pas compté.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --pages pages/Entreprise.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PAGES = ['dashboard.py', 'pages/Statistiques.py', 'pages/Analyses.py', 'pages/Entreprise.py']
+SENTINEL = "--- page run ---"
+
+
+# Exécuté dans le processus mesuré : une exécution à froid puis une réexécution
+def _worker(page):
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    from streamlit.testing.v1 import AppTest
+
+    first_delta = []
+    enqueue = ScriptRunContext.enqueue
+
+    def timed_enqueue(self, msg):
+        if not first_delta and msg.HasField('delta'):
+            first_delta.append(time.perf_counter())
+        return enqueue(self, msg)
+
+    ScriptRunContext.enqueue = timed_enqueue
+    at = AppTest.from_file(os.path.abspath(page), default_timeout=300)
+
+    print(SENTINEL, file=sys.stderr, flush=True)
+    cold_start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - cold_start
+    print(SENTINEL, file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    at.run()
+    warm = time.perf_counter() - start
+
+    if at.exception:
+        raise RuntimeError([e.message for e in at.exception])
+    print(json.dumps({
+        'first_paint': first_delta[0] - cold_start if first_delta else None,
+        'cold': cold,
+        'warm': warm,
+    }))
+
+
+# Somme des temps propres (self) des imports réalisés pendant l'exécution à froid
+def _import_seconds(stderr):
+    total = 0
+    inside = False
+    for line in stderr.splitlines():
+        if line.startswith(SENTINEL):
+            inside = not inside
+        elif inside and line.startswith('import time:'):
+            field = line.split(':', 1)[1].split('|')[0].strip()
+            if field.isdigit():
+                total += int(field)
+    return total / 1e6
+
+
+def measure(page):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.startup', '--worker', page],
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['imports'] = _import_seconds(proc.stderr)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps de démarrage à froid des pages")
+    parser.add_argument('--pages', default=','.join(PAGES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker)
+        return 0
+
+    print(f"{'page':<24} {'imports':>10} {'1er rendu':>10} {'froid':>10} {'rechargement':>13}")
+    for page in args.pages.split(','):
+        runs = [measure(page) for _ in range(args.repeat)]
+        med = {key: statistics.median(r[key] for r in runs) for key in ('imports', 'first_paint', 'cold', 'warm')}
+        print(f"{page:<24} {med['imports'] * 1000:>8.0f}ms {med['first_paint'] * 1000:>8.0f}ms "
+              f"{med['cold'] * 1000:>8.0f}ms {med['warm'] * 1000:>11.0f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Génération de cours OHLCV synthétiques au format de l'export
+(séparateur ';', virgule décimale, lignes les plus récentes en tête)."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz.data import COLUMNS
+
+START = np.datetime64('1900-01-01')
+# Nombre de jours calendaires utilisables (jusqu'en 2091) : au-delà, les lignes
+# sont des barres d'une minute, de SESSION_OPEN à SESSION_OPEN + SESSION_MINUTES
+MAX_DAYS = 70_000
+SESSION_OPEN = np.timedelta64(9 * 60, 'm')
+SESSION_MINUTES = 510
+# Version du générateur : les exports déjà écrits par une version précédente
+# (autre répertoire) ne sont pas réutilisés
+GENERATOR_VERSION = 2
+
+
+# Dates strictement croissantes de n lignes : une séance par jour, ou une barre
+# par minute de séance si n dépasse MAX_DAYS
+def synthetic_dates(n):
+    if n <= MAX_DAYS:
+        return START + np.arange(n).astype('timedelta64[D]')
+    days, minutes = np.divmod(np.arange(n), SESSION_MINUTES)
+    return START + days.astype('timedelta64[D]') + SESSION_OPEN + minutes.astype('timedelta64[m]')
+
+
+def synthetic_prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = synthetic_dates(n).astype('datetime64[ns]')
+
+    close = np.round(40 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), 2)
+    open_ = np.round(close * (1 + rng.normal(0, 0.004, n)), 2)
+    high = np.round(np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n)), 2)
+    low = np.round(np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n)), 2)
+    shares = rng.integers(100_000, 1_000_000, n)
+    trades = rng.integers(1_000, 5_000, n)
+    vwap = np.round((high + low + close) / 3, 4)
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Last': close,
+        'Close': close,
+        'Number of Shares': shares,
+        'Number of Trades': trades,
+        'Turnover': np.round(shares * vwap).astype(np.int64),
+        'vwap': vwap,
+    }, columns=COLUMNS)
+
+
+# Écrit (une seule fois) un export synthétique de n lignes et renvoie son chemin
+def synthetic_csv(n, directory, seed=0):
+    path = Path(directory) / f"v{GENERATOR_VERSION}" / f"SYNTH{n}_historical_price.csv"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df = synthetic_prices(n, seed).iloc[::-1]
+        tmp = path.with_name(path.name + '.tmp')
+        date_format = '%Y-%m-%d' if n <= MAX_DAYS else '%Y-%m-%d %H:%M'
+        df.to_csv(tmp, sep=';', decimal=',', index=False, date_format=date_format)
+        tmp.replace(path)
+    return path
+
+
+# Univers synthétique aligné (dates x titres) pour dataviz.screener : cotations
+# d'âges différents et environ 1 % de séances manquantes
+def synthetic_universe(symbols, days, seed=0):
+    from dataviz.screener import Universe
+
+    rng = np.random.default_rng(seed)
+    close = 40 * np.exp(np.cumsum(rng.normal(0, 0.01, (days, symbols)), axis=0))
+    close[rng.random((days, symbols)) < 0.01] = np.nan
+    listed = rng.integers(0, days // 2, symbols) * (rng.random(symbols) < 0.1)
+    close[np.arange(days)[:, None] < listed] = np.nan
+    low = close * (1 - rng.uniform(0, 0.01, (days, symbols)))
+    dates = START + np.arange(days).astype('timedelta64[D]')
+    return Universe([f"SYNTH{j}" for j in range(symbols)], dates, close, low)
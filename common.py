@@ -1,6 +1,11 @@
+import os
 import streamlit as st
-import base64
-from pathlib import Path
+from dataviz import profiling
+from dataviz.assets import build_assets
+from dataviz.settings import DEFAULT_SYMBOL
+
+# Les modules de calcul (NumPy, pandas, plotly) sont importés dans les fonctions
+# qui s'en servent : une page qui ne les utilise pas ne paie pas leur import
 
 # Configuration commune pour toutes les pages
 st.set_page_config(
@@ -9,20 +14,24 @@ st.set_page_config(
     layout="wide"
 )
 
+# Images de la charte, préparées une seule fois par processus et servies en
+# fichiers statiques (dossier static/, voir .streamlit/config.toml)
+@st.cache_resource(show_spinner=False)
+def get_assets():
+    return build_assets()
+
 # Ajout du CSS pour le background
 def set_background():
-    # Lecture et encodage de l'image en base64
-    img_path = Path("src/Xait-Customer-Story-Bouygues-Telecom-logo-banner-1920x1080.jpg")
-    
-    if img_path.exists():
-        with open(img_path, "rb") as img_file:
-            encoded_string = base64.b64encode(img_file.read()).decode()
-        
+    # L'image est référencée par URL : le navigateur la met en cache
+    with profiling.section("set_background"):
+        background_url = get_assets().get('background')
+
+    if background_url:
         st.markdown(
             f"""
             <style>
             .stApp > div:first-child {{
-                background-image: url("data:image/jpg;base64,{encoded_string}");
+                background-image: url("{background_url}");
                 background-size: cover;
                 background-position: center;
                 background-repeat: no-repeat;
@@ -58,11 +67,233 @@ def set_background():
         )
 
 # Logo et titre commun
-def show_header():
+def show_header(ticker=DEFAULT_SYMBOL):
     set_background()
     col1, col2 = st.columns([1, 4])
     with col1:
-        st.image("src/Bouygues_Télécom.png", width=200)
+        logo_url = get_assets().get('logo')
+        if logo_url:
+            st.markdown(f'<img src="{logo_url}" width="200" alt="Logo">', unsafe_allow_html=True)
     with col2:
-        st.title("Dashboard Analyse BOUYGUES")
+        st.title(f"Dashboard Analyse {ticker}")
     st.markdown("---")
+
+
+# Stockage des cours, un seul par processus
+@st.cache_resource(show_spinner=False)
+def get_store():
+    from dataviz.store import PriceStore
+    return PriceStore()
+
+
+# Chargement des données d'un titre, partagé par toutes les pages et toutes les sessions.
+# Le frame renvoyé est en lecture seule (colonnes mappées en mémoire) : ne pas y
+# ajouter de colonnes, travailler sur une copie (df.assign(...)) pour les calculs dérivés.
+# Avec with_indicators=True, les indicateurs glissants (Daily_Return, MA20, MA50,
+# Volatility_20d, Cumulative_Return) sont ajoutés sans copie aux colonnes de prix.
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _load_prices(ticker, version, with_indicators):
+    if with_indicators:
+        return get_store().analysis_frame(ticker)
+    return get_store().open(ticker)
+
+def load_data(ticker=DEFAULT_SYMBOL, with_indicators=False):
+    with profiling.section("load_data"):
+        return _load_prices(ticker, data_version(ticker), with_indicators)
+
+# Version des données d'un titre, à inclure dans les clés des caches dérivés
+def data_version(ticker=DEFAULT_SYMBOL):
+    return get_store().version(ticker)
+
+
+# Résultats dérivés d'un titre (tableaux de statistiques, grilles, niveaux),
+# calculés une fois par version des données et paramètres puis partagés sans
+# copie par toutes les sessions du processus (voir dataviz.cache). Les frames
+# renvoyés sont des copies superficielles propres à l'appelant ; les tableaux
+# NumPy et les autres objets sont partagés et ne doivent pas être modifiés.
+def shared_result(name, ticker, params, build):
+    from dataviz.cache import shared_cache
+    return shared_cache.get(name, ticker, data_version(ticker), params, build)
+
+
+# Statistiques (nombre, somme, moyenne, min, max, écart-type) des lignes [lo, hi)
+# d'un titre, identiques bit à bit à celles de pandas sur les mêmes lignes,
+# calculées par blocs sur les fichiers du stockage sans charger l'historique
+# (voir dataviz.chunked) ; un résultat partagé par titre, version et plage
+def range_summary(ticker, columns, lo, hi, stats=('mean', 'min', 'max', 'std')):
+    from dataviz import chunked
+    return shared_result('range_summary', ticker, (tuple(columns), lo, hi, tuple(stats)),
+                         lambda: chunked.summary(get_store().symbol_dir(ticker), list(columns), lo, hi, list(stats)))
+
+
+# Barres précalculées des lignes [lo, hi) pour les graphiques : (niveau, barres)
+# au niveau le plus fin qui tient dans le budget de points, ou None si les
+# lignes journalières suffisent (voir dataviz.rollups.bars)
+def chart_bars(ticker, lo, hi):
+    from dataviz import rollups
+    from dataviz.downsample import MAX_POINTS
+    return shared_result('chart_bars', ticker, (lo, hi, MAX_POINTS),
+                         lambda: rollups.bars(get_store().symbol_dir(ticker), lo, hi, MAX_POINTS))
+
+
+# Grille de backtest des croisements de moyennes mobiles d'un titre (voir dataviz.backtest)
+def backtest_grid(ticker, shorts, longs, fee):
+    from dataviz import backtest
+
+    def build():
+        with st.spinner("Backtest en cours..."):
+            return backtest.grid(load_data(ticker)['Close'].to_numpy(), shorts, longs, fee)
+    return shared_result('backtest_grid', ticker, (tuple(shorts), tuple(longs), fee), build)
+
+
+# Niveaux de support et de résistance d'un titre détectés sur ses lookback
+# dernières séances (tout l'historique si lookback vaut 0), voir dataviz.levels
+def price_levels(ticker, lookback=0, max_levels=None):
+    from dataviz import levels
+
+    def build():
+        df = load_data(ticker)
+        return levels.detect_levels(df.tail(lookback) if lookback else df, max_levels=max_levels)
+    return shared_result('price_levels', ticker, (lookback, max_levels), build)
+
+
+# Versions des titres d'un univers (tous les titres journaliers si symbols est
+# vide), pour les clés des caches. Les exports CSV ne sont contrôlés qu'une fois
+# toutes les UNIVERSE_REFRESH secondes ; entre deux contrôles, les versions sont
+# lues dans l'index du stockage sans ouvrir un fichier par titre.
+UNIVERSE_REFRESH = 60
+
+@st.cache_resource(ttl=UNIVERSE_REFRESH, max_entries=8, show_spinner=False)
+def _synced_universe(symbols):
+    store = get_store()
+    symbols = list(symbols) or store.daily_symbols()
+    store.refresh(symbols)
+    return tuple(symbols)
+
+def universe_versions(symbols=()):
+    return get_store().versions(_synced_universe(tuple(symbols)))
+
+
+# Classement de tous les titres journaliers du stockage par score global (voir
+# dataviz.screener). L'univers aligné (dates x titres) est construit une fois
+# par jeu de versions.
+@st.cache_resource(max_entries=4, show_spinner="Chargement de l'univers...")
+def _load_universe(versions):
+    from dataviz.screener import Universe
+    return Universe.from_store(get_store(), [symbol for symbol, _ in versions])
+
+def screen_universe():
+    from dataviz.cache import shared_cache
+    from dataviz.screener import rank
+    versions = universe_versions()
+    return shared_cache.get('screen_universe', '*', versions, (), lambda: rank(_load_universe(versions)))
+
+
+# Rendements alignés (dates x titres) d'une liste de titres, voir
+# screener.session_returns ; partagés en lecture seule
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _universe_returns(versions):
+    from dataviz.screener import session_returns
+    universe = _load_universe(versions)
+    return universe.dates[1:], session_returns(universe.close)
+
+def universe_returns(symbols):
+    return _universe_returns(universe_versions(symbols))
+
+
+# Corrélations et covariances glissantes entre titres (voir dataviz.correlation) :
+# un moteur par liste de titres et fenêtre, prolongé des seules nouvelles barres
+# quand les données d'un titre changent
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _comoments(symbols, window):
+    from dataviz.correlation import RollingComoments
+    return RollingComoments(symbols, window)
+
+def rolling_comoments(symbols, window):
+    dates, returns = universe_returns(symbols)
+    return _comoments(tuple(symbols), window).update(dates, returns)
+
+
+# Index de tri du tableau de données d'un titre (prix et indicateurs)
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _load_table_index(ticker, version):
+    from dataviz.table import TableIndex
+    return TableIndex(load_data(ticker, with_indicators=True))
+
+def load_table_index(ticker=DEFAULT_SYMBOL):
+    return _load_table_index(ticker, data_version(ticker))
+
+
+# Flux temps réel d'un titre, partagé par toutes les sessions. source vaut
+# 'simulated' (marche aléatoire depuis le dernier cours) ou 'file' (suivi du
+# fichier de transactions path, nom d'un fichier du dossier settings.LIVE_DIR).
+# Le thread du flux est arrêté à l'éviction.
+def _stop_feed(feed):
+    feed.stop()
+
+@st.cache_resource(max_entries=16, show_spinner=False, on_release=_stop_feed)
+def get_live_feed(ticker, source, path=None):
+    from dataviz import live
+    if source == 'file':
+        path = live.feed_path(path)
+        return live.LiveFeed(lambda: live.file_feed(path)).start()
+    last_close = float(load_data(ticker)['Close'].iloc[-1])
+    return live.LiveFeed(lambda: live.simulated_feed(last_close)).start()
+
+
+# Graphiques de la page Entreprise, relus une fois par processus depuis leur
+# version sérialisée (voir dataviz.company)
+@st.cache_resource(show_spinner=False)
+def get_company_figures():
+    import plotly.graph_objects as go
+    from dataviz.company import load_figures
+    return {name: go.Figure(fig) for name, fig in load_figures().items()}
+
+
+# Sélecteur de titre commun aux pages ; le choix est conservé d'une page à l'autre
+def _keep_ticker():
+    st.session_state.ticker = st.session_state._ticker_select
+
+def select_ticker():
+    symbols = get_store().symbols()
+    if st.session_state.get('ticker') not in symbols:
+        st.session_state.ticker = DEFAULT_SYMBOL if DEFAULT_SYMBOL in symbols else symbols[0]
+    st.session_state._ticker_select = st.session_state.ticker
+    st.sidebar.selectbox("Titre", symbols, key='_ticker_select', on_change=_keep_ticker)
+    return st.session_state.ticker
+
+
+# Profilage optionnel des pages, activé par DATAVIZ_PROFILE=1 ou ?profile=1 dans l'URL.
+# Les dernières exécutions de la session sont gardées pour l'export de trace.
+PROFILE_HISTORY = 20
+
+def start_profiling(page):
+    enabled = os.environ.get("DATAVIZ_PROFILE") == "1" or st.query_params.get("profile") == "1"
+    # Le profileur de l'exécution précédente est terminé s'il ne l'a pas été
+    # (exécution interrompue), pour ne pas laisser tracemalloc actif
+    prof = profiling.start(page, enabled, st.session_state.get('_profiler'))
+    st.session_state._profiler = prof
+    return prof
+
+def show_profile(prof):
+    if not prof.enabled:
+        return
+    prof.finish()
+    history = st.session_state.setdefault('_profiles', [])
+    history.append(prof)
+    del history[:-PROFILE_HISTORY]
+
+    from dataviz.cache import shared_cache
+    with st.sidebar.expander("Profilage"):
+        st.dataframe(prof.summary(), hide_index=True)
+        st.caption("Octets alloués : mesure globale au processus"
+                   + (f", faussée par {prof.concurrent - 1} autre(s) exécution(s) profilée(s) en parallèle"
+                      if prof.concurrent > 1 else ""))
+        st.caption("Cache partagé")
+        st.json(shared_cache.stats())
+        st.download_button(
+            "Exporter la trace (Chrome)",
+            profiling.chrome_trace(history),
+            file_name="trace.json",
+            mime="application/json",
+        )
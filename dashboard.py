@@ -1,35 +1,25 @@
+import numpy as np
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from common import show_header
-
-show_header()
-
-# Chargement des données
-@st.cache_data
-def load_data():
-    df = pd.read_csv('BOUYGUES_historical_price.csv', sep=';')
-    
-    # Conversion des colonnes numériques (remplacer les virgules par des points)
-    numeric_cols = ['Open', 'High', 'Low', 'Last', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover', 'vwap']
-    for col in numeric_cols:
-        df[col] = df[col].astype(str).str.replace(',', '.').astype(float)
-    
-    # Conversion de la date
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values('Date').reset_index(drop=True)
-    
-    return df
-
-df = load_data()
+from common import show_header, load_data, data_version, select_ticker, start_profiling, show_profile, get_live_feed, load_table_index, range_summary, chart_bars
+from dataviz import figures, live, profiling, rollups
+from dataviz.data import date_index_range
+from dataviz.table import PAGE_SIZES
+
+prof = start_profiling("dashboard")
+
+ticker = select_ticker()
+show_header(ticker)
+
+df = load_data(ticker, with_indicators=True)
 
 # Sidebar pour les filtres
+prof.step("Filtres")
 st.sidebar.header("Filtres")
 
 # Sélection de la période
-min_date = df['Date'].min().to_pydatetime()
-max_date = df['Date'].max().to_pydatetime()
+# (colonne Date triée : bornes lues aux extrémités)
+min_date = df['Date'].iloc[0].to_pydatetime()
+max_date = df['Date'].iloc[-1].to_pydatetime()
 
 date_range = st.sidebar.date_input(
     "Période",
@@ -38,138 +28,165 @@ date_range = st.sidebar.date_input(
     max_value=max_date
 )
 
+# Intervalle de lignes [lo, hi) de la période (recherche dichotomique sur la date)
 if len(date_range) == 2:
-    df_filtered = df[(df['Date'].dt.date >= date_range[0]) & (df['Date'].dt.date <= date_range[1])]
+    lo, hi = date_index_range(df['Date'].to_numpy(), date_range[0], date_range[1])
 else:
-    df_filtered = df
-
-# KPIs
-st.header("Indicateurs Clés")
-col1, col2, col3, col4 = st.columns(4)
-
-current_close = df_filtered['Close'].iloc[-1]
-prev_close = df_filtered['Close'].iloc[-2] if len(df_filtered) > 1 else current_close
-change = ((current_close - prev_close) / prev_close) * 100
-
-col1.metric("Prix de Clôture", f"{current_close:.2f}€", f"{change:+.2f}%")
-col2.metric("Prix Max Période", f"{df_filtered['High'].max():.2f}€")
-col3.metric("Prix Min Période", f"{df_filtered['Low'].min():.2f}€")
-col4.metric("Volume Total", f"{df_filtered['Number of Shares'].sum():,.0f}")
-
-st.markdown("---")
-
-# Graphique des prix
-st.header("Evolution des Prix")
-
-fig_prices = make_subplots(rows=2, cols=1, 
-                          shared_xaxes=True,
-                          vertical_spacing=0.05,
-                          row_heights=[0.7, 0.3],
-                          subplot_titles=('Prix de Clôture', 'Volume'))
-
-# Graphique chandelier
-fig_prices.add_trace(
-    go.Candlestick(
-        x=df_filtered['Date'],
-        open=df_filtered['Open'],
-        high=df_filtered['High'],
-        low=df_filtered['Low'],
-        close=df_filtered['Close'],
-        name='BOUYGUES'
-    ),
-    row=1, col=1
-)
-
-# Moyennes mobiles
-df_filtered['MA20'] = df_filtered['Close'].rolling(window=20).mean()
-df_filtered['MA50'] = df_filtered['Close'].rolling(window=50).mean()
-
-fig_prices.add_trace(
-    go.Scatter(
-        x=df_filtered['Date'],
-        y=df_filtered['MA20'],
-        name='MA 20',
-        line=dict(color='orange', width=1)
-    ),
-    row=1, col=1
-)
-
-fig_prices.add_trace(
-    go.Scatter(
-        x=df_filtered['Date'],
-        y=df_filtered['MA50'],
-        name='MA 50',
-        line=dict(color='blue', width=1)
-    ),
-    row=1, col=1
-)
-
-# Volume
-colors = ['red' if row['Close'] < row['Open'] else 'green' for _, row in df_filtered.iterrows()]
-fig_prices.add_trace(
-    go.Bar(
-        x=df_filtered['Date'],
-        y=df_filtered['Number of Shares'],
-        name='Volume',
-        marker_color=colors
-    ),
-    row=2, col=1
-)
-
-fig_prices.update_layout(
-    title='Graphique OHLC et Volume',
-    xaxis_rangeslider_visible=False,
-    height=800,
-    showlegend=True,
-    hovermode='x unified'
-)
-
-st.plotly_chart(fig_prices, use_container_width=True)
-
-st.markdown("---")
-
-# Graphique VWAP
-st.header("Analyse VWAP")
-
-fig_vwap = go.Figure()
-
-fig_vwap.add_trace(
-    go.Scatter(
-        x=df_filtered['Date'],
-        y=df_filtered['Close'],
-        name='Prix de Clôture',
-        line=dict(color='blue', width=2)
-    )
-)
-
-fig_vwap.add_trace(
-    go.Scatter(
-        x=df_filtered['Date'],
-        y=df_filtered['vwap'],
-        name='VWAP',
-        line=dict(color='purple', width=2, dash='dash')
-    )
-)
-
-fig_vwap.update_layout(
-    title='Prix de Clôture vs VWAP',
-    xaxis_title='Date',
-    yaxis_title='Prix (€)',
-    hovermode='x unified'
-)
+    lo, hi = 0, len(df)
+
+# Mode temps réel : seuls les KPIs et les graphiques sont réexécutés (fragment)
+# à chaque rafraîchissement ; filtres et tableau ne sont pas recalculés
+st.sidebar.header("Temps réel")
+live_mode = st.sidebar.toggle("Mode temps réel", value=False)
+if live_mode:
+    live_source = st.sidebar.radio("Source", ["Simulée", "Fichier"], horizontal=True)
+    live_path = None
+    if live_source == "Fichier":
+        # Seuls les fichiers du dossier de flux configuré sont proposés
+        feed_files = live.feed_files()
+        if feed_files:
+            live_path = st.sidebar.selectbox("Fichier de transactions (Date;Price;Quantity)", feed_files)
+        else:
+            st.sidebar.info("Aucun fichier de transactions dans le dossier de flux (DATAVIZ_LIVE_DIR)")
+    refresh = st.sidebar.slider("Rafraîchissement (s)", 0.2, 5.0, 1.0, 0.1)
+
+version = data_version(ticker)
+period = date_range if len(date_range) == 2 else ()
+
+
+# KPIs et graphiques des lignes [lo, view_hi) de l'historique, suivies en temps
+# réel de la barre en cours row (voir live.live_row). La partie historique
+# (agrégats, barres et figures) est calculée une fois par version et période ;
+# à chaque rafraîchissement, seule la barre en cours est ajoutée. Les étapes
+# sont notées sur le profileur courant : les réexécutions du fragment temps réel
+# ne sont pas profilées.
+def show_market(view_hi, row=None):
+    df_view = df.iloc[lo:view_hi]
+    # Figures d'une période sans sa dernière barre, remplacée par la barre en cours
+    figure_key = period if view_hi == hi else (*period, view_hi)
+
+    # KPIs
+    st.header("Indicateurs Clés")
+    col1, col2, col3, col4 = st.columns(4)
+
+    # Agrégats de la période calculés sur le stockage, complétés par la barre en cours
+    kpis = range_summary(ticker, ['High', 'Low', 'Number of Shares'], lo, view_hi, ['min', 'max', 'sum'])
+    high, low, volume = kpis.loc['High', 'max'], kpis.loc['Low', 'min'], kpis.loc['Number of Shares', 'sum']
+    if row is None:
+        current_close = df_view['Close'].iloc[-1]
+        prev_close = df_view['Close'].iloc[-2] if len(df_view) > 1 else current_close
+    else:
+        high, low = np.fmax(high, row['High']), np.fmin(low, row['Low'])
+        volume += row['Number of Shares']
+        current_close = row['Close']
+        prev_close = df['Close'].iloc[view_hi - 1] if view_hi else current_close
+    change = ((current_close - prev_close) / prev_close) * 100
+
+    col1.metric("Prix de Clôture", f"{current_close:.2f}€", f"{change:+.2f}%")
+    col2.metric("Prix Max Période", f"{high:.2f}€")
+    col3.metric("Prix Min Période", f"{low:.2f}€")
+    col4.metric("Volume Total", f"{volume:,.0f}")
+
+    st.markdown("---")
+
+    # Graphique des prix
+    profiling.current().step("Graphique des prix")
+    st.header("Evolution des Prix")
+
+    # Les figures ne sont reconstruites que si les données ou la période changent,
+    # et les longues périodes sont tracées depuis les barres hebdomadaires /
+    # mensuelles / trimestrielles précalculées
+    rolled = chart_bars(ticker, lo, view_hi)
+    bars = rolled[1] if rolled else None
+    fig_prices = figures.cached_figure('prices', ticker, version, figure_key,
+                                       lambda: figures.price_figure(df_view, ticker, bars))
+    if row is not None:
+        fig_prices = figures.live_price_figure(fig_prices, row)
+    st.plotly_chart(fig_prices, use_container_width=True)
+    if rolled:
+        st.caption(f"Barres par {rollups.LEVEL_LABELS[rolled[0]]} ({len(rolled[1])} barres)")
+
+    st.markdown("---")
+
+    # Graphique VWAP
+    profiling.current().step("Graphique VWAP")
+    st.header("Analyse VWAP")
+
+    fig_vwap = figures.cached_figure('vwap', ticker, version, figure_key,
+                                     lambda: figures.vwap_figure(df_view, bars))
+    if row is not None:
+        fig_vwap = figures.live_vwap_figure(fig_vwap, row)
+    st.plotly_chart(fig_vwap, use_container_width=True)
+
+    st.markdown("---")
+
+
+prof.step("KPIs")
+if live_mode and (live_source == "Simulée" or live_path):
+    feed = get_live_feed(ticker, 'file' if live_source == "Fichier" else 'simulated', live_path)
+    # La barre en cours n'est ajoutée que si la période affichée va jusqu'à la fin de l'historique
+    follows_end = len(date_range) != 2 or date_range[1] >= max_date.date()
+
+    @st.fragment(run_every=refresh)
+    def live_market():
+        with profiling.section("live"):
+            bar = live.current_bar(feed.buffer, live.bar_size(ticker))
+            if feed.error:
+                st.error("Flux temps réel interrompu (détail dans les journaux du serveur)")
+            else:
+                st.caption(f"Temps réel : {feed.buffer.count} ticks reçus")
+            if bar is None or not follows_end:
+                show_market(hi)
+                return
+            row, replaces_last = live.live_row(bar, df)
+            show_market(hi - 1 if replaces_last else hi, row)
+
+    live_market()
+else:
+    show_market(hi)
 
-st.plotly_chart(fig_vwap, use_container_width=True)
+# Tableau de données : seule la page affichée est lue et envoyée au navigateur
+prof.step("Donnees brutes")
+st.header("Donnees Brutes")
 
-st.markdown("---")
+table = load_table_index(ticker)
+numeric_columns = [col for col in df.columns if col != 'Date']
+
+col1, col2, col3, col4 = st.columns([2, 1, 2, 1])
+sort_by = col1.selectbox("Trier par", list(df.columns), key='table_sort')
+ascending = not col2.toggle("Décroissant", value=True, key='table_desc')
+filter_column = col3.selectbox("Filtrer", ["Aucun"] + numeric_columns, key='table_filter')
+page_size = col4.selectbox("Lignes", PAGE_SIZES, key='table_page_size')
+
+value_filter = None
+if filter_column != "Aucun":
+    values = df[filter_column].to_numpy()[lo:hi]
+    # Colonne sans valeur sur la période (MA50 en début d'historique par exemple)
+    if np.isnan(values).all():
+        st.info(f"{filter_column} n'a aucune valeur sur la période : filtre non appliqué")
+    else:
+        vmin, vmax = float(np.nanmin(values)), float(np.nanmax(values))
+        fcol1, fcol2 = st.columns(2)
+        low = fcol1.number_input(f"{filter_column} min", value=vmin, key=f'table_min_{filter_column}')
+        high = fcol2.number_input(f"{filter_column} max", value=vmax, key=f'table_max_{filter_column}')
+        value_filter = (filter_column, low, high)
+
+total = table.count(lo, hi, value_filter)
+pages = max(1, -(-total // page_size))
+page = st.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, value=1, key='table_page')
+page = min(page, pages)
+offset = (page - 1) * page_size
 
-# Tableau de données
-st.header("Donnees Brutes")
 st.dataframe(
-    df_filtered.sort_values('Date', ascending=False),
+    table.page(lo, hi, sort_by, ascending, offset, page_size, value_filter),
     use_container_width=True,
+    hide_index=True,
     height=400
 )
+st.caption(f"Lignes {min(offset + 1, total)} à {min(offset + page_size, total)} sur {total}")
 
 # Footer
 st.markdown("---")
-st.caption("Dashboard Streamlit - Analyse des données BOUYGUES")
+st.caption(f"Dashboard Streamlit - Analyse des données {ticker}")
+
+show_profile(prof)
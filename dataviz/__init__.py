@@ -0,0 +1 @@
+"""Briques de calcul et d'accès aux données du dashboard BOUYGUES."""
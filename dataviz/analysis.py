@@ -0,0 +1,88 @@
+"""Conclusions de la page Analyses (tendance, volatilité, signal des moyennes
+mobiles, supports/résistances, score global 0-5) sous forme de fonctions pures,
+utilisables sans Streamlit."""
+import numpy as np
+
+# Fenêtre (en séances) des supports et résistances
+SR_WINDOW = 30
+
+
+# Signal des moyennes mobiles : ACHAT, ATTENTION, VENTE ou MAINTENIR
+def ma_signal(price, ma20, ma50):
+    if price > ma20 and ma20 > ma50:
+        return 'ACHAT'
+    if price > ma20:
+        return 'ATTENTION'
+    if price < ma20 and ma20 < ma50:
+        return 'VENTE'
+    return 'MAINTENIR'
+
+
+# Position du prix par rapport aux supports : SECURE, SUPPORT ou RESISTANCE
+def sr_position(price, support, resistance):
+    if price > support * 1.02 and price < resistance * 0.98:
+        return 'SECURE'
+    if price <= support * 1.02:
+        return 'SUPPORT'
+    return 'RESISTANCE'
+
+
+def global_score(total_return, volatility, price, ma20, support):
+    score = 0
+    if total_return > 0:
+        score += 2
+    if volatility < 4:
+        score += 1
+    if price > ma20:
+        score += 1
+    if price > support * 1.02:
+        score += 1
+    return score
+
+
+def recommendation(score):
+    if score >= 4:
+        return 'ACHETER'
+    if score >= 2:
+        return 'MAINTENIR'
+    return 'VENDRE'
+
+
+# Analyse complète d'un titre. df contient les prix et les indicateurs
+# (Daily_Return, MA20, MA50, Volatility_20d), triés par date croissante.
+# Les agrégats sont calculés en float64, quel que soit le type de stockage.
+def analyze(df):
+    close = df['Close'].to_numpy()
+    first_price = float(close[0])
+    latest_price = float(close[-1])
+    total_return = (latest_price - first_price) / first_price * 100
+
+    volatility = float(df['Daily_Return'].astype(np.float64).std())
+    avg_volatility = float(df['Volatility_20d'].astype(np.float64).mean())
+
+    current_ma20 = float(df['MA20'].iloc[-1])
+    current_ma50 = float(df['MA50'].iloc[-1])
+    current_vwap = float(df['vwap'].iloc[-1])
+
+    support_level = float(np.min(df['Low'].to_numpy()[-SR_WINDOW:]))
+    resistance_level = float(np.max(df['High'].to_numpy()[-SR_WINDOW:]))
+
+    score = global_score(total_return, volatility, latest_price, current_ma20, support_level)
+    return {
+        'first_price': first_price,
+        'latest_price': latest_price,
+        'total_return': total_return,
+        'volatility': volatility,
+        'avg_volatility': avg_volatility,
+        'ma20': current_ma20,
+        'ma50': current_ma50,
+        'vwap': current_vwap,
+        'signal': ma_signal(latest_price, current_ma20, current_ma50),
+        'support': support_level,
+        'resistance': resistance_level,
+        'distance_to_support': (latest_price - support_level) / latest_price * 100,
+        'distance_to_resistance': (resistance_level - latest_price) / latest_price * 100,
+        'position': sr_position(latest_price, support_level, resistance_level),
+        'score': score,
+        'recommendation': recommendation(score),
+    }
@@ -0,0 +1,79 @@
+"""Préparation des images de la charte (fond, logo) : redimensionnées et
+recompressées une seule fois, puis servies comme fichiers statiques par
+Streamlit (server.enableStaticServing) et référencées par URL.
+
+Le nom de chaque fichier produit contient un hash de la source et des
+paramètres : l'URL change quand l'image change, ce qui permet au navigateur de
+la garder en cache d'une page et d'une session à l'autre (ETag/Last-Modified
+envoyés par le serveur de fichiers statiques)."""
+import hashlib
+from pathlib import Path
+
+from PIL import Image, features
+
+STATIC_DIR = Path("static")
+ASSET_DIR = STATIC_DIR / "assets"
+# Préfixe d'URL sous lequel Streamlit sert le dossier static/
+STATIC_URL = "app/static"
+
+# nom -> (fichier source, largeur maximale en pixels)
+ASSETS = {
+    'background': ("src/Xait-Customer-Story-Bouygues-Telecom-logo-banner-1920x1080.jpg", 1920),
+    'logo': ("src/Bouygues_Télécom.png", 400),
+}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def _output_format(img):
+    if features.check('webp'):
+        return 'webp'
+    return 'png' if img.mode in ('RGBA', 'LA', 'P') else 'jpeg'
+
+
+# Redimensionne et recompresse une image ; ne fait rien si le fichier produit existe déjà
+def build_asset(name, src, max_width, out_dir=ASSET_DIR):
+    src = Path(src)
+    raw = src.read_bytes()
+    digest = hashlib.sha256(raw + f"{max_width}:{WEBP_QUALITY}:{JPEG_QUALITY}".encode()).hexdigest()[:12]
+
+    with Image.open(src) as img:
+        fmt = _output_format(img)
+        out = Path(out_dir) / f"{name}.{digest}.{'jpg' if fmt == 'jpeg' else fmt}"
+        if out.exists():
+            return out
+
+        img.load()
+        if img.width > max_width:
+            img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+        if fmt == 'jpeg' and img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(out.name + '.tmp')
+        if fmt == 'webp':
+            img.save(tmp, 'WEBP', quality=WEBP_QUALITY, method=6)
+        elif fmt == 'jpeg':
+            img.save(tmp, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            img.save(tmp, 'PNG', optimize=True)
+        tmp.replace(out)
+
+    # Les versions précédentes de l'image ne sont plus référencées
+    for old in out.parent.glob(f"{name}.*"):
+        if old != out:
+            old.unlink(missing_ok=True)
+    return out
+
+
+# Construit toutes les images présentes et renvoie leur URL par nom. Les images
+# sont écrites dans ASSET_DIR, sous le dossier servi par Streamlit (STATIC_DIR).
+def build_assets(assets=ASSETS):
+    urls = {}
+    for name, (src, max_width) in assets.items():
+        if not Path(src).exists():
+            continue
+        out = build_asset(name, src, max_width)
+        urls[name] = f"{STATIC_URL}/{out.relative_to(STATIC_DIR).as_posix()}"
+    return urls
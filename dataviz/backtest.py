@@ -0,0 +1,154 @@
+"""Backtest vectorisé de la règle de croisement de moyennes mobiles : position
+acheteuse quand la moyenne courte est au-dessus de la moyenne longue, aucune
+position sinon. La position décidée à la clôture d'une séance s'applique au
+rendement de la séance suivante ; chaque changement de position coûte fee.
+
+Toutes les moyennes sont calculées une fois à partir d'une somme cumulée, puis
+la grille (courte x longue) est évaluée par diffusion NumPy, par paquets de
+fenêtres courtes (mémoire bornée par MAX_ELEMENTS), éventuellement répartis sur
+un pool de processus.
+
+    python -m dataviz.backtest BOUYGUES --short 5:100 --long 20:300:5 -j 4
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Taille maximale d'un paquet (fenêtres courtes x longues x séances)
+MAX_ELEMENTS = 1 << 22
+# Écart relatif en dessous duquel deux moyennes sont considérées égales : les
+# sommes cumulées introduisent une erreur d'arrondi de l'ordre de 1e-12
+TIE_TOLERANCE = 1e-9
+# Coût d'un changement de position, en fraction du capital (5 points de base)
+DEFAULT_FEE = 0.0005
+
+METRICS = ['total_return', 'max_drawdown', 'trades']
+
+
+# Moyennes mobiles simples des fenêtres demandées, par différence de sommes
+# cumulées : tableau (fenêtres, séances), NaN tant que la fenêtre n'est pas pleine
+def moving_averages(close, windows):
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    cs = np.concatenate(([0.0], np.cumsum(close)))
+    out = np.full((len(windows), n), np.nan)
+    for i, w in enumerate(windows):
+        if w <= n:
+            out[i, w - 1:] = (cs[w:] - cs[:n - w + 1]) / w
+    return out
+
+
+# Résultats de la règle pour chaque couple (courte, longue) :
+# ma_short (S, n) et ma_long (L, n) -> tableaux (S, L)
+def _evaluate(ma_short, ma_long, returns, fee, with_equity=False):
+    # Position tenue pendant la séance t+1, décidée à la clôture de t
+    with np.errstate(invalid='ignore'):
+        position = (ma_short[:, None, :-1] - ma_long[None, :, :-1]
+                    > TIE_TOLERANCE * np.abs(ma_long[None, :, :-1])).astype(np.float64)
+    changes = np.abs(np.diff(position, axis=-1, prepend=0.0))
+    strategy = position * returns - changes * fee
+    equity = np.cumprod(1.0 + strategy, axis=-1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=-1) - 1.0
+    result = {
+        'total_return': equity[..., -1] - 1.0,
+        'max_drawdown': drawdown.min(axis=-1),
+        'trades': changes.sum(axis=-1),
+    }
+    if with_equity:
+        result['equity'] = equity
+    return result
+
+
+def _grid_rows(close, shorts, longs, fee):
+    close = np.asarray(close, dtype=np.float64)
+    returns = close[1:] / close[:-1] - 1.0
+    ma_long = moving_averages(close, longs)
+    ma_short = moving_averages(close, shorts)
+    step = max(1, MAX_ELEMENTS // max(len(longs) * len(close), 1))
+    parts = [_evaluate(ma_short[i:i + step], ma_long, returns, fee) for i in range(0, len(shorts), step)]
+    return {m: np.concatenate([p[m] for p in parts]) for m in METRICS}
+
+
+def _grid_task(args):
+    return _grid_rows(*args)
+
+
+# Grille complète : {métrique: tableau (courtes, longues)}. Les couples où la
+# fenêtre courte n'est pas strictement plus petite que la longue valent NaN.
+# workers > 1 répartit les fenêtres courtes sur un pool de processus.
+def grid(close, shorts, longs, fee=DEFAULT_FEE, workers=0):
+    shorts, longs = list(shorts), list(longs)
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < 2 or not shorts or not longs:
+        return {m: np.full((len(shorts), len(longs)), np.nan) for m in METRICS}
+
+    if workers and workers > 1 and len(shorts) > 1:
+        splits = [s for s in np.array_split(np.array(shorts), workers) if len(s)]
+        with ProcessPoolExecutor(len(splits)) as pool:
+            parts = list(pool.map(_grid_task, [(close, list(s), longs, fee) for s in splits]))
+        result = {m: np.concatenate([p[m] for p in parts]) for m in METRICS}
+    else:
+        result = _grid_rows(close, shorts, longs, fee)
+
+    invalid = np.array(shorts)[:, None] >= np.array(longs)[None, :]
+    for m in METRICS:
+        result[m][invalid] = np.nan
+    return result
+
+
+# Backtest d'un seul couple : courbe de capital et métriques
+def backtest(close, short, long, fee=DEFAULT_FEE):
+    close = np.asarray(close, dtype=np.float64)
+    ma = moving_averages(close, [short, long])
+    returns = close[1:] / close[:-1] - 1.0
+    result = _evaluate(ma[:1], ma[1:], returns, fee, with_equity=True)
+    equity = np.concatenate(([1.0], result['equity'][0, 0]))
+    return equity, {m: float(result[m][0, 0]) for m in METRICS}
+
+
+# Meilleur couple de la grille selon une métrique : (courte, longue, valeur)
+def best_pair(result, shorts, longs, metric='total_return'):
+    values = result[metric]
+    if np.all(np.isnan(values)):
+        return None
+    i, j = np.unravel_index(np.nanargmax(values), values.shape)
+    return shorts[i], longs[j], float(values[i, j])
+
+
+def _window_range(text):
+    parts = [int(p) for p in text.split(':')]
+    start, stop = parts[0], parts[1] if len(parts) > 1 else parts[0]
+    return list(range(start, stop + 1, parts[2] if len(parts) > 2 else 1))
+
+
+def main(argv=None):
+    from dataviz.store import PriceStore
+
+    parser = argparse.ArgumentParser(description="Backtest d'une grille de croisements de moyennes mobiles")
+    parser.add_argument('symbol')
+    parser.add_argument('--short', default='5:100', help="fenêtres courtes début:fin[:pas]")
+    parser.add_argument('--long', default='20:300:5', help="fenêtres longues début:fin[:pas]")
+    parser.add_argument('--fee', type=float, default=DEFAULT_FEE)
+    parser.add_argument('-j', '--workers', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    close = PriceStore().open(args.symbol, ['Close'])['Close'].to_numpy()
+    shorts, longs = _window_range(args.short), _window_range(args.long)
+    start = time.perf_counter()
+    result = grid(close, shorts, longs, args.fee, args.workers)
+    elapsed = time.perf_counter() - start
+    pairs = int(np.count_nonzero(~np.isnan(result['total_return'])))
+    print(f"{pairs} couples sur {len(close)} séances en {elapsed:.2f}s")
+    best = best_pair(result, shorts, longs)
+    if best:
+        i, j = shorts.index(best[0]), longs.index(best[1])
+        print(f"Meilleur couple : MA{best[0]}/MA{best[1]} rendement {best[2]:+.1%} "
+              f"drawdown max {result['max_drawdown'][i, j]:.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
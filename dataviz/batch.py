@@ -0,0 +1,81 @@
+"""Analyse en lot de tous les titres du stockage, répartie sur un pool de
+processus, avec un fichier de résultats colonnaire (Parquet) en sortie.
+
+    python -m dataviz.batch -o analyses.parquet [-j 8] [SYMBOLE ...]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from dataviz.analysis import analyze
+from dataviz.levels import detect_levels, nearest_levels
+from dataviz.store import PriceStore, STORE_DIR, DATA_DIR
+
+_store = None
+# Séances utilisées pour la détection des niveaux (un an de bourse)
+LEVEL_LOOKBACK = 252
+
+
+def _init_worker(root, source_dir):
+    global _store
+    _store = PriceStore(root, source_dir)
+
+
+# Analyse d'un titre dans un processus du pool ; une erreur n'interrompt pas le lot.
+# L'index du stockage est écrit une seule fois par le processus principal.
+def _analyze_symbol(symbol):
+    try:
+        frame = _store.analysis_frame(symbol, write_index=False)
+        result = analyze(frame)
+        levels = detect_levels(frame.tail(LEVEL_LOOKBACK))
+        level_support, level_resistance = nearest_levels(levels, result['latest_price'])
+        return {'symbol': symbol, **result, 'level_support': level_support,
+                'level_resistance': level_resistance, 'error': None}
+    except Exception as exc:
+        return {'symbol': symbol, 'error': f"{type(exc).__name__}: {exc}"}
+
+
+# Une ligne par titre ; la colonne error est toujours présente, même sans titre
+def run(symbols, workers=None, root=STORE_DIR, source_dir=DATA_DIR):
+    if not symbols:
+        return pd.DataFrame(columns=['symbol', 'error'])
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(symbols) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(root, source_dir)) as pool:
+        rows = list(pool.map(_analyze_symbol, symbols, chunksize=chunksize))
+    PriceStore(root, source_dir).refresh([r['symbol'] for r in rows if r['error'] is None])
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse en lot des titres du stockage")
+    parser.add_argument('symbols', nargs='*', help="symboles à analyser (défaut : tous)")
+    parser.add_argument('-o', '--output', default='analyses.parquet', help="fichier de résultats (.parquet ou .csv)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="nombre de processus (défaut : nombre de coeurs)")
+    parser.add_argument('--store', default=STORE_DIR, help="répertoire du stockage")
+    parser.add_argument('--data', default=DATA_DIR, help="répertoire des exports CSV")
+    args = parser.parse_args(argv)
+
+    symbols = args.symbols or PriceStore(args.store, args.data).symbols()
+    if not symbols:
+        print(f"Aucun titre à analyser dans {args.data}", file=sys.stderr)
+        return 0
+    start = time.perf_counter()
+    results = run(symbols, args.workers, args.store, args.data)
+    if str(args.output).endswith('.csv'):
+        results.to_csv(args.output, index=False)
+    else:
+        results.to_parquet(args.output, index=False)
+
+    failed = results['error'].notna().sum()
+    print(f"{len(results)} titres analysés en {time.perf_counter() - start:.1f}s "
+          f"({failed} en erreur) -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Cache de résultats dérivés (tableaux de statistiques, grilles, niveaux,
+figures) partagé par toutes les sessions du processus.
+
+Contrairement à st.cache_data, les résultats ne sont ni sérialisés ni copiés
+en profondeur : les données sont partagées. Les tableaux NumPy sont marqués en
+lecture seule ; chaque appelant reçoit une copie superficielle des frames et
+séries (copy(deep=False) : mêmes données, axes et colonnes propres), qu'il peut
+modifier sans toucher l'entrée du cache (copy-on-write de pandas). Les autres
+objets (figures plotly notamment) sont partagés tels quels et ne doivent pas
+être modifiés.
+
+- budget en octets (settings.CACHE_BYTES), éviction LRU jusqu'à repasser sous
+  le budget ; un résultat plus gros que le budget est renvoyé sans être gardé ;
+- une seule construction par clé à la fois : les sessions qui demandent la même
+  clé pendant le calcul attendent son résultat ;
+- invalidation par version : quand un titre change de version, ses entrées des
+  versions précédentes sont retirées ;
+- compteurs hits / misses / evictions / invalidations (stats()).
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dataviz.settings import CACHE_BYTES
+
+
+# Taille approximative d'un résultat, en octets. Les figures plotly sont
+# mesurées par la taille de leur JSON (ce qui est envoyé au navigateur), gardée
+# par les figures figées (figures.frozen_figure) qui n'ont pas à être
+# réencodées pour être mesurées.
+def nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(nbytes(v) for v in value)
+    if isinstance(getattr(value, 'nbytes', None), int):
+        return value.nbytes
+    if hasattr(value, 'to_plotly_json'):
+        import plotly.io as pio
+        return len(pio.to_json(value, validate=False))
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+# Vue d'un résultat pour un appelant : copie superficielle des frames et séries,
+# y compris dans les tuples / listes / dictionnaires (voir le docstring du module)
+def _share(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {k: _share(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_share(v) for v in value)
+    return value
+
+
+class SharedCache:
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    # Résultat de build() pour (nom, titre, version, paramètres) ; params doit
+    # être hachable (tuples plutôt que listes)
+    def get(self, name, ticker, version, params, build):
+        key = (name, ticker, version, params)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _share(entry[0])
+                pending = self._pending.get(key)
+                owner = pending is None
+                if owner:
+                    self.misses += 1
+                    pending = self._pending[key] = threading.Event()
+            if owner:
+                break
+            # Calcul en cours dans une autre session : attente puis relecture
+            pending.wait()
+
+        try:
+            value = _freeze(build())
+            size = nbytes(value)
+            with self._lock:
+                self._invalidate(ticker, version)
+                if size <= self.max_bytes:
+                    self._entries[key] = (value, size)
+                    self.size += size
+                    self._evict()
+            return _share(value)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def _invalidate(self, ticker, version):
+        if self._versions.get(ticker, version) != version:
+            for key in [k for k in self._entries if k[1] == ticker and k[2] != version]:
+                self.size -= self._entries.pop(key)[1]
+                self.invalidations += 1
+        self._versions[ticker] = version
+
+    # Retire toutes les entrées d'un titre (toutes versions)
+    def invalidate(self, ticker):
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == ticker]:
+                self.size -= self._entries.pop(key)[1]
+                self.invalidations += 1
+            self._versions.pop(ticker, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+shared_cache = SharedCache()
@@ -0,0 +1,244 @@
+"""Statistiques par blocs sur les fichiers colonnaires, sans charger l'historique
+en mémoire : chaque colonne est lue par blocs d'au plus CHUNK_ROWS lignes,
+chaque bloc produit un agrégat partiel et les partiels sont combinés. Les blocs
+peuvent être répartis sur un pool de processus.
+
+Les résultats sont identiques bit à bit à ceux de pandas (Series.sum, mean,
+min, max, std ; valeurs manquantes ignorées, ddof=1), quels que soient la taille
+des blocs et le nombre de processus :
+- passe 1 : nombre, somme dans le type de la colonne, min, max ;
+- passe 2 (écart-type seulement) : somme des carrés des écarts à la moyenne
+  (formule en deux passes de pandas).
+Pour cela, les sommes reproduisent l'ordre d'addition de NumPy :
+- somme sans conversion de type : sommation par paires (pairwise), l'intervalle
+  étant coupé récursivement en deux (à un multiple de 8) jusqu'à PAIRWISE_ROWS
+  valeurs ; les blocs sont les feuilles de cet arbre (voir pairwise_blocks) et
+  leurs sommes sont recombinées dans le même ordre ;
+- somme avec conversion (float32 vers float64, moyenne de l'écart-type) :
+  sommes par paires de tampons de BUFFER_ROWS valeurs, accumulées dans l'ordre.
+Les colonnes entières sont sommées exactement ; la moyenne (en float64) est
+exacte tant que leur somme reste inférieure à 2**53.
+
+    python -m dataviz.chunked BOUYGUES --start 2024-01-01 --end 2024-12-31 -j 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dataviz import data
+
+CHUNK_ROWS = 1 << 20
+# Nombre de processus par défaut (0 : calcul dans le processus appelant)
+WORKERS = int(os.environ.get("DATAVIZ_STATS_WORKERS", "0"))
+
+STATS = ['mean', 'min', 'max', 'std']
+
+# Taille en dessous de laquelle NumPy ne coupe plus une somme par paires
+PAIRWISE_ROWS = 128
+# Taille des tampons des réductions avec conversion de type
+BUFFER_ROWS = np.getbufsize()
+
+
+def _read_block(cache_dir, col, dtype, start, stop):
+    return np.fromfile(data.column_file(cache_dir, col), dtype=dtype,
+                       count=stop - start, offset=start * dtype.itemsize)
+
+
+# Bloc dans son type stocké, valeurs manquantes remplacées par 0 (comme pandas
+# avant ses sommes), et masque des valeurs manquantes (None si aucune ne manque)
+def _block(cache_dir, col, dtype, start, stop):
+    x = _read_block(cache_dir, col, np.dtype(dtype), start, stop)
+    if x.dtype.kind != 'f':
+        return x, None
+    missing = np.isnan(x)
+    if not missing.any():
+        return x, None
+    x[missing] = 0
+    return x, missing
+
+
+# Blocs [start, stop) d'au plus max_rows lignes : feuilles de l'arbre de la
+# somme par paires de NumPy sur [lo, hi), dans l'ordre
+def pairwise_blocks(lo, hi, max_rows=CHUNK_ROWS):
+    n = hi - lo
+    if n <= max(max_rows, PAIRWISE_ROWS):
+        return [(lo, hi)] if n > 0 else []
+    half = n // 2
+    half -= half % 8
+    return pairwise_blocks(lo, lo + half, max_rows) + pairwise_blocks(lo + half, hi, max_rows)
+
+
+# Recombinaison des sommes des feuilles de pairwise_blocks(lo, hi, max_rows),
+# données dans l'ordre, selon le même arbre
+def pairwise_total(sums, lo, hi, max_rows=CHUNK_ROWS):
+    sums = iter(sums)
+
+    def total(lo, hi):
+        n = hi - lo
+        if n <= max(max_rows, PAIRWISE_ROWS):
+            return next(sums)
+        half = n // 2
+        half -= half % 8
+        return total(lo, lo + half) + total(lo + half, hi)
+    return total(lo, hi)
+
+
+# Passe 1 sur les lignes [start, stop) : (nombre, somme, min, max) par colonne.
+# La somme est dans le type de la colonne (entier exact pour les colonnes entières).
+def block_partials(cache_dir, dtypes, start, stop):
+    out = {}
+    for col, dtype in dtypes.items():
+        x, missing = _block(cache_dir, col, dtype, start, stop)
+        if x.dtype.kind == 'f':
+            n = len(x) - (0 if missing is None else int(np.count_nonzero(missing)))
+            total = x.sum()
+            if missing is not None:
+                x = x[~missing]
+        else:
+            n = len(x)
+            total = int(x.sum(dtype=np.uint64 if x.dtype.kind == 'u' else np.int64))
+        out[col] = (n, total, x.min() if n else np.nan, x.max() if n else np.nan)
+    return out
+
+
+# Sommes en float64 des tampons de BUFFER_ROWS lignes de [start, stop) des
+# colonnes float32 (start aligné sur le début de la plage)
+def block_buffer_sums(cache_dir, dtypes, start, stop):
+    out = {}
+    for col, dtype in dtypes.items():
+        x, _ = _block(cache_dir, col, dtype, start, stop)
+        full = len(x) // BUFFER_ROWS * BUFFER_ROWS
+        sums = list(np.add.reduce(x[:full].reshape(-1, BUFFER_ROWS), axis=1, dtype=np.float64))
+        if full < len(x):
+            sums.append(x[full:].sum(dtype=np.float64))
+        out[col] = sums
+    return out
+
+
+# Passe 2 : somme des carrés des écarts à la moyenne de chaque colonne
+def block_squares(cache_dir, dtypes, means, start, stop):
+    out = {}
+    for col, mean in means.items():
+        x, missing = _block(cache_dir, col, dtypes[col], start, stop)
+        if x.dtype.kind != 'f':
+            x = x.astype(np.float64)
+        sqr = (mean - x) ** 2
+        if missing is not None:
+            sqr[missing] = 0.0
+        out[col] = sqr.sum()
+    return out
+
+
+def _run(func, tasks, workers):
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(min(workers, len(tasks))) as pool:
+            return list(pool.map(func, *zip(*tasks)))
+    return [func(*task) for task in tasks]
+
+
+# Moyenne utilisée par pandas pour l'écart-type : somme en float64 (conversion
+# par tampons pour les colonnes float32) divisée par le nombre de valeurs dans
+# le type des valeurs
+def _variance_mean(cache_dir, dtypes, result, lo, hi, chunk_rows, workers):
+    means = {}
+    narrow = {col: dtype for col, dtype in dtypes.items()
+              if np.dtype(dtype) == np.float32 and result[col]['count'] > 1}
+    if narrow:
+        step = -(-chunk_rows // BUFFER_ROWS) * BUFFER_ROWS
+        blocks = [(start, min(start + step, hi)) for start in range(lo, hi, step)]
+        parts = _run(block_buffer_sums, [(cache_dir, narrow, start, stop) for start, stop in blocks], workers)
+    for col, dtype in dtypes.items():
+        n = result[col]['count']
+        if n <= 1:
+            continue
+        if col in narrow:
+            total = np.float64(0.0)
+            for part in parts:
+                for value in part[col]:
+                    total += value
+            means[col] = total / np.float32(n)
+        else:
+            means[col] = np.float64(result[col]['sum']) / np.float64(n)
+    return means
+
+
+# Statistiques des lignes [lo, hi) des colonnes demandées d'un répertoire
+# colonnaire (voir data.write_columns) : {colonne: {count, sum, mean, min, max, std}}.
+# La seconde passe n'a lieu que si l'écart-type est demandé.
+def column_stats(cache_dir, columns, lo=0, hi=None, chunk_rows=CHUNK_ROWS, workers=WORKERS, with_std=True):
+    meta = data.read_meta(cache_dir)
+    hi = meta['rows'] if hi is None else min(hi, meta['rows'])
+    lo = min(lo, hi)
+    dtypes = {col: np.dtype(meta['dtypes'][col]) for col in columns}
+    blocks = pairwise_blocks(lo, hi, chunk_rows)
+
+    partials = _run(block_partials, [(cache_dir, dtypes, start, stop) for start, stop in blocks], workers)
+    result = {}
+    for col, dtype in dtypes.items():
+        parts = [p[col] for p in partials]
+        n = sum(p[0] for p in parts)
+        present = [p for p in parts if p[0]]
+        if dtype.kind == 'f':
+            total = pairwise_total([p[1] for p in parts], lo, hi, chunk_rows) if parts else dtype.type(0)
+            mean = total / dtype.type(n) if n else np.nan
+        else:
+            total = (np.uint64 if dtype.kind == 'u' else np.int64)(sum(p[1] for p in parts))
+            mean = np.float64(total) / np.float64(n) if n else np.nan
+        result[col] = {
+            'count': n,
+            'sum': total,
+            'mean': mean,
+            'min': min(p[2] for p in present) if n else np.nan,
+            'max': max(p[3] for p in present) if n else np.nan,
+            'std': np.nan,
+        }
+
+    if with_std:
+        means = _variance_mean(cache_dir, dtypes, result, lo, hi, chunk_rows, workers)
+        if means:
+            squares = _run(block_squares, [(cache_dir, dtypes, means, start, stop) for start, stop in blocks], workers)
+            for col, mean in means.items():
+                dtype = dtypes[col] if dtypes[col].kind == 'f' else np.dtype(np.float64)
+                var = pairwise_total([s[col] for s in squares], lo, hi, chunk_rows) / (
+                    dtype.type(result[col]['count']) - dtype.type(1))
+                result[col]['std'] = np.sqrt(var.astype(dtype))
+    return result
+
+
+# Tableau colonnes x statistiques, au format de RangeStats.summary
+def summary(cache_dir, columns, lo=0, hi=None, stats=STATS, chunk_rows=CHUNK_ROWS, workers=WORKERS):
+    values = column_stats(cache_dir, columns, lo, hi, chunk_rows, workers, with_std='std' in stats)
+    return pd.DataFrame(
+        {stat: [values[col][stat] for col in columns] for stat in stats},
+        index=list(columns),
+    )
+
+
+def main(argv=None):
+    from dataviz.store import PriceStore
+
+    parser = argparse.ArgumentParser(description="Statistiques par blocs d'un titre du stockage")
+    parser.add_argument('symbol')
+    parser.add_argument('--columns', default=','.join(data.NUMERIC_COLUMNS))
+    parser.add_argument('--start', default=None, help="première date (incluse)")
+    parser.add_argument('--end', default=None, help="dernière date (incluse)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('-j', '--workers', type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+
+    store = PriceStore()
+    first, last = store.date_bounds(args.symbol)
+    dates = store.open(args.symbol, ['Date'])['Date'].to_numpy()
+    lo, hi = data.date_index_range(dates, args.start or first, args.end or last)
+    result = summary(store.symbol_dir(args.symbol), args.columns.split(','), lo, hi,
+                     STATS + ['count', 'sum'], args.chunk_rows, args.workers)
+    print(result.to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
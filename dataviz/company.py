@@ -0,0 +1,112 @@
+"""Graphiques de la page Entreprise (répartition géographique et par secteur du
+chiffre d'affaires), construits à partir de src/entreprise.json.
+
+Les figures sont construites une fois (au premier affichage ou à l'avance avec
+python -m dataviz.company) et enregistrées sérialisées dans .cache/figures ; le
+nom du fichier contient un hash des données et de la version de plotly. La page
+ne relit que ce JSON : ni plotly.express ni la construction des figures ne sont
+sur le chemin d'affichage."""
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+COMPANY_FILE = Path("src") / "entreprise.json"
+FIGURE_DIR = Path(".cache") / "figures"
+
+
+def load_company(path=COMPANY_FILE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Part du CA au format affiché dans les tableaux ("48,7%")
+def format_share(value):
+    return f"{value:.1f}%".replace('.', ',')
+
+
+def geo_figure(company):
+    import plotly.express as px
+
+    fig = px.pie(
+        values=[row['part'] for row in company['geographie']],
+        names=[row['zone'] for row in company['geographie']],
+        title='Répartition Géographique du Chiffre d\'Affaires',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='%{label}<br>%{value}% du CA<extra></extra>'
+    )
+
+    fig.update_layout(
+        showlegend=False,
+        height=600
+    )
+    return fig
+
+
+def sector_figure(company):
+    import plotly.express as px
+
+    secteur_values = [row['part'] for row in company['secteurs']]
+    fig = px.bar(
+        x=secteur_values,
+        y=[row['secteur'] for row in company['secteurs']],
+        orientation='h',
+        title='Répartition du CA par Secteur d\'Activité',
+        labels={'x': 'Part du CA (%)', 'y': 'Secteur'},
+        color=secteur_values,
+        color_continuous_scale='Blues'
+    )
+
+    fig.update_traces(
+        text=[f'{v}%' for v in secteur_values],
+        textposition='outside'
+    )
+
+    fig.update_layout(
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+FIGURES = {'geographie': geo_figure, 'secteurs': sector_figure}
+
+
+def _figure_file(path, out_dir):
+    import plotly
+
+    digest = hashlib.sha256(Path(path).read_bytes() + plotly.__version__.encode()).hexdigest()[:16]
+    return Path(out_dir) / f"entreprise-{digest}.json"
+
+
+# Construit et enregistre les figures si les données ont changé ; renvoie le fichier
+def build_figures(path=COMPANY_FILE, out_dir=FIGURE_DIR):
+    target = _figure_file(path, out_dir)
+    if target.exists():
+        return target
+
+    import plotly.io as pio
+
+    company = load_company(path)
+    figures = {name: json.loads(pio.to_json(build(company), validate=False)) for name, build in FIGURES.items()}
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(figures, f)
+    tmp.replace(target)
+    return target
+
+
+# Figures sérialisées (dictionnaires plotly), par nom
+def load_figures(path=COMPANY_FILE, out_dir=FIGURE_DIR):
+    with open(build_figures(path, out_dir), encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    print(build_figures(*sys.argv[1:2]))
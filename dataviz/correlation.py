@@ -0,0 +1,153 @@
+"""Corrélations et covariances glissantes entre titres, mises à jour barre par
+barre à partir de sommes de co-moments.
+
+Pour chaque couple (i, j), seules les dates où les deux titres ont un rendement
+comptent (observations complètes par paire, comme DataFrame.cov / corr). Sur
+la fenêtre, on tient à jour, pour toutes les paires à la fois (matrices N x N) :
+    n    = nombre de dates communes
+    Sx   = somme des rendements de i sur ces dates
+    Sxx  = somme de leurs carrés
+    Sxy  = somme des produits des rendements de i et de j
+Ajouter une barre ou retirer la plus ancienne coûte quelques produits
+extérieurs, soit O(N²). Les sommes sont recalculées entièrement toutes les
+window barres (coût amorti O(N²)) pour borner la dérive d'arrondi.
+
+La fenêtre porte sur les window dernières dates de l'univers aligné (voir
+screener.Universe) ; les rendements viennent de screener.session_returns.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class RollingComoments:
+    def __init__(self, symbols, window, min_periods=None):
+        self.symbols = list(symbols)
+        self.window = window
+        # Dates communes minimales pour qu'une paire ait une valeur
+        self.min_periods = max(2, window // 2) if min_periods is None else min_periods
+        self.last_date = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        n = len(self.symbols)
+        self._rows = np.full((self.window, n), np.nan)
+        self._dates = np.full(self.window, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self._pos = 0
+        self._filled = 0
+        self._since_rebuild = 0
+        self._n = np.zeros((n, n))
+        self._sx = np.zeros((n, n))
+        self._sxx = np.zeros((n, n))
+        self._sxy = np.zeros((n, n))
+
+    # Recalcul complet des sommes sur les barres de la fenêtre
+    def _rebuild(self):
+        rows = self._rows[:self._filled]
+        present = ~np.isnan(rows)
+        m = present.astype(np.float64)
+        x = np.where(present, rows, 0.0)
+        self._n = m.T @ m
+        self._sx = x.T @ m
+        self._sxx = (x * x).T @ m
+        self._sxy = x.T @ x
+        self._since_rebuild = 0
+
+    def _add(self, x, sign):
+        present = ~np.isnan(x)
+        m = present.astype(np.float64)
+        x = np.where(present, x, 0.0)
+        self._n += sign * np.outer(m, m)
+        self._sx += sign * np.outer(x, m)
+        self._sxx += sign * np.outer(x * x, m)
+        self._sxy += sign * np.outer(x, x)
+
+    # Ajout d'une barre de rendements (NaN pour un titre sans séance)
+    def _push(self, x, date):
+        x = np.asarray(x, dtype=np.float64)
+        if self._filled == self.window:
+            self._add(self._rows[self._pos], -1.0)
+        else:
+            self._filled += 1
+        self._rows[self._pos] = x
+        self._dates[self._pos] = date
+        self._pos = (self._pos + 1) % self.window
+        self._add(x, 1.0)
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild()
+        self.last_date = date
+
+    # Ajout de plusieurs barres (dates croissantes). Au-delà d'une fenêtre,
+    # seules les window dernières comptent et les sommes sont recalculées.
+    def _extend(self, dates, returns):
+        if len(returns) >= self.window:
+            self._rows = np.array(returns[-self.window:], dtype=np.float64)
+            self._dates = np.array(dates[-self.window:], dtype='datetime64[ns]')
+            self._pos = 0
+            self._filled = self.window
+            self._rebuild()
+            self.last_date = self._dates[-1]
+            return
+        for date, x in zip(dates, returns):
+            self._push(x, date)
+
+    # Barres de la fenêtre, de la plus ancienne à la plus récente
+    def window_rows(self):
+        order = (np.arange(self._filled) + self._pos - self._filled) % self.window
+        return self._dates[order], self._rows[order]
+
+    # Met la fenêtre à jour depuis les rendements alignés (dates, rendements
+    # dates x titres) : seules les barres postérieures à la dernière ajoutée
+    # sont traitées. Si l'historique déjà pris en compte a changé (export
+    # corrigé), la fenêtre est reconstruite.
+    def update(self, dates, returns):
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        with self._lock:
+            if self.last_date is not None:
+                held_dates, held = self.window_rows()
+                idx = np.searchsorted(dates, held_dates)
+                idx_ok = idx < len(dates)
+                if not (idx_ok.all() and np.array_equal(dates[idx], held_dates)
+                        and np.array_equal(returns[idx], held, equal_nan=True)):
+                    self._reset()
+                    self.last_date = None
+            start = 0 if self.last_date is None else int(np.searchsorted(dates, self.last_date, side='right'))
+            self._extend(dates[start:], returns[start:])
+        return self
+
+    # Covariance et variances de chaque paire sur ses dates communes
+    def _moments(self):
+        n = self._n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = (self._sxy - self._sx * self._sx.T / n) / (n - 1)
+            var = (self._sxx - self._sx * self._sx / n) / (n - 1)
+        enough = n >= self.min_periods
+        return np.where(enough, cov, np.nan), np.where(enough, var, np.nan)
+
+    def cov(self):
+        with self._lock:
+            cov, _ = self._moments()
+        return pd.DataFrame(cov, index=self.symbols, columns=self.symbols)
+
+    def corr(self):
+        with self._lock:
+            cov, var = self._moments()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(np.diag(self._n) >= self.min_periods, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+    # Nombre de dates communes de chaque paire sur la fenêtre
+    def counts(self):
+        with self._lock:
+            return pd.DataFrame(self._n.astype(np.int64), index=self.symbols, columns=self.symbols)
+
+
+# Corrélation glissante d'un couple de séries de rendements, sur les dates
+# communes de chaque fenêtre (courbe de la page Correlations)
+def rolling_pair_corr(x, y, window, min_periods=None):
+    min_periods = max(2, window // 2) if min_periods is None else min_periods
+    return pd.Series(x).rolling(window, min_periods=min_periods).corr(pd.Series(y)).to_numpy()
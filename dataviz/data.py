@@ -0,0 +1,344 @@
+"""Couche d'accès aux données de cours : le CSV est parsé une seule fois puis
+conservé sur disque sous forme colonnaire (un fichier binaire par colonne).
+Les nouvelles lignes d'un export sont ajoutées sans reparser l'historique."""
+import hashlib
+import io
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = ['Open', 'High', 'Low', 'Last', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover', 'vwap']
+COLUMNS = ['Date'] + NUMERIC_COLUMNS
+
+# Profils de stockage : type de chaque colonne sur disque (float64 par défaut).
+# compact : prix en float32 (7 chiffres significatifs), comptages en uint32 ; le
+# chiffre d'affaires reste en float64 (montants élevés, sommés par les graphiques).
+# La date reste en datetime64[ns] : un encodage plus court imposerait une copie
+# décodée à chaque lecture, là où le memory-map est aujourd'hui sans copie.
+# Les calculs sensibles (indicateurs, statistiques, sommes) repassent en float64.
+STORAGE_PROFILES = {
+    'full': {},
+    'compact': {
+        'Open': 'float32',
+        'High': 'float32',
+        'Low': 'float32',
+        'Last': 'float32',
+        'Close': 'float32',
+        'vwap': 'float32',
+        'Number of Shares': 'uint32',
+        'Number of Trades': 'uint32',
+    },
+}
+
+META_FILE = "meta.json"
+# Version du format sur disque : l'incrémenter force la reconstruction des caches
+FORMAT_VERSION = 5
+# Taille du début et de la fin du contenu déjà ingéré contrôlés à chaque ajout
+# incrémental
+DIGEST_BYTES = 1 << 16
+
+_lock = threading.Lock()
+
+
+# Parsing typé de l'export (séparateur ';', virgule décimale), trié par date croissante.
+# Les dates sont au format ISO : jour seul (export quotidien) ou jour et heure
+# (export intraday, une ligne par barre).
+def parse_csv(path):
+    df = pd.read_csv(
+        path,
+        sep=';',
+        decimal=',',
+        usecols=COLUMNS,
+        dtype={col: 'float64' for col in NUMERIC_COLUMNS},
+        parse_dates=['Date'],
+        date_format='ISO8601',
+    )
+    df['Date'] = df['Date'].astype('datetime64[ns]')
+    return df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def _fits_unsigned(values, dtype):
+    info = np.iinfo(dtype)
+    with np.errstate(invalid='ignore'):
+        return bool(np.all((values >= 0) & (values <= info.max) & (values == np.round(values))))
+
+
+# Types de stockage des colonnes de df pour un profil. Une colonne de comptage
+# qui ne tient pas dans un uint32 (valeurs non entières, négatives, manquantes ou
+# trop grandes) garde son type d'origine.
+def storage_dtypes(df, profile='full'):
+    targets = STORAGE_PROFILES[profile]
+    dtypes = {}
+    for col in df.columns:
+        dtype = np.dtype(targets.get(col, df[col].dtype))
+        if dtype.kind == 'u' and not _fits_unsigned(df[col].to_numpy(), dtype):
+            dtype = df[col].dtype
+        dtypes[col] = str(dtype)
+    return dtypes
+
+
+# Les nouvelles lignes df tiennent-elles dans les types déjà stockés ?
+def fits_dtypes(df, dtypes):
+    return all(
+        _fits_unsigned(df[col].to_numpy(), np.dtype(dtypes[col]))
+        for col in df.columns if np.dtype(dtypes[col]).kind == 'u'
+    )
+
+
+def column_file(cache_dir, col):
+    return Path(cache_dir) / (col.replace(' ', '_') + '.bin')
+
+
+def read_meta(cache_dir):
+    try:
+        with open(Path(cache_dir) / META_FILE) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != FORMAT_VERSION:
+        return None
+    return meta
+
+
+def write_meta(cache_dir, meta):
+    path = Path(cache_dir) / META_FILE
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+
+
+# Écriture atomique colonne par colonne : un lecteur qui a déjà mappé l'ancien
+# fichier garde l'ancien inode, les nouveaux lecteurs voient la nouvelle version
+def write_columns(df, cache_dir):
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for col in df.columns:
+        path = column_file(cache_dir, col)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(df[col].to_numpy().tobytes())
+        os.replace(tmp, path)
+
+
+# Ajout en fin de colonne. Les fichiers sont d'abord ramenés à la longueur connue
+# du méta, pour effacer un éventuel ajout interrompu.
+def append_columns(df, cache_dir, meta):
+    for col in df.columns:
+        dtype = np.dtype(meta['dtypes'][col])
+        with open(column_file(cache_dir, col), 'r+b') as f:
+            f.truncate(meta['rows'] * dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(df[col].to_numpy(dtype=dtype).tobytes())
+
+
+# Ouverture en lecture seule et sans copie (memory-map) des colonnes demandées.
+# Le nombre de lignes vient du méta : un ajout concurrent reste invisible.
+def read_columns(cache_dir, columns=COLUMNS):
+    meta = read_meta(cache_dir)
+    arrays = {}
+    for col in columns:
+        dtype = np.dtype(meta['dtypes'][col])
+        if meta['rows']:
+            arrays[col] = np.memmap(column_file(cache_dir, col), dtype=dtype, mode='r', shape=(meta['rows'],))
+        else:
+            arrays[col] = np.empty(0, dtype=dtype)
+    return pd.DataFrame(arrays, copy=False)
+
+
+# Empreintes du début et de la fin du corps du fichier (hors en-tête), pour
+# vérifier avant un ajout que le contenu déjà ingéré n'a pas changé. Une
+# modification de même taille située entre ces deux zones n'est pas détectée :
+# la vérifier imposerait de relire tout l'historique à chaque ajout.
+def _body_digests(path, size, body_offset):
+    length = min(DIGEST_BYTES, size - body_offset)
+    with open(path, 'rb') as f:
+        f.seek(body_offset)
+        head = hashlib.sha256(f.read(length)).hexdigest()
+        f.seek(size - length)
+        return {
+            'digest_len': length,
+            'head_sha256': head,
+            'tail_sha256': hashlib.sha256(f.read(length)).hexdigest(),
+        }
+
+
+def _digest_at(f, offset, length):
+    f.seek(offset)
+    return hashlib.sha256(f.read(length)).hexdigest()
+
+
+def _line_date(line):
+    return line.split(b';', 1)[0].strip().decode(errors='replace')
+
+
+# La ligne porte-t-elle l'horodatage last (dernière ligne ingérée) ?
+def _is_last(line, last):
+    try:
+        return pd.Timestamp(_line_date(line)) == last
+    except ValueError:
+        return False
+
+
+def _build_meta(path, raw, df, stat):
+    header, _, body = raw.partition(b'\n')
+    head = body.split(b'\n', 1)[0].rstrip(b'\r')
+    last_date = str(df['Date'].iloc[-1].date()) if len(df) else None
+    version = hashlib.sha256(raw).hexdigest()
+    return {
+        'format': FORMAT_VERSION,
+        'source': str(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'version': version,
+        # Version de la dernière reconstruction complète : tant qu'elle ne change pas,
+        # les lignes déjà ingérées sont inchangées et seules des lignes ont été ajoutées
+        'base_version': version,
+        'rows': len(df),
+        'dtypes': {col: str(df[col].dtype) for col in df.columns},
+        'first_date': str(df['Date'].iloc[0].date()) if len(df) else None,
+        'last_date': last_date,
+        'header': header.rstrip(b'\r').decode(),
+        # Ligne la plus récente de l'export (en tête) et sa position en octets ;
+        # l'ajout incrémental n'est possible que si elle porte la dernière date
+        'head': head.decode() if head and _is_last(head, df['Date'].iloc[-1]) else None,
+        'head_offset': len(header) + 1,
+        **_body_digests(path, stat.st_size, len(header) + 1),
+    }
+
+
+# Recherche des lignes ajoutées en tête de l'export depuis la dernière ingestion.
+# Renvoie (octets des nouvelles lignes, position de la première ligne de données), ou
+# None si le fichier ne prolonge pas simplement le contenu déjà ingéré : ancienne
+# tête absente, taille du reste différente, ou début / fin de l'ancien contenu
+# modifiés. Le coût est proportionnel au nombre de nouvelles lignes.
+def find_new_rows(path, meta, size):
+    if not meta.get('head'):
+        return None
+    head = meta['head'].encode()
+    # Horodatage de la dernière ligne ingérée, tel qu'écrit dans l'export (format
+    # ISO commun à toutes les lignes : l'ordre des chaînes est celui des dates)
+    last = _line_date(head)
+    old_body = meta['size'] - meta['head_offset']
+    with open(path, 'rb') as f:
+        if f.readline().rstrip(b'\r\n') != meta['header'].encode():
+            return None
+        body_offset = offset = f.tell()
+        new_lines = []
+        for line in f:
+            if _line_date(line) > last:
+                new_lines.append(line)
+                offset += len(line)
+                continue
+            # Première ligne déjà connue : elle doit être l'ancienne tête, le
+            # reste du fichier doit avoir exactement la taille de l'ancien contenu
+            # et en garder le début et la fin (voir _body_digests)
+            if line.rstrip(b'\r\n') != head or offset + old_body != size:
+                return None
+            length = meta['digest_len']
+            if (_digest_at(f, offset, length) != meta['head_sha256']
+                    or _digest_at(f, size - length, length) != meta['tail_sha256']):
+                return None
+            return b''.join(new_lines), body_offset
+    return None
+
+
+# Met à jour la copie colonnaire si le CSV a changé et renvoie ses métadonnées.
+# Le mtime sert de test rapide ; les lignes ajoutées en tête sont ingérées seules,
+# toute autre modification détectée par find_new_rows déclenche une
+# reconstruction complète.
+# meta['appended_from'] donne l'indice de la première ligne ajoutée au dernier passage.
+def sync_cache(path, cache_dir, profile='full'):
+    path, cache_dir = Path(path), Path(cache_dir)
+    with _lock:
+        stat = path.stat()
+        meta = read_meta(cache_dir)
+        if meta is not None and meta.get('profile', 'full') != profile:
+            meta = None
+        if meta is not None and meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            return meta
+
+        delta = find_new_rows(path, meta, stat.st_size) if meta is not None else None
+        if delta is not None:
+            new_bytes, body_offset = delta
+            new_rows = parse_csv(io.BytesIO(meta['header'].encode() + b'\n' + new_bytes)) if new_bytes else None
+        # Des comptages qui ne tiennent plus dans les types stockés imposent une reconstruction
+        if delta is not None and (new_rows is None or fits_dtypes(new_rows, meta['dtypes'])):
+            meta = dict(meta, mtime_ns=stat.st_mtime_ns, size=stat.st_size, appended_from=meta['rows'])
+            if new_rows is not None:
+                append_columns(new_rows, cache_dir, meta)
+                head = new_bytes.split(b'\n', 1)[0].rstrip(b'\r')
+                last = new_rows['Date'].iloc[-1]
+                meta.update(
+                    version=hashlib.sha256(meta['version'].encode() + new_bytes).hexdigest(),
+                    rows=meta['rows'] + len(new_rows),
+                    last_date=str(last.date()),
+                    head=head.decode() if _is_last(head, last) else None,
+                    head_offset=body_offset,
+                )
+            meta.update(_body_digests(path, stat.st_size, meta['head_offset']))
+            write_meta(cache_dir, meta)
+            return meta
+
+        raw = path.read_bytes()
+        df = parse_csv(io.BytesIO(raw))
+        df = df.astype(storage_dtypes(df, profile))
+        write_columns(df, cache_dir)
+        meta = _build_meta(path, raw, df, stat)
+        meta['profile'] = profile
+        meta['appended_from'] = 0
+        write_meta(cache_dir, meta)
+        return meta
+
+
+# Écriture d'un frame déjà calculé (barres intraday rééchantillonnées par exemple),
+# sans export CSV associé : le contenu stocké fait alors foi
+def write_frame(df, cache_dir, version, source=None, profile='full'):
+    df = df[COLUMNS]
+    df = df.astype(storage_dtypes(df, profile))
+    with _lock:
+        write_columns(df, cache_dir)
+        meta = {
+            'format': FORMAT_VERSION,
+            'source': source,
+            'version': version,
+            'base_version': version,
+            'profile': profile,
+            'rows': len(df),
+            'dtypes': {col: str(df[col].dtype) for col in df.columns},
+            'first_date': str(df['Date'].iloc[0].date()) if len(df) else None,
+            'last_date': str(df['Date'].iloc[-1].date()) if len(df) else None,
+            'head': None,
+            'appended_from': 0,
+        }
+        write_meta(cache_dir, meta)
+        return meta
+
+
+# Identifiant de version du jeu de données : hash du CSV, chaîné à chaque ajout
+def dataset_version(path, cache_dir, profile='full'):
+    return sync_cache(path, cache_dir, profile)['version']
+
+
+# Lignes dont la date est comprise entre start et end inclus (dates calendaires).
+# Recherche dichotomique sur la colonne Date triée : O(log n), et le résultat est une
+# vue sur les colonnes (aucune copie des données).
+def date_slice(df, start, end):
+    lo, hi = date_index_range(df['Date'].to_numpy(), start, end)
+    return df.iloc[lo:hi]
+
+
+# Intervalle de lignes [lo, hi) couvrant les dates start..end incluses
+def date_index_range(dates, start, end):
+    lo = np.searchsorted(dates, np.datetime64(start, 'D'), side='left')
+    hi = np.searchsorted(dates, np.datetime64(end, 'D') + np.timedelta64(1, 'D'), side='left')
+    return int(lo), int(hi)
+
+
+def read_prices(path, cache_dir, profile='full'):
+    sync_cache(path, cache_dir, profile)
+    return read_columns(cache_dir)
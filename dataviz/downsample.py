@@ -0,0 +1,95 @@
+"""Réduction côté serveur du nombre de points envoyés aux graphiques : regroupement
+des barres OHLCV et décimation LTTB des courbes."""
+import numpy as np
+import pandas as pd
+
+# Nombre maximal de points par trace envoyée au navigateur
+MAX_POINTS = 1500
+
+VOLUME_COLUMNS = ['Number of Shares', 'Number of Trades', 'Turnover']
+
+
+# Bornes de seaux de taille égale (en nombre de lignes) couvrant n lignes
+def bucket_starts(n, max_points=MAX_POINTS):
+    size = -(-n // max_points)
+    return np.arange(0, n, size)
+
+
+# Première (ou dernière) valeur renseignée de chaque seau [starts[i], starts[i + 1]),
+# NaN s'il n'y en a pas
+def edge_values(x, starts, last=False):
+    x = np.asarray(x, dtype=np.float64)
+    valid = ~np.isnan(x)
+    rows = np.where(valid, np.arange(len(x)), -1 if last else len(x))
+    picked = (np.maximum if last else np.minimum).reduceat(rows, starts)
+    found = (picked >= 0) & (picked < len(x))
+    return np.where(found, x[np.clip(picked, 0, len(x) - 1)], np.nan)
+
+
+# Regroupement en barres plus grossières : open=premier, high=max, low=min,
+# close=dernier, volumes sommés, valeurs manquantes ignorées (comme
+# resample().agg de pandas). La date d'une barre est celle de sa première ligne.
+# Renvoie le frame inchangé s'il tient déjà dans le budget de points.
+def resample_ohlcv(df, max_points=MAX_POINTS):
+    n = len(df)
+    if n <= max_points:
+        return df
+    starts = bucket_starts(n, max_points)
+    out = {
+        'Date': df['Date'].to_numpy()[starts],
+        'Open': edge_values(df['Open'].to_numpy(), starts),
+        'High': np.fmax.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(), starts),
+        'Close': edge_values(df['Close'].to_numpy(), starts, last=True),
+    }
+    # Sommes en float64 : les comptages stockés en uint32 déborderaient
+    for col in VOLUME_COLUMNS:
+        if col in df:
+            x = df[col].to_numpy().astype(np.float64)
+            out[col] = np.add.reduceat(np.where(np.isnan(x), 0.0, x), starts)
+    return pd.DataFrame(out)
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    return x.astype(np.float64)
+
+
+# Largest-Triangle-Three-Buckets : indices des n_out points qui préservent au mieux
+# la forme de la courbe (premier et dernier points toujours conservés)
+def lttb_indices(x, y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges[-1] = n - 1
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:nhi].mean()
+        avg_y = y[hi:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+# Décimation d'une courbe (x, y) ; les valeurs manquantes (début d'une moyenne
+# mobile par exemple) sont écartées avant la sélection des points
+def decimate(x, y, max_points=MAX_POINTS):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    if len(y) <= max_points:
+        return x, y
+    idx = lttb_indices(x, y, max_points)
+    return x[idx], y[idx]
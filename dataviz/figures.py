@@ -0,0 +1,261 @@
+"""Construction des graphiques du dashboard à partir de tableaux NumPy ; les
+figures sont gardées dans le cache partagé par toutes les sessions du processus
+(voir dataviz.cache).
+
+Les tableaux NumPy numériques sont sérialisés par plotly en tampons binaires
+base64 ; les dates sont donc passées en millisecondes (float64) plutôt qu'en
+chaînes ISO, et les courbes longues sont rendues en WebGL (voir
+settings.CHART_MODE).
+
+Les figures mises en cache sont figées (voir frozen_figure) : leur
+dictionnaire n'est calculé qu'une fois, et st.plotly_chart n'a plus qu'à
+l'encoder en JSON à chaque réexécution.
+
+plotly n'est importé qu'à la construction de la première figure."""
+import functools
+
+import numpy as np
+
+from dataviz.cache import shared_cache
+from dataviz.downsample import resample_ohlcv, decimate
+from dataviz.settings import CHART_MODE, WEBGL_THRESHOLD
+
+
+# Dates en millisecondes depuis l'époque, pour une transmission binaire ; l'axe
+# doit alors être déclaré de type 'date' (voir date_axes). Inchangées en mode svg.
+def time_values(dates):
+    dates = np.asarray(dates)
+    if CHART_MODE == 'svg' or dates.dtype.kind != 'M':
+        return dates
+    ms = dates.astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+    ms[np.isnat(dates)] = np.nan
+    return ms
+
+
+def date_axes(fig):
+    return fig.update_xaxes(type='date')
+
+
+# Courbe (x, y) : Scattergl au-delà de WEBGL_THRESHOLD points, Scatter sinon.
+# Les valeurs restent dans leur type flottant (float32 en profil compact).
+def line_trace(x, y, **kwargs):
+    import plotly.graph_objects as go
+
+    y = np.asarray(y)
+    if y.dtype.kind != 'f':
+        y = y.astype(np.float64)
+    webgl = CHART_MODE != 'svg' and len(y) > WEBGL_THRESHOLD
+    return (go.Scattergl if webgl else go.Scatter)(x=time_values(x), y=y, **kwargs)
+
+
+# Classe des figures figées, créée au premier usage (import de plotly différé).
+# st.plotly_chart lit une figure par to_dict() (recopie profonde de toutes les
+# données par plotly) avant de l'encoder : ici, to_dict renvoie une copie
+# superficielle du dictionnaire calculé une fois, traces comprises (l'encodage
+# retire leur champ uid). La taille du JSON est mesurée au premier accès à
+# nbytes (budget du cache partagé, voir cache.nbytes), puis gardée.
+@functools.cache
+def _frozen_type():
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    class FrozenFigure(go.Figure):
+        def __init__(self, payload):
+            super().__init__()
+            self._payload = payload
+            self._nbytes = None
+
+        def to_dict(self):
+            out = dict(self._payload)
+            out['data'] = [dict(trace) for trace in self._payload['data']]
+            return out
+
+        def to_plotly_json(self):
+            return self.to_dict()
+
+        @property
+        def nbytes(self):
+            if self._nbytes is None:
+                self._nbytes = len(pio.to_json(self._payload, validate=False))
+            return self._nbytes
+
+    return FrozenFigure
+
+
+# Figure figée à partir d'une figure plotly ou de son dictionnaire : ses
+# propriétés (fig.data, fig.layout) ne sont pas renseignées, elle ne sert qu'à
+# l'affichage (st.plotly_chart) et à to_dict()
+def frozen_figure(fig):
+    return _frozen_type()(fig if isinstance(fig, dict) else fig.to_dict())
+
+
+# Figure figée mise en cache par (type de graphique, titre, version des données,
+# période). Les figures sont partagées entre sessions : les appelants ne doivent
+# pas les modifier.
+def cached_figure(chart, ticker, version, date_range, build):
+    return shared_cache.get('figure:' + chart, ticker, version, tuple(date_range),
+                            lambda: frozen_figure(build()))
+
+
+# Points des moyennes mobiles : à la dernière ligne de chaque barre précalculée
+# (colonne end, voir dataviz.rollups), sinon courbe journalière décimée
+def _bar_points(df, bars, column):
+    if bars is not None and 'end' in bars:
+        ends = bars['end'].to_numpy()
+        return df['Date'].to_numpy()[ends], df[column].to_numpy()[ends]
+    return decimate(df['Date'].to_numpy(), df[column].to_numpy())
+
+
+# Graphique OHLC + moyennes mobiles + volume ; df doit contenir MA20 et MA50.
+# bars : barres précalculées de la période (rollups.bars), sinon regroupement de df.
+def price_figure(df, ticker, bars=None):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=2, cols=1,
+                        shared_xaxes=True,
+                        vertical_spacing=0.05,
+                        row_heights=[0.7, 0.3],
+                        subplot_titles=('Prix de Clôture', 'Volume'))
+
+    # Barres regroupées pour borner le nombre de points envoyés au navigateur :
+    # plus la période choisie est courte, plus les barres sont fines
+    sampled = bars
+    if bars is None:
+        bars = resample_ohlcv(df)
+    dates = time_values(bars['Date'].to_numpy())
+    opens = bars['Open'].to_numpy()
+    closes = bars['Close'].to_numpy()
+
+    fig.add_trace(
+        go.Candlestick(
+            x=dates,
+            open=opens,
+            high=bars['High'].to_numpy(),
+            low=bars['Low'].to_numpy(),
+            close=closes,
+            name=ticker
+        ),
+        row=1, col=1
+    )
+
+    # Moyennes mobiles (colonnes MA20/MA50 du moteur d'indicateurs), décimées
+    for window, color in ((20, 'orange'), (50, 'blue')):
+        ma_x, ma_y = _bar_points(df, sampled, f'MA{window}')
+        fig.add_trace(
+            line_trace(
+                ma_x,
+                ma_y,
+                name=f'MA {window}',
+                line=dict(color=color, width=1)
+            ),
+            row=1, col=1
+        )
+
+    # Volume, coloré selon le sens de la barre (0/1 et échelle à deux couleurs
+    # plutôt qu'une liste de noms de couleurs)
+    fig.add_trace(
+        go.Bar(
+            x=dates,
+            y=bars['Number of Shares'].to_numpy(),
+            name='Volume',
+            marker=dict(color=(closes < opens).astype(np.uint8), cmin=0, cmax=1,
+                        colorscale=[[0, 'green'], [1, 'red']])
+        ),
+        row=2, col=1
+    )
+
+    fig.update_layout(
+        title='Graphique OHLC et Volume',
+        xaxis_rangeslider_visible=False,
+        height=800,
+        showlegend=True,
+        hovermode='x unified'
+    )
+    return date_axes(fig)
+
+
+# Prix de clôture comparé au VWAP
+# (avec des barres précalculées : clôture et VWAP pondéré par les volumes de chaque barre)
+def vwap_figure(df, bars=None):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    if bars is not None and 'end' in bars:
+        close_x, close_y = _bar_points(df, bars, 'Close')
+        vwap_x, vwap_y = close_x, bars['vwap'].to_numpy()
+    else:
+        dates = df['Date'].to_numpy()
+        close_x, close_y = decimate(dates, df['Close'].to_numpy())
+        vwap_x, vwap_y = decimate(dates, df['vwap'].to_numpy())
+
+    fig.add_trace(
+        line_trace(
+            close_x,
+            close_y,
+            name='Prix de Clôture',
+            line=dict(color='blue', width=2)
+        )
+    )
+
+    fig.add_trace(
+        line_trace(
+            vwap_x,
+            vwap_y,
+            name='VWAP',
+            line=dict(color='purple', width=2, dash='dash')
+        )
+    )
+
+    fig.update_layout(
+        title='Prix de Clôture vs VWAP',
+        xaxis_title='Date',
+        yaxis_title='Prix (€)',
+        hovermode='x unified'
+    )
+    return date_axes(fig)
+
+
+# Barre en cours (ligne de live.live_row) ajoutée par-dessus une figure de
+# l'historique déjà construite (figée, voir cached_figure). La figure partagée
+# n'est pas modifiée : sa copie superficielle et les traces ajoutées forment une
+# nouvelle figure figée, sans validation plotly des données historiques.
+def _live_x(row):
+    return time_values(np.array([row['Date']], dtype='datetime64[ns]'))
+
+
+def _axes(trace):
+    return {'xaxis': trace.get('xaxis', 'x'), 'yaxis': trace.get('yaxis', 'y')}
+
+
+def live_price_figure(fig, row):
+    out = fig.to_dict()
+    traces = out['data']
+    x = _live_x(row)
+    candle, volume = traces[0], traces[-1]
+    live = [dict(type='candlestick', x=x, open=[row['Open']], high=[row['High']],
+                 low=[row['Low']], close=[row['Close']], name='En cours',
+                 increasing=dict(line=dict(color='darkgreen')),
+                 decreasing=dict(line=dict(color='darkred')), **_axes(candle))]
+    for trace in traces[1:-1]:
+        column = trace['name'].replace(' ', '')
+        if column in row:
+            live.append(dict(type='scatter', mode='markers', x=x, y=[row[column]], name=trace['name'],
+                             marker=dict(color=trace['line']['color']), showlegend=False, **_axes(trace)))
+    live.append(dict(type='bar', x=x, y=[row['Number of Shares']], name='Volume en cours', showlegend=False,
+                     marker=dict(color='red' if row['Close'] < row['Open'] else 'green', opacity=0.6),
+                     **_axes(volume)))
+    traces.extend(live)
+    return frozen_figure(out)
+
+
+def live_vwap_figure(fig, row):
+    out = fig.to_dict()
+    traces = out['data']
+    x = _live_x(row)
+    for trace, value in zip(traces[:2], (row['Close'], row['vwap'])):
+        traces.append(dict(type='scatter', mode='markers', x=x, y=[value], name=trace['name'],
+                           marker=dict(color=trace['line']['color'], size=9), showlegend=False, **_axes(trace)))
+    return frozen_figure(out)
+
@@ -0,0 +1,172 @@
+"""Indicateurs glissants (rendement journalier, moyennes mobiles, volatilité,
+rendement cumulé) calculés une fois par version des données et stockés à côté
+des colonnes de prix. Un ajout de lignes ne met à jour que les nouvelles valeurs,
+en O(1) par barre, à partir de l'état conservé (moyenne et M2 de Welford sur
+chaque fenêtre, produit cumulé, dernier cours).
+
+Les clôtures manquantes (NaN) sont traitées comme dans pandas : rendement NaN
+à la séance manquante et à la suivante, produit cumulé prolongé par-dessus,
+moyennes et volatilité NaN tant que la fenêtre contient une valeur manquante.
+L'état compte les NaN de chaque fenêtre ; la moyenne et M2 sont recalculés sur
+la fenêtre quand le dernier NaN en sort."""
+import math
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz import data
+
+INDICATORS = ['Daily_Return', 'MA20', 'MA50', 'Volatility_20d', 'Cumulative_Return']
+WINDOWS = (20, 50)
+# Type de stockage des indicateurs selon le profil des prix (voir data.STORAGE_PROFILES) ;
+# les calculs se font toujours en float64
+STORAGE_DTYPES = {'full': 'float64', 'compact': 'float32'}
+# Version du calcul incrémental : l'incrémenter force le recalcul complet
+ENGINE_VERSION = 2
+
+_lock = threading.Lock()
+
+
+# Calcul complet, identique aux formules historiques de la page Analyses
+def compute(close):
+    close = pd.Series(np.asarray(close, dtype=np.float64))
+    returns = close.pct_change()
+    return pd.DataFrame({
+        'Daily_Return': returns * 100,
+        'MA20': close.rolling(window=20).mean(),
+        'MA50': close.rolling(window=50).mean(),
+        'Volatility_20d': close.rolling(window=20).std(),
+        'Cumulative_Return': (1 + returns).cumprod() - 1,
+    })
+
+
+# État permettant de prolonger les indicateurs à partir des n premières clôtures
+def initial_state(close, cumulative_return):
+    close = np.asarray(close, dtype=np.float64)
+    state = {
+        'prev_close': float(close[-1]) if len(close) else None,
+        'cumprod': 1.0,
+        'windows': {},
+    }
+    # Produit cumulé : dernière valeur renseignée (cumprod de pandas ignore les NaN)
+    known = np.asarray(cumulative_return, dtype=np.float64)
+    known = known[~np.isnan(known)]
+    if len(known):
+        state['cumprod'] = float(known[-1]) + 1
+    for w in WINDOWS:
+        values = close[-w:]
+        state['windows'][str(w)] = _window_state(values)
+    return state
+
+
+# Nombre de lignes, de NaN, moyenne et M2 des valeurs renseignées d'une fenêtre
+def _window_state(values):
+    valid = values[~np.isnan(values)]
+    mean = float(valid.mean()) if len(valid) else 0.0
+    return {
+        'n': len(values),
+        'nans': len(values) - len(valid),
+        'mean': mean,
+        'm2': float(((valid - mean) ** 2).sum()),
+    }
+
+
+# Mise à jour de Welford de la fenêtre de w lignes se terminant en close[i] :
+# ajout de close[i], retrait de close[i - w] une fois la fenêtre pleine.
+# Moyenne et M2 ne sont pas tenus tant que la fenêtre contient un NaN.
+def _slide(win, close, i, w):
+    x_new = close[i]
+    x_old = close[i - w] if win['n'] == w else None
+    nans = win.get('nans', 0)
+    if x_old is None:
+        win['n'] += 1
+    win['nans'] = nans + math.isnan(x_new) - (x_old is not None and math.isnan(x_old))
+    if win['nans']:
+        return
+    if nans:
+        # Dernier NaN sorti de la fenêtre : recalcul sur ses n valeurs
+        win.update(_window_state(close[i + 1 - win['n']:i + 1]))
+    elif x_old is None:
+        delta = x_new - win['mean']
+        win['mean'] += delta / win['n']
+        win['m2'] += delta * (x_new - win['mean'])
+    else:
+        old_mean = win['mean']
+        win['mean'] += (x_new - x_old) / win['n']
+        win['m2'] += (x_new - x_old) * (x_new - win['mean'] + x_old - old_mean)
+
+
+# Prolonge les indicateurs pour les lignes close[start:], en O(1) par ligne
+def update(close, start, state):
+    close = np.asarray(close, dtype=np.float64)
+    out = {name: np.full(len(close) - start, np.nan) for name in INDICATORS}
+    for k, i in enumerate(range(start, len(close))):
+        x = close[i]
+        prev = state['prev_close']
+        if prev is not None:
+            ret = x / prev - 1
+            out['Daily_Return'][k] = ret * 100
+            if not math.isnan(ret):
+                state['cumprod'] *= 1 + ret
+                out['Cumulative_Return'][k] = state['cumprod'] - 1
+        state['prev_close'] = float(x)
+
+        for w in WINDOWS:
+            win = state['windows'][str(w)]
+            _slide(win, close, i, w)
+            if win['n'] == w and not win['nans']:
+                out[f'MA{w}'][k] = win['mean']
+                if w == 20:
+                    out['Volatility_20d'][k] = math.sqrt(max(win['m2'], 0.0) / (w - 1))
+    return pd.DataFrame(out)
+
+
+def indicator_dir(cache_dir):
+    return Path(cache_dir) / 'indicators'
+
+
+# Met à jour les indicateurs stockés dans cache_dir/indicators pour la version
+# courante des prix (méta renvoyé par data.sync_cache)
+def sync_indicators(cache_dir, meta):
+    ind_dir = indicator_dir(cache_dir)
+    profile = meta.get('profile', 'full')
+    with _lock:
+        ind_meta = data.read_meta(ind_dir)
+        if ind_meta is not None and (ind_meta.get('profile', 'full') != profile
+                                     or ind_meta.get('engine') != ENGINE_VERSION):
+            ind_meta = None
+        if ind_meta is not None and ind_meta['version'] == meta['version']:
+            return ind_meta
+
+        close = data.read_columns(cache_dir, ['Close'])['Close'].to_numpy()
+        if (
+            ind_meta is not None
+            and ind_meta['base_version'] == meta.get('base_version')
+            and ind_meta['rows'] <= meta['rows']
+        ):
+            # Seules des lignes ont été ajoutées depuis le dernier calcul
+            new_values = update(close, ind_meta['rows'], ind_meta['state'])
+            data.append_columns(new_values, ind_dir, ind_meta)
+            ind_meta['rows'] = meta['rows']
+        else:
+            values = compute(close)
+            data.write_columns(values.astype(STORAGE_DTYPES[profile]), ind_dir)
+            ind_meta = {
+                'format': data.FORMAT_VERSION,
+                'profile': profile,
+                'engine': ENGINE_VERSION,
+                'rows': len(values),
+                'dtypes': {name: STORAGE_DTYPES[profile] for name in INDICATORS},
+                'base_version': meta.get('base_version'),
+                'state': initial_state(close, values['Cumulative_Return'].to_numpy()),
+            }
+        ind_meta['version'] = meta['version']
+        data.write_meta(ind_dir, ind_meta)
+        return ind_meta
+
+
+# Vues en lecture seule sur les indicateurs stockés
+def read_indicators(cache_dir):
+    return data.read_columns(indicator_dir(cache_dir), INDICATORS)
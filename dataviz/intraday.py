@@ -0,0 +1,163 @@
+"""Données intraday : lecture par blocs de transactions ou de barres minute et
+rééchantillonnage en barres OHLCV (1m, 5m, 1h, 1d...) en une seule passe, à
+mémoire bornée par la taille d'un bloc.
+
+Formats acceptés (séparateur ';', virgule décimale, ordre chronologique) :
+- transactions : Date;Price;Quantity  (Date = horodatage)
+- barres : même en-tête que l'export journalier, Date étant un horodatage
+
+Les barres produites ont les colonnes de l'export journalier et peuvent être
+enregistrées dans le stockage sous le symbole SYMBOLE@1h, par exemple, pour
+être affichées par les mêmes pages.
+
+    python -m dataviz.intraday BOUYGUES trades.csv --freq 5m
+"""
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz.data import COLUMNS
+from dataviz.store import PriceStore
+
+CHUNK_ROWS = 1_000_000
+
+# Taille de barre -> alias pandas
+FREQUENCIES = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min', '1h': '1h', '1d': '1D'}
+
+# Agrégats partiels d'une barre, combinables d'un bloc à l'autre
+_PARTIAL = ['Date', 'Open', 'High', 'Low', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover']
+
+
+def read_chunks(path, chunksize=CHUNK_ROWS):
+    reader = pd.read_csv(path, sep=';', decimal=',', chunksize=chunksize)
+    for chunk in reader:
+        chunk['Date'] = pd.to_datetime(chunk['Date'], format='ISO8601').astype('datetime64[ns]')
+        yield chunk
+
+
+def _is_trades(chunk):
+    return 'Price' in chunk.columns
+
+
+# Agrégation vectorielle d'un bloc trié en barres partielles (reduceat sur les
+# débuts de barre)
+def _aggregate(chunk, freq):
+    keys = chunk['Date'].dt.floor(freq).to_numpy()
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    if _is_trades(chunk):
+        price = chunk['Price'].to_numpy(dtype=np.float64)
+        qty = chunk['Quantity'].to_numpy(dtype=np.float64)
+        return pd.DataFrame({
+            'Date': keys[starts],
+            'Open': price[starts],
+            'High': np.maximum.reduceat(price, starts),
+            'Low': np.minimum.reduceat(price, starts),
+            'Close': price[ends],
+            'Number of Shares': np.add.reduceat(qty, starts),
+            'Number of Trades': np.diff(np.append(starts, len(keys))).astype(np.float64),
+            'Turnover': np.add.reduceat(price * qty, starts),
+        })
+
+    return pd.DataFrame({
+        'Date': keys[starts],
+        'Open': chunk['Open'].to_numpy(dtype=np.float64)[starts],
+        'High': np.maximum.reduceat(chunk['High'].to_numpy(dtype=np.float64), starts),
+        'Low': np.minimum.reduceat(chunk['Low'].to_numpy(dtype=np.float64), starts),
+        'Close': chunk['Close'].to_numpy(dtype=np.float64)[ends],
+        'Number of Shares': np.add.reduceat(chunk['Number of Shares'].to_numpy(dtype=np.float64), starts),
+        'Number of Trades': np.add.reduceat(chunk['Number of Trades'].to_numpy(dtype=np.float64), starts),
+        'Turnover': np.add.reduceat(chunk['Turnover'].to_numpy(dtype=np.float64), starts),
+    })
+
+
+# Fusion de la barre restée ouverte à la fin du bloc précédent avec la première
+# barre du bloc courant
+def _merge(carry, first):
+    return {
+        'Date': carry['Date'],
+        'Open': carry['Open'],
+        'High': max(carry['High'], first['High']),
+        'Low': min(carry['Low'], first['Low']),
+        'Close': first['Close'],
+        'Number of Shares': carry['Number of Shares'] + first['Number of Shares'],
+        'Number of Trades': carry['Number of Trades'] + first['Number of Trades'],
+        'Turnover': carry['Turnover'] + first['Turnover'],
+    }
+
+
+def _finalize(bars):
+    bars = bars.copy()
+    bars['Last'] = bars['Close']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bars['vwap'] = bars['Turnover'] / bars['Number of Shares']
+    return bars[COLUMNS].reset_index(drop=True)
+
+
+# Barres complètes, bloc par bloc. Seule la dernière barre d'un bloc reste en
+# mémoire d'un bloc à l'autre (elle peut se poursuivre dans le bloc suivant).
+def resample_stream(chunks, bar='1m'):
+    freq = FREQUENCIES.get(bar, bar)
+    carry = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if not chunk['Date'].is_monotonic_increasing:
+            chunk = chunk.sort_values('Date', kind='stable')
+        partial = _aggregate(chunk, freq)
+        if carry is not None:
+            if partial['Date'].iloc[0] < carry['Date']:
+                raise ValueError("Les données intraday doivent être triées par horodatage croissant")
+            if partial['Date'].iloc[0] == carry['Date']:
+                partial.iloc[0] = pd.Series(_merge(carry, partial.iloc[0]))
+            else:
+                partial = pd.concat([pd.DataFrame([carry], columns=_PARTIAL), partial], ignore_index=True)
+        carry = partial.iloc[-1].to_dict()
+        if len(partial) > 1:
+            yield _finalize(partial.iloc[:-1])
+    if carry is not None:
+        yield _finalize(pd.DataFrame([carry], columns=_PARTIAL))
+
+
+def resample_file(path, bar='1m', chunksize=CHUNK_ROWS):
+    parts = list(resample_stream(read_chunks(path, chunksize), bar))
+    if not parts:
+        return pd.DataFrame({col: pd.Series(dtype='datetime64[ns]' if col == 'Date' else 'float64') for col in COLUMNS})
+    return pd.concat(parts, ignore_index=True)
+
+
+def _source_version(path, bar):
+    stat = Path(path).stat()
+    return hashlib.sha256(f"{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{bar}".encode()).hexdigest()
+
+
+# Rééchantillonne un fichier intraday et l'enregistre sous SYMBOLE@barre
+def ingest(store, symbol, path, bar='1m', chunksize=CHUNK_ROWS):
+    bars = resample_file(path, bar, chunksize)
+    name = f"{symbol}@{bar}"
+    store.write_frame(name, bars, _source_version(path, bar), source=str(path))
+    return name, len(bars)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rééchantillonnage de données intraday en barres OHLCV")
+    parser.add_argument('symbol')
+    parser.add_argument('path', help="fichier de transactions ou de barres minute")
+    parser.add_argument('--freq', action='append', default=None, help="taille de barre (1m, 5m, 1h, 1d...), répétable")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    store = PriceStore()
+    for bar in args.freq or ['1m']:
+        name, rows = ingest(store, args.symbol, args.path, bar, args.chunksize)
+        print(f"{name} : {rows} barres")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Détection de niveaux de support et de résistance sur plusieurs fenêtres.
+
+1. Extrema glissants en O(n) par fenêtre (algorithme de van Herk / Gil-Werman :
+   maxima préfixes et suffixes par blocs de la taille de la fenêtre, calculés
+   avec np.maximum.accumulate ; même résultat qu'une file monotone, sans boucle
+   Python).
+2. Pivots : un plus haut (plus bas) est un pivot de demi-largeur k s'il est le
+   maximum (minimum) des 2k+1 barres centrées sur lui. La force d'un pivot est
+   le nombre de fenêtres pour lesquelles il en est un.
+3. Regroupement des pivots triés par prix en niveaux de largeur relative
+   tolerance ; chaque niveau est pondéré par ses contacts (pivots), leur force
+   et le volume échangé.
+"""
+import numpy as np
+import pandas as pd
+
+# Demi-largeurs des pivots, en barres
+PIVOT_WINDOWS = (3, 5, 10, 20, 50)
+# Écart relatif maximal entre deux pivots d'un même niveau
+TOLERANCE = 0.01
+
+
+def _rolling(x, window, op, fill):
+    n = len(x)
+    if window <= 1 or n == 0:
+        return x.astype(np.float64, copy=True)
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = x
+    padded = padded.reshape(blocks, window)
+    prefix = op.accumulate(padded, axis=1).ravel()
+    suffix = op.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    out = np.full(n, np.nan)
+    # Fenêtre [t - window + 1, t] : suffixe depuis son début, préfixe jusqu'à sa fin
+    out[window - 1:] = op(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+# Maximum glissant des window dernières valeurs (NaN tant que la fenêtre n'est pas
+# pleine) ; les valeurs manquantes sont ignorées
+def rolling_max(x, window):
+    return _rolling(np.asarray(x, dtype=np.float64), window, np.fmax, -np.inf)
+
+
+def rolling_min(x, window):
+    return _rolling(np.asarray(x, dtype=np.float64), window, np.fmin, np.inf)
+
+
+# Force des pivots hauts et bas : nombre de demi-largeurs k pour lesquelles la
+# barre est l'extremum des barres [t - k, t + k]
+def pivot_strength(high, low, windows=PIVOT_WINDOWS):
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = len(high)
+    highs = np.zeros(n, dtype=np.int64)
+    lows = np.zeros(n, dtype=np.int64)
+    for k in windows:
+        if 2 * k + 1 > n:
+            continue
+        # Extremum centré en t = extremum glissant se terminant en t + k
+        centered_max = rolling_max(high, 2 * k + 1)[2 * k:]
+        centered_min = rolling_min(low, 2 * k + 1)[2 * k:]
+        highs[k:n - k] += high[k:n - k] == centered_max
+        lows[k:n - k] += low[k:n - k] == centered_min
+    return highs, lows
+
+
+# Début de chaque groupe de prix triés : un groupe couvre [p, p * (1 + tolerance)]
+# à partir de son premier prix p (largeur bornée, pas d'enchaînement de proche en
+# proche) ; une itération par groupe
+def _cluster_starts(price, tolerance):
+    starts = []
+    i = 0
+    while i < len(price):
+        starts.append(i)
+        i = int(np.searchsorted(price, price[i] * (1.0 + tolerance), side='right'))
+    return np.array(starts, dtype=np.intp)
+
+
+# Niveaux de prix issus des pivots, triés par score décroissant. Colonnes :
+# Niveau, Type (support / resistance par rapport au dernier cours), Contacts,
+# Volume, Score, Premier, Dernier (dates du premier et du dernier contact)
+def detect_levels(df, windows=PIVOT_WINDOWS, tolerance=TOLERANCE, max_levels=None):
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    volume = df['Number of Shares'].to_numpy(dtype=np.float64)
+    dates = df['Date'].to_numpy()
+    highs, lows = pivot_strength(high, low, windows)
+
+    hi_idx = np.flatnonzero(highs)
+    lo_idx = np.flatnonzero(lows)
+    idx = np.concatenate((hi_idx, lo_idx))
+    price = np.concatenate((high[hi_idx], low[lo_idx]))
+    strength = np.concatenate((highs[hi_idx], lows[lo_idx])).astype(np.float64)
+    columns = ['Niveau', 'Type', 'Contacts', 'Volume', 'Score', 'Premier', 'Dernier']
+    if len(idx) == 0:
+        return pd.DataFrame(columns=columns)
+
+    order = np.argsort(price, kind='stable')
+    idx, price, strength = idx[order], price[order], strength[order]
+    starts = _cluster_starts(price, tolerance)
+    vol = np.nan_to_num(volume[idx])
+    # Volume relatif au volume moyen, pour que le score ne dépende pas de l'échelle
+    mean_volume = np.nanmean(volume) if len(volume) and np.any(volume > 0) else 1.0
+    weight = strength * (1.0 + vol / mean_volume)
+
+    contacts = np.diff(np.append(starts, len(idx)))
+    total_weight = np.add.reduceat(weight, starts)
+    level_price = np.add.reduceat(price * weight, starts) / total_weight
+    last_close = float(df['Close'].iloc[-1])
+    levels = pd.DataFrame({
+        'Niveau': level_price,
+        'Type': np.where(level_price <= last_close, 'support', 'resistance'),
+        'Contacts': contacts,
+        'Volume': np.add.reduceat(vol, starts),
+        'Score': total_weight,
+        'Premier': dates[np.minimum.reduceat(idx, starts)],
+        'Dernier': dates[np.maximum.reduceat(idx, starts)],
+    }, columns=columns)
+    levels = levels.sort_values('Score', ascending=False, kind='stable').reset_index(drop=True)
+    return levels if max_levels is None else levels.head(max_levels)
+
+
+# Support le plus proche sous le dernier cours et résistance la plus proche
+# au-dessus, parmi les niveaux détectés (None s'il n'y en a pas)
+def nearest_levels(levels, price):
+    below = levels.loc[levels['Niveau'] <= price, 'Niveau']
+    above = levels.loc[levels['Niveau'] > price, 'Niveau']
+    return (float(below.max()) if len(below) else None,
+            float(above.min()) if len(above) else None)
@@ -0,0 +1,245 @@
+"""Mode temps réel : un flux de cotations consommé par une boucle asyncio dans un
+thread dédié, des ticks conservés dans un tampon circulaire, et la barre en
+cours (jour, ou taille de barre d'un symbole intraday SYMBOLE@5m) reconstruite à
+la demande à partir de ce tampon.
+
+Sources de référence :
+- simulated_feed : marche aléatoire autour du dernier cours connu
+- file_feed : suivi d'un fichier de transactions Date;Price;Quantity (comme
+  tail -f), alimenté par un processus externe ; seuls les fichiers du dossier
+  settings.LIVE_DIR peuvent être suivis (voir feed_path)
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz import indicators
+from dataviz.intraday import FREQUENCIES
+from dataviz.settings import LIVE_DIR
+
+# Nombre de ticks conservés par flux
+RING_CAPACITY = 100_000
+# Attente entre deux lectures du fichier suivi
+POLL_INTERVAL = 0.05
+# Extensions des fichiers de transactions proposés
+FEED_SUFFIXES = ('.csv', '.txt')
+
+logger = logging.getLogger(__name__)
+
+
+# Tampon circulaire de ticks (horodatage en ns, prix, quantité) à capacité fixe :
+# l'ajout est en O(1) et les plus anciens ticks sont écrasés
+class RingBuffer:
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.qty = np.zeros(capacity, dtype=np.float64)
+        # Nombre total de ticks reçus ; sert aussi de version du contenu
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def append(self, ts, price, qty):
+        with self._lock:
+            i = self.count % self.capacity
+            self.ts[i] = ts
+            self.price[i] = price
+            self.qty[i] = qty
+            self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    # Copie des ticks présents, du plus ancien au plus récent
+    def snapshot(self):
+        with self._lock:
+            n = min(self.count, self.capacity)
+            start = self.count % self.capacity if self.count > self.capacity else 0
+            order = (np.arange(n) + start) % self.capacity
+            return self.ts[order], self.price[order], self.qty[order]
+
+    # Ticks d'horodatage >= ts (le tampon est chronologique : recherche binaire)
+    def since(self, ts):
+        stamps, prices, qtys = self.snapshot()
+        lo = int(np.searchsorted(stamps, ts, side='left'))
+        return stamps[lo:], prices[lo:], qtys[lo:]
+
+
+# Marche aléatoire autour de start_price, un tick toutes les interval secondes
+async def simulated_feed(start_price, interval=0.1, volatility=0.0005, seed=None):
+    rng = random.Random(seed)
+    price = float(start_price)
+    while True:
+        price *= 1 + rng.gauss(0, volatility)
+        yield time.time_ns(), round(price, 3), float(rng.randint(1, 500))
+        await asyncio.sleep(interval)
+
+
+def _parse_tick(line):
+    date, price, qty = line.strip().split(';')[:3]
+    return (
+        pd.Timestamp(date).value,
+        float(price.replace(',', '.')),
+        float(qty.replace(',', '.')),
+    )
+
+
+# Fichiers de transactions disponibles dans directory (noms seuls)
+def feed_files(directory=LIVE_DIR):
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(p.name for p in directory.iterdir() if p.is_file() and p.suffix in FEED_SUFFIXES)
+
+
+# Chemin du fichier de transactions name, qui doit se trouver directement dans
+# directory (pas de chemin absolu ni de remontée '..') ; ValueError sinon
+def feed_path(name, directory=LIVE_DIR):
+    directory = Path(directory).resolve()
+    path = (directory / name).resolve()
+    if path.parent != directory or not path.is_file():
+        raise ValueError(f"Fichier de transactions non disponible : {name}")
+    return path
+
+
+# Nouvelles lignes d'un fichier de transactions, à partir de sa fin actuelle.
+# Les lignes incomplètes (écriture en cours) sont gardées jusqu'au saut de ligne.
+async def file_feed(path, poll=POLL_INTERVAL):
+    with open(path, 'r', encoding='utf-8') as f:
+        f.seek(0, 2)
+        pending = ''
+        while True:
+            chunk = f.read()
+            if not chunk:
+                await asyncio.sleep(poll)
+                continue
+            pending += chunk
+            *lines, pending = pending.split('\n')
+            for line in lines:
+                try:
+                    yield _parse_tick(line)
+                except ValueError:
+                    # En-tête ou ligne invalide
+                    continue
+
+
+# Consommation d'un flux asynchrone dans un thread dédié, vers un RingBuffer.
+# make_feed est appelé dans la boucle du thread et renvoie un générateur asynchrone.
+class LiveFeed:
+    def __init__(self, make_feed, capacity=RING_CAPACITY):
+        self.buffer = RingBuffer(capacity)
+        self.error = None
+        self._make_feed = make_feed
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._consume())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _consume(self):
+        try:
+            async for ts, price, qty in self._make_feed():
+                self.buffer.append(ts, price, qty)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Le détail reste dans les journaux du serveur, pas dans la page
+            logger.exception("Flux temps réel interrompu")
+            self.error = exc
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                # Boucle déjà fermée
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+
+# Taille de barre d'un symbole : '5m' pour BOUYGUES@5m, journalière sinon
+def bar_size(ticker):
+    bar = ticker.partition('@')[2]
+    return FREQUENCIES.get(bar, bar) if bar else '1D'
+
+
+# Barre en cours, agrégée à partir des ticks de la dernière période du tampon.
+# None tant qu'aucun tick n'a été reçu.
+def current_bar(buffer, freq='1D'):
+    if buffer.count == 0:
+        return None
+    stamps, _, _ = buffer.snapshot()
+    key = pd.Timestamp(stamps[-1]).floor(freq)
+    _, prices, qtys = buffer.since(key.value)
+    shares = float(qtys.sum())
+    turnover = float((prices * qtys).sum())
+    return {
+        'Date': key,
+        'Open': float(prices[0]),
+        'High': float(prices.max()),
+        'Low': float(prices.min()),
+        'Close': float(prices[-1]),
+        'Last': float(prices[-1]),
+        'Number of Shares': shares,
+        'Number of Trades': float(len(prices)),
+        'Turnover': turnover,
+        'vwap': turnover / shares if shares else np.nan,
+    }
+
+
+# Ligne de la barre en cours (prix et indicateurs), à afficher après les lignes
+# de history (historique complet du titre). Si l'historique contient déjà la
+# période de la barre, les ticks reçus depuis l'export la complètent et la
+# dernière ligne de l'historique est remplacée : renvoie (ligne, remplace).
+# Les indicateurs sont prolongés à partir des seules dernières lignes : le coût
+# ne dépend pas de la longueur de l'historique.
+def live_row(bar, history):
+    row = dict(bar)
+    same_period = bool(len(history)) and history['Date'].iloc[-1] == row['Date']
+    if same_period:
+        last = history.iloc[-1]
+        row['Open'] = float(last['Open'])
+        row['High'] = max(row['High'], float(last['High']))
+        row['Low'] = min(row['Low'], float(last['Low']))
+        for col in ('Number of Shares', 'Number of Trades', 'Turnover'):
+            row[col] += float(last[col])
+        row['vwap'] = row['Turnover'] / row['Number of Shares'] if row['Number of Shares'] else np.nan
+        history = history.iloc[:-1]
+
+    if 'MA20' in history.columns:
+        window = max(indicators.WINDOWS)
+        close = history['Close'].to_numpy()[-window:]
+        # Dernier rendement cumulé renseigné, cherché d'abord dans la fin de l'historique
+        cumulative = history['Cumulative_Return'].to_numpy()
+        recent = cumulative[-window:]
+        state = indicators.initial_state(close, recent if (~np.isnan(recent)).any() else cumulative)
+        tail = np.append(close, row['Close'])
+        values = indicators.update(tail, len(tail) - 1, state)
+        for name in indicators.INDICATORS:
+            row[name] = float(values[name].iloc[-1])
+    return row, same_period
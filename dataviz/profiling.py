@@ -0,0 +1,193 @@
+"""Profilage optionnel des exécutions de page : temps réel, temps CPU et octets
+alloués par section, exportables au format Chrome trace-event (chrome://tracing,
+Perfetto).
+
+Le profileur courant est propre au thread (Streamlit exécute chaque session dans
+son propre thread). Désactivé, section() renvoie un gestionnaire de contexte
+vide partagé : le coût se limite à un appel de fonction.
+
+Les octets alloués sont mesurés par tracemalloc, dont le pic est global au
+processus : quand plusieurs sessions profilent en même temps, chacune remet à
+zéro le pic des autres et compte leurs allocations. Profiler.concurrent indique
+le nombre maximal de profileurs actifs pendant l'exécution.
+
+tracemalloc n'est actif que tant qu'un profileur est en cours. Une exécution
+interrompue (exception, st.stop, réexécution dans un nouveau thread) ne
+termine pas son profileur : il l'est au démarrage suivant, par la session
+(start(previous=...)) ou parce que son thread ne tourne plus."""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+_NULL = nullcontext()
+_local = threading.local()
+# tracemalloc n'est actif que tant qu'au moins un profileur est en cours
+_active = 0
+_active_lock = threading.Lock()
+_running = set()
+
+
+class _DisabledProfiler:
+    enabled = False
+
+    def section(self, name):
+        return _NULL
+
+    def step(self, name):
+        pass
+
+    def finish(self):
+        pass
+
+
+DISABLED = _DisabledProfiler()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+        self.tid = threading.get_ident()
+        self._open = []
+        self._step = None
+        global _active
+        with _active_lock:
+            if _active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _active += 1
+            _running.add(self)
+        self.concurrent = _active
+        self.start_ns = time.perf_counter_ns()
+        # Décalage vers l'horloge murale, pour aligner plusieurs exécutions dans la trace
+        self.epoch_us = time.time_ns() // 1000 - self.start_ns // 1000
+        self._root = self.section(name)
+        self._root.__enter__()
+
+    # Mesure d'un bloc. Les octets alloués sont le pic tracemalloc atteint dans le bloc
+    # au-dessus de la mémoire tracée à son entrée (mesure globale au processus).
+    # Chaque section remet le pic à zéro : le pic des sections imbriquées est
+    # remonté à la section parente par la pile _open.
+    @contextmanager
+    def section(self, name):
+        self.concurrent = max(self.concurrent, _active)
+        wall = time.perf_counter_ns()
+        cpu = time.thread_time_ns()
+        mem, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        frame = {'peak': mem}
+        self._open.append(frame)
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame['peak'])
+            self._open.remove(frame)
+            if self._open:
+                self._open[-1]['peak'] = max(self._open[-1]['peak'], peak)
+            self.events.append({
+                'name': name,
+                'start_ns': wall - self.start_ns,
+                'wall_ns': time.perf_counter_ns() - wall,
+                'cpu_ns': time.thread_time_ns() - cpu,
+                'alloc_bytes': max(peak - mem, 0),
+            })
+
+    # Sections successives d'un script : chaque étape termine la précédente
+    def step(self, name):
+        if self._step is not None:
+            self._step.__exit__(None, None, None)
+        self._step = self.section(name)
+        self._step.__enter__()
+
+    # Termine l'exécution. Depuis un autre thread (exécution interrompue), les
+    # sections ouvertes ne sont pas refermées : seul tracemalloc est libéré.
+    def finish(self):
+        if threading.get_ident() == self.tid:
+            if self._step is not None:
+                self._step.__exit__(None, None, None)
+                self._step = None
+            if self._root is not None:
+                self._root.__exit__(None, None, None)
+                self._root = None
+        global _active
+        with _active_lock:
+            if self in _running:
+                _running.discard(self)
+                _active -= 1
+                if _active == 0:
+                    tracemalloc.stop()
+        if current() is self:
+            _local.profiler = DISABLED
+
+    # Une ligne par section, dans l'ordre de début
+    def summary(self):
+        return [
+            {
+                'Section': e['name'],
+                'Temps (ms)': e['wall_ns'] / 1e6,
+                'CPU (ms)': e['cpu_ns'] / 1e6,
+                'Alloué (Ko)': e['alloc_bytes'] / 1024,
+            }
+            for e in sorted(self.events, key=lambda e: e['start_ns'])
+        ]
+
+    def trace_events(self):
+        return [
+            {
+                'name': e['name'],
+                'cat': self.name,
+                'ph': 'X',
+                'ts': self.epoch_us + (self.start_ns + e['start_ns']) // 1000,
+                'dur': e['wall_ns'] / 1000,
+                'pid': os.getpid(),
+                'tid': self.tid,
+                'args': {'cpu_ms': e['cpu_ns'] / 1e6, 'alloc_bytes': e['alloc_bytes']},
+            }
+            for e in self.events
+        ]
+
+
+def current():
+    return getattr(_local, 'profiler', DISABLED)
+
+
+# Profileurs d'exécutions dont le thread s'est terminé sans appeler finish()
+def _orphans():
+    with _active_lock:
+        if not _running:
+            return []
+        running = list(_running)
+    alive = {thread.ident for thread in threading.enumerate()}
+    return [profiler for profiler in running if profiler.tid not in alive]
+
+
+# Démarre le profilage d'une exécution de page dans le thread courant.
+# previous est le profileur de l'exécution précédente de la session, qui a pu
+# tourner dans un autre thread.
+def start(name, enabled, previous=None):
+    # Une exécution interrompue (exception, st.stop, réexécution) n'a pas appelé finish()
+    current().finish()
+    if previous is not None:
+        previous.finish()
+    for profiler in _orphans():
+        profiler.finish()
+    profiler = Profiler(name) if enabled else DISABLED
+    _local.profiler = profiler
+    return profiler
+
+
+def section(name):
+    return current().section(name)
+
+
+# Trace Chrome (format JSON "traceEvents") de plusieurs exécutions
+def chrome_trace(profilers):
+    events = []
+    for prof in profilers:
+        events.extend(prof.trace_events())
+    return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
@@ -0,0 +1,300 @@
+"""Pyramide d'agrégats par semaine, mois et trimestre, calculée à l'ingestion et
+stockée à côté des colonnes de prix (cache_dir/rollups/<niveau>/, même format
+colonnaire).
+
+Chaque ligne d'un niveau est une période calendaire (semaines du lundi au
+dimanche) :
+- Date (première séance), start / rows (première ligne journalière et nombre de
+  lignes de la période) ;
+- Open.first, Last.last, Close.last (première / dernière valeur renseignée) ;
+- pour chaque colonne numérique : count (valeurs renseignées), sum, min, max et
+  m2 (somme des carrés des écarts à la moyenne de la période), valeurs
+  manquantes ignorées comme dans pandas (vwap intraday d'une barre sans volume,
+  cellule vide d'un export).
+Les barres OHLCV s'en déduisent (High = High.max, volumes = sommes, vwap =
+Turnover.sum / Number of Shares.sum), et les statistiques d'une plage se
+recomposent à partir des périodes qu'elle contient (formule de combinaison de
+Chan pour l'écart-type), en ne lisant les lignes journalières qu'aux bords.
+Ces statistiques ne sont pas identiques bit à bit à celles de pandas (ordre des
+additions différent) : écart relatif au plus 1e-12 sur des colonnes float64 ;
+sur les colonnes float32 du profil compact, pandas calcule en float32 et
+l'écart atteint 1e-6. Les pages utilisent donc dataviz.chunked, exact, pour
+leurs tableaux et KPIs ; les agrégats servent aux barres des graphiques.
+
+Après un ajout de lignes, seules la dernière période stockée et les suivantes
+sont recalculées.
+"""
+import math
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz import data
+from dataviz.downsample import edge_values
+
+LEVELS = ('week', 'month', 'quarter')
+LEVEL_LABELS = {'week': 'semaine', 'month': 'mois', 'quarter': 'trimestre'}
+# Version du contenu des agrégats : l'incrémenter force leur reconstruction
+ROLLUPS_VERSION = 2
+STATS = ['mean', 'min', 'max', 'std']
+VOLUME_COLUMNS = ['Number of Shares', 'Number of Trades', 'Turnover']
+
+_lock = threading.Lock()
+
+
+def rollup_dir(cache_dir, level=None):
+    root = Path(cache_dir) / 'rollups'
+    return root if level is None else root / level
+
+
+# Numéro de période de chaque date (le 1970-01-01 est un jeudi : +3 aligne les
+# semaines sur le lundi)
+def period_keys(dates, level):
+    if level == 'week':
+        return (dates.astype('datetime64[D]').astype(np.int64) + 3) // 7
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    return months if level == 'month' else months // 3
+
+
+# Première ligne de chaque période (dates triées)
+def period_starts(dates, level):
+    if len(dates) == 0:
+        return np.empty(0, dtype=np.int64)
+    keys = period_keys(dates, level)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+# Agrégats des lignes [starts[i], starts[i + 1]) de df ; offset est l'indice de
+# la première ligne de df dans l'historique complet. Les valeurs manquantes sont
+# ignorées (count en donne le nombre par période). Avec columns, seules les
+# statistiques de ces colonnes sont calculées (bords d'une plage dans summary),
+# sans les colonnes de barre.
+def aggregate(df, starts, offset=0, columns=None):
+    n = len(df)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.append(starts[1:], n)
+    out = {
+        'Date': df['Date'].to_numpy()[starts],
+        'start': starts + offset,
+        'rows': ends - starts,
+    }
+    if columns is None:
+        columns = data.NUMERIC_COLUMNS
+        out['Open.first'] = edge_values(df['Open'].to_numpy(), starts)
+        out['Last.last'] = edge_values(df['Last'].to_numpy(), starts, last=True)
+        out['Close.last'] = edge_values(df['Close'].to_numpy(), starts, last=True)
+    for col in columns:
+        x = df[col].to_numpy().astype(np.float64)
+        valid = ~np.isnan(x)
+        counts = np.add.reduceat(valid.astype(np.int64), starts)
+        sums = np.add.reduceat(np.where(valid, x, 0.0), starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        dev = np.where(valid, x - np.repeat(means, ends - starts), 0.0)
+        out[col + '.count'] = counts
+        out[col + '.sum'] = sums
+        out[col + '.min'] = np.fmin.reduceat(x, starts)
+        out[col + '.max'] = np.fmax.reduceat(x, starts)
+        out[col + '.m2'] = np.add.reduceat(dev * dev, starts)
+    return pd.DataFrame(out)
+
+
+def read_level(cache_dir, level, columns=None):
+    ldir = rollup_dir(cache_dir, level)
+    meta = data.read_meta(ldir)
+    return data.read_columns(ldir, list(meta['dtypes']) if columns is None else columns)
+
+
+# Met à jour les agrégats de cache_dir pour la version courante des prix (méta
+# renvoyé par data.sync_cache). Les fichiers d'un niveau sont réécrits en entier
+# (écriture atomique, quelques centaines de lignes) : un lecteur qui les a déjà
+# ouverts garde l'ancienne version.
+def sync_rollups(cache_dir, meta):
+    root = rollup_dir(cache_dir)
+    with _lock:
+        top = data.read_meta(root)
+        if top is not None and top.get('rollups') != ROLLUPS_VERSION:
+            # Agrégats d'une version antérieure : reconstruction complète
+            top = None
+        if top is not None and top['version'] == meta['version']:
+            return top
+
+        prices = data.read_columns(cache_dir)
+        # Seules des lignes ont été ajoutées depuis le dernier calcul
+        appended = (top is not None and top['base_version'] == meta.get('base_version')
+                    and top['rows'] <= meta['rows'])
+        for level in LEVELS:
+            ldir = rollup_dir(cache_dir, level)
+            kept = None
+            first = 0
+            level_meta = data.read_meta(ldir) if appended else None
+            if level_meta is not None and level_meta['rows']:
+                stored = read_level(cache_dir, level)
+                kept = stored.iloc[:-1]
+                first = int(stored['start'].iloc[-1])
+            tail = prices.iloc[first:]
+            values = aggregate(tail, period_starts(tail['Date'].to_numpy(), level), first)
+            if kept is not None and len(kept):
+                values = pd.concat([kept, values], ignore_index=True)
+            data.write_columns(values, ldir)
+            data.write_meta(ldir, {
+                'format': data.FORMAT_VERSION,
+                'rows': len(values),
+                'dtypes': {col: str(values[col].dtype) for col in values.columns},
+            })
+
+        top = {
+            'format': data.FORMAT_VERSION,
+            'rollups': ROLLUPS_VERSION,
+            'version': meta['version'],
+            'base_version': meta.get('base_version'),
+            'rows': meta['rows'],
+        }
+        data.write_meta(root, top)
+        return top
+
+
+# Périodes d'un niveau entièrement comprises dans les lignes [lo, hi) :
+# (indice de la première, indice après la dernière, bornes de lignes couvertes)
+def _inner_periods(cache_dir, level, lo, hi):
+    table = read_level(cache_dir, level, ['start', 'rows'])
+    starts = table['start'].to_numpy()
+    ends = starts + table['rows'].to_numpy()
+    i = int(np.searchsorted(starts, lo, side='left'))
+    j = int(np.searchsorted(ends, hi, side='right'))
+    if j <= i:
+        return None
+    return i, j, int(starts[i]), int(ends[j - 1])
+
+
+# Niveau qui lit le moins de lignes pour [lo, hi) : (niveau, périodes) ou None
+# si les lignes journalières suffisent
+def _best_level(cache_dir, lo, hi):
+    best, cost = None, hi - lo
+    for level in LEVELS:
+        inner = _inner_periods(cache_dir, level, lo, hi)
+        if inner is None:
+            continue
+        i, j, inner_lo, inner_hi = inner
+        level_cost = (inner_lo - lo) + (hi - inner_hi) + (j - i)
+        if level_cost < cost:
+            best, cost = (level, inner), level_cost
+    return best
+
+
+# Agrégats (n, sum, min, max, m2) des valeurs renseignées de x, pour les bords
+# d'une plage ; None s'il n'y en a aucune
+def _moments(x):
+    x = np.asarray(x, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    if len(x) == 0:
+        return None
+    dev = x - x.mean()
+    return len(x), math.fsum(x), x.min(), x.max(), float(dev @ dev)
+
+
+# Statistiques des lignes [lo, hi), au format de chunked.summary : périodes du
+# niveau le plus économique, lignes journalières aux bords de la plage. Les
+# parties sont combinées selon leur nombre de valeurs renseignées. Précision :
+# voir le docstring du module.
+def summary(cache_dir, columns, lo=0, hi=None, stats=STATS):
+    meta = data.read_meta(cache_dir)
+    hi = meta['rows'] if hi is None else min(hi, meta['rows'])
+    columns = list(columns)
+    edges = [(lo, hi)]
+    table = None
+    best = _best_level(cache_dir, lo, hi) if hi > lo else None
+    if best is not None:
+        level, (i, j, inner_lo, inner_hi) = best
+        names = [c + s for c in columns for s in ('.count', '.sum', '.min', '.max', '.m2')]
+        table = read_level(cache_dir, level, names).iloc[i:j]
+        edges = [(lo, inner_lo), (inner_hi, hi)]
+    raw = data.read_columns(cache_dir, columns)
+
+    values = {}
+    for col in columns:
+        parts = [_moments(raw[col].to_numpy()[a:b]) for a, b in edges if b > a]
+        parts = [p for p in parts if p is not None]
+        if table is not None:
+            filled = table[col + '.count'].to_numpy() > 0
+            period = table[filled]
+            if filled.any():
+                parts.append((period[col + '.count'].to_numpy(), period[col + '.sum'].to_numpy(),
+                              period[col + '.min'].to_numpy().min(), period[col + '.max'].to_numpy().max(),
+                              period[col + '.m2'].to_numpy()))
+        if not parts:
+            values[col] = {'count': 0, 'sum': 0.0, 'mean': np.nan, 'min': np.nan, 'max': np.nan, 'std': np.nan}
+            continue
+        n = np.concatenate([np.atleast_1d(p[0]) for p in parts])
+        sums = np.concatenate([np.atleast_1d(p[1]) for p in parts])
+        m2 = np.concatenate([np.atleast_1d(p[4]) for p in parts])
+        count = int(n.sum())
+        total = math.fsum(sums)
+        mean = total / count
+        std = np.nan
+        if count > 1:
+            std = math.sqrt((math.fsum(m2) + math.fsum(n * (sums / n - mean) ** 2)) / (count - 1))
+        values[col] = {
+            'count': count,
+            'sum': total,
+            'mean': mean,
+            'min': min(p[2] for p in parts),
+            'max': max(p[3] for p in parts),
+            'std': std,
+        }
+    return pd.DataFrame(
+        {stat: [values[col][stat] for col in columns] for stat in stats},
+        index=columns,
+    )
+
+
+# Barres OHLCV déduites des agrégats (valeurs manquantes ignorées) ; end est la
+# dernière ligne journalière de chaque barre
+def to_bars(table):
+    shares = table['Number of Shares.sum'].to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(shares > 0, table['Turnover.sum'].to_numpy() / shares, np.nan)
+    out = {
+        'Date': table['Date'].to_numpy(),
+        'Open': table['Open.first'].to_numpy(),
+        'High': table['High.max'].to_numpy(),
+        'Low': table['Low.min'].to_numpy(),
+        'Last': table['Last.last'].to_numpy(),
+        'Close': table['Close.last'].to_numpy(),
+    }
+    # Volume d'une période sans aucune valeur renseignée : manquant, pas nul
+    for col in VOLUME_COLUMNS:
+        out[col] = np.where(table[col + '.count'].to_numpy() > 0, table[col + '.sum'].to_numpy(), np.nan)
+    out['vwap'] = vwap
+    out['end'] = table['start'].to_numpy() + table['rows'].to_numpy() - 1
+    return pd.DataFrame(out)
+
+
+# Barres de la plage [lo, hi) au niveau le plus fin qui tient dans max_points
+# barres : (niveau, barres) avec end relatif à lo, ou None si les lignes
+# journalières tiennent dans le budget (ou si aucun niveau ne suffit). Les
+# périodes coupées par les bornes de la plage sont agrégées depuis les lignes
+# journalières.
+def bars(cache_dir, lo, hi, max_points):
+    if hi - lo <= max_points:
+        return None
+    for level in LEVELS:
+        inner = _inner_periods(cache_dir, level, lo, hi)
+        if inner is None:
+            continue
+        i, j, inner_lo, inner_hi = inner
+        if (j - i) + (inner_lo > lo) + (hi > inner_hi) > max_points:
+            continue
+        raw = data.read_columns(cache_dir)
+        parts = []
+        if inner_lo > lo:
+            parts.append(aggregate(raw.iloc[lo:inner_lo], [0], lo))
+        parts.append(read_level(cache_dir, level).iloc[i:j])
+        if hi > inner_hi:
+            parts.append(aggregate(raw.iloc[inner_hi:hi], [0], inner_hi))
+        result = to_bars(pd.concat(parts, ignore_index=True))
+        result['end'] -= lo
+        return level, result
+    return None
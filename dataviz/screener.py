@@ -0,0 +1,194 @@
+"""Classement de l'univers des titres selon le score global de la page Analyses
+(voir analysis.global_score), calculé pour tous les titres à la fois.
+
+Les clôtures et plus bas sont alignés dans des tableaux (dates x titres), NaN
+les jours où un titre n'a pas de séance ; chaque indicateur est une opération
+NumPy sur l'axe des dates. Les fenêtres (MA20, MA50, support sur SR_WINDOW
+séances) portent sur les dernières séances de chaque titre, comme dans
+analysis.analyze.
+
+    python -m dataviz.screener [-o classement.csv] [SYMBOLE ...]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataviz.analysis import SR_WINDOW
+
+COLUMNS = ['symbol', 'latest_price', 'total_return', 'volatility', 'ma20', 'ma50',
+           'support', 'signal', 'score', 'recommendation', 'sessions', 'last_date']
+
+
+class Universe:
+    def __init__(self, symbols, dates, close, low):
+        self.symbols = list(symbols)
+        self.dates = dates
+        self.close = close
+        self.low = low
+
+    # Chargement de tous les titres journaliers du stockage (ou de ceux
+    # demandés) ; les valeurs sont placées sur l'union des dates de séance
+    @classmethod
+    def from_store(cls, store, symbols=None):
+        symbols = list(symbols or store.daily_symbols())
+        store.refresh(symbols)
+        frames = [store.open(s, ['Date', 'Close', 'Low'], write_index=False) for s in symbols]
+        dates = np.unique(np.concatenate([f['Date'].to_numpy() for f in frames])) if frames \
+            else np.empty(0, dtype='datetime64[ns]')
+        dtype = np.result_type(*[f['Close'].dtype for f in frames]) if frames else np.float64
+        close = np.full((len(dates), len(symbols)), np.nan, dtype=dtype)
+        low = np.full((len(dates), len(symbols)), np.nan, dtype=dtype)
+        for j, f in enumerate(frames):
+            rows = np.searchsorted(dates, f['Date'].to_numpy())
+            close[rows, j] = f['Close'].to_numpy()
+            low[rows, j] = f['Low'].to_numpy()
+        return cls(symbols, dates, close, low)
+
+    @property
+    def nbytes(self):
+        return self.close.nbytes + self.low.nbytes + self.dates.nbytes
+
+
+# Rendements d'une séance à la suivante du même titre, tableau (dates - 1) x titres :
+# NaN les jours sans séance, et après un tel jour le rendement part de la
+# dernière clôture connue du titre
+def session_returns(close, valid=None, first_row=None):
+    close = np.asarray(close, dtype=np.float64)
+    valid = ~np.isnan(close) if valid is None else valid
+    first_row = valid.argmax(axis=0) if first_row is None else first_row
+    n = len(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = close[1:] / close[:-1]
+        resumed = valid[1:] & ~valid[:-1] & (np.arange(1, n)[:, None] > first_row)
+        if resumed.any():
+            rows, js = np.nonzero(resumed)
+            # Positions des séances, colonne par colonne (indice j * n + ligne)
+            sessions = np.flatnonzero(valid.T)
+            previous = sessions[np.searchsorted(sessions, js * n + rows + 1) - 1] % n
+            returns[rows, js] = close[rows + 1, js] / close[previous, js]
+    returns -= 1
+    return returns
+
+
+# Masque des k dernières séances de chaque titre, restreint aux dernières lignes
+# du tableau qui les contiennent toutes : (première ligne, masque)
+def _tail_mask(valid, counts, k):
+    n = len(valid)
+    need = np.minimum(counts, k)
+    rows = min(n, 2 * k)
+    while rows < n and np.any(valid[n - rows:].sum(axis=0) < need):
+        rows = min(n, 2 * rows)
+    tail = valid[n - rows:]
+    after = np.cumsum(tail[::-1], axis=0)[::-1]
+    return n - rows, tail & (after <= k)
+
+
+# Moyenne des k dernières clôtures de chaque titre (NaN s'il en a moins de k)
+def _last_mean(values, valid, counts, k):
+    start, mask = _tail_mask(valid, counts, k)
+    total = np.where(mask, values[start:], 0.0).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts >= k, total / k, np.nan)
+
+
+# Écart-type d'échantillon par colonne, valeurs manquantes ignorées (comme
+# Series.std : deux passes autour de la moyenne). x est modifié sur place.
+def _nanstd(x):
+    missing = np.isnan(x)
+    n = x.shape[0] - np.count_nonzero(missing, axis=0)
+    x[missing] = 0.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = x.sum(axis=0) / n
+        x -= mean
+        x[missing] = 0.0
+        squares = np.einsum('ij,ij->j', x, x)
+        return np.where(n > 1, np.sqrt(squares / (n - 1)), np.nan)
+
+
+# Indicateurs et score de chaque titre, triés par score puis rendement décroissants
+def rank(universe):
+    close = np.asarray(universe.close, dtype=np.float64)
+    low = np.asarray(universe.low, dtype=np.float64)
+    valid = ~np.isnan(close)
+    counts = valid.sum(axis=0)
+    keep = counts > 0
+    if not keep.all():
+        close, low, valid, counts = close[:, keep], low[:, keep], valid[:, keep], counts[keep]
+    symbols = np.array(universe.symbols, dtype=object)[keep]
+    n, m = close.shape
+    cols = np.arange(m)
+
+    first_row = valid.argmax(axis=0)
+    first = close[first_row, cols]
+    last_row = n - 1 - valid[::-1].argmax(axis=0)
+    latest = close[last_row, cols]
+    total_return = (latest - first) / first * 100
+
+    returns = session_returns(close, valid, first_row)
+    returns *= 100
+    volatility = _nanstd(returns)
+
+    ma20 = _last_mean(close, valid, counts, 20)
+    ma50 = _last_mean(close, valid, counts, 50)
+    start, mask = _tail_mask(valid, counts, SR_WINDOW)
+    support = np.where(mask, low[start:], np.inf).min(axis=0)
+    support[np.isinf(support)] = np.nan
+
+    # Mêmes règles que analysis.global_score, ma_signal et recommendation
+    above_ma20 = latest > ma20
+    score = (2 * (total_return > 0) + (volatility < 4) + above_ma20
+             + (latest > support * 1.02)).astype(np.int64)
+    signal = np.select(
+        [above_ma20 & (ma20 > ma50), above_ma20, (latest < ma20) & (ma20 < ma50)],
+        ['ACHAT', 'ATTENTION', 'VENTE'], 'MAINTENIR')
+    recommendation = np.select([score >= 4, score >= 2], ['ACHETER', 'MAINTENIR'], 'VENDRE')
+
+    result = pd.DataFrame({
+        'symbol': symbols,
+        'latest_price': latest,
+        'total_return': total_return,
+        'volatility': volatility,
+        'ma20': ma20,
+        'ma50': ma50,
+        'support': support,
+        'signal': signal,
+        'score': score,
+        'recommendation': recommendation,
+        'sessions': counts,
+        'last_date': universe.dates[last_row] if n else universe.dates[:0],
+    }, columns=COLUMNS)
+    return result.sort_values(['score', 'total_return'], ascending=False, kind='stable',
+                              na_position='last').reset_index(drop=True)
+
+
+def main(argv=None):
+    from dataviz.store import PriceStore, STORE_DIR, DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Classement des titres du stockage par score global")
+    parser.add_argument('symbols', nargs='*', help="symboles à classer (défaut : tous)")
+    parser.add_argument('-o', '--output', default=None, help="fichier de résultats (.parquet ou .csv)")
+    parser.add_argument('--store', default=STORE_DIR, help="répertoire du stockage")
+    parser.add_argument('--data', default=DATA_DIR, help="répertoire des exports CSV")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    universe = Universe.from_store(PriceStore(args.store, args.data), args.symbols)
+    loaded = time.perf_counter()
+    result = rank(universe)
+    ranked = time.perf_counter()
+    if args.output is None:
+        print(result.to_string(index=False))
+    elif str(args.output).endswith('.csv'):
+        result.to_csv(args.output, index=False)
+    else:
+        result.to_parquet(args.output, index=False)
+    print(f"{len(result)} titres x {len(universe.dates)} séances : chargement {loaded - start:.2f}s, "
+          f"classement {ranked - loaded:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Emplacements des données et titre par défaut, lus dans l'environnement.
+
+Module sans dépendance lourde : les pages peuvent l'importer sans charger
+NumPy ni pandas."""
+import os
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get("DATAVIZ_DATA_DIR", "."))
+STORE_DIR = Path(os.environ.get("DATAVIZ_STORE_DIR", Path(".cache") / "store"))
+
+DEFAULT_SYMBOL = "BOUYGUES"
+
+# Profil de stockage des colonnes : 'full' (float64) ou 'compact' (float32/uint32),
+# voir data.STORAGE_PROFILES
+STORAGE_PROFILE = os.environ.get("DATAVIZ_STORAGE", "full")
+
+# Rendu des courbes : 'auto' (WebGL au-delà de WEBGL_THRESHOLD points, dates et
+# valeurs transmises en tableaux binaires) ou 'svg' (rendu SVG, dates ISO)
+CHART_MODE = os.environ.get("DATAVIZ_CHARTS", "auto")
+WEBGL_THRESHOLD = int(os.environ.get("DATAVIZ_WEBGL_THRESHOLD", "5000"))
+
+# Budget mémoire du cache de résultats partagé par les sessions (voir dataviz.cache)
+CACHE_BYTES = int(os.environ.get("DATAVIZ_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+# Dossier des fichiers de transactions que le mode temps réel peut suivre
+# (voir live.feed_path) : aucun autre fichier du serveur ne peut être ouvert
+LIVE_DIR = Path(os.environ.get("DATAVIZ_LIVE_DIR", DATA_DIR / "live"))
+
+# Titres comparés par défaut dans la page Corrélations (liste séparée par des
+# virgules) ; à défaut, les CORRELATION_DEFAULT_PEERS premiers titres journaliers
+CORRELATION_PEERS = [s for s in os.environ.get("DATAVIZ_PEERS", "").split(",") if s]
+CORRELATION_DEFAULT_PEERS = int(os.environ.get("DATAVIZ_DEFAULT_PEERS", "10"))
@@ -0,0 +1,134 @@
+"""Stockage multi-titres (settings.STORE_DIR, .cache/store par défaut) : un
+répertoire par symbole contenant un fichier binaire brut .bin par colonne, lu en
+memory-map (voir data.write_columns / data.read_columns), avec son meta.json,
+plus un index symbole -> plage de dates et version."""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz import data, indicators, rollups
+from dataviz.settings import DATA_DIR, STORE_DIR, STORAGE_PROFILE
+
+CSV_SUFFIX = "_historical_price.csv"
+INDEX_FILE = "index.json"
+
+
+class PriceStore:
+    def __init__(self, root=STORE_DIR, source_dir=DATA_DIR, profile=STORAGE_PROFILE):
+        self.root = Path(root)
+        self.source_dir = Path(source_dir)
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._index = self._read_index()
+
+    # Index symbole -> {rows, first, last, version} ; évite d'ouvrir les colonnes
+    # pour lister les titres ou connaître leur plage de dates
+    def _read_index(self):
+        try:
+            with open(self.root / INDEX_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / INDEX_FILE
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, path)
+
+    def csv_path(self, symbol):
+        return self.source_dir / (symbol + CSV_SUFFIX)
+
+    def symbol_dir(self, symbol):
+        return self.root / symbol
+
+    # Titres disponibles : exports CSV présents et symboles déjà stockés
+    def symbols(self):
+        found = {p.name[:-len(CSV_SUFFIX)] for p in self.source_dir.glob('*' + CSV_SUFFIX)}
+        return sorted(found | set(self._index))
+
+    # Titres à barres journalières : les séries intraday (SYMBOLE@5m) sont exclues
+    def daily_symbols(self):
+        return [symbol for symbol in self.symbols() if '@' not in symbol]
+
+    # Met à jour les colonnes d'un symbole depuis son export CSV si celui-ci a changé.
+    # Sans CSV source, le contenu déjà stocké fait foi.
+    # write_index=False laisse l'écriture de l'index à l'appelant (voir refresh),
+    # par exemple quand plusieurs processus synchronisent des symboles en parallèle.
+    def sync(self, symbol, write_index=True):
+        csv = self.csv_path(symbol)
+        if not csv.exists():
+            if symbol not in self._index:
+                raise KeyError(f"Symbole inconnu : {symbol}")
+            return self._index[symbol]
+
+        meta = data.sync_cache(csv, self.symbol_dir(symbol), self.profile)
+        # Agrégats semaine / mois / trimestre, recalculés à chaque nouvelle version
+        rollups.sync_rollups(self.symbol_dir(symbol), meta)
+        self._update_index(symbol, meta, write_index)
+        return self._index[symbol]
+
+    def _update_index(self, symbol, meta, write_index=True):
+        entry = self._index.get(symbol)
+        if entry is None or entry.get('version') != meta['version']:
+            with self._lock:
+                self._index[symbol] = {
+                    'rows': meta['rows'],
+                    'first': meta['first_date'],
+                    'last': meta['last_date'],
+                    'version': meta['version'],
+                }
+                if write_index:
+                    self._write_index()
+
+    # Enregistre un frame calculé (par exemple des barres intraday) sous un symbole
+    def write_frame(self, symbol, df, version, source=None):
+        meta = data.write_frame(df, self.symbol_dir(symbol), version, source, self.profile)
+        rollups.sync_rollups(self.symbol_dir(symbol), meta)
+        self._update_index(symbol, meta)
+        return self._index[symbol]
+
+    # Synchronise plusieurs symboles et n'écrit l'index qu'une fois
+    def refresh(self, symbols):
+        for symbol in symbols:
+            self.sync(symbol, write_index=False)
+        with self._lock:
+            self._write_index()
+
+    def version(self, symbol):
+        return self.sync(symbol)['version']
+
+    # Versions de symboles déjà synchronisés, lues dans l'index en une fois (sans
+    # contrôle des exports CSV, voir refresh) : ((symbole, version), ...)
+    def versions(self, symbols):
+        with self._lock:
+            return tuple((symbol, self._index[symbol]['version']) for symbol in symbols)
+
+    # Plage de dates d'un symbole, lue dans l'index
+    def date_bounds(self, symbol):
+        entry = self.sync(symbol)
+        return np.datetime64(entry['first']), np.datetime64(entry['last'])
+
+    # Ouverture d'un symbole : un memory-map par colonne, aucune lecture des données.
+    # Seules les pages effectivement parcourues sont chargées par le système.
+    def open(self, symbol, columns=data.COLUMNS, write_index=True):
+        self.sync(symbol, write_index)
+        return data.read_columns(self.symbol_dir(symbol), columns)
+
+    # Indicateurs glissants du symbole, mis à jour de façon incrémentale après un ajout
+    def indicators(self, symbol, write_index=True):
+        self.sync(symbol, write_index)
+        meta = data.read_meta(self.symbol_dir(symbol))
+        indicators.sync_indicators(self.symbol_dir(symbol), meta)
+        return indicators.read_indicators(self.symbol_dir(symbol))
+
+    # Prix et indicateurs d'un symbole dans un même frame, sans copie
+    def analysis_frame(self, symbol, write_index=True):
+        return pd.concat([self.open(symbol, write_index=write_index),
+                          self.indicators(symbol, write_index)], axis=1)
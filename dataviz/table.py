@@ -0,0 +1,99 @@
+"""Tableau de données paginé côté serveur : tri par permutations précalculées
+(une par colonne, calculée au premier tri sur cette colonne), filtre par plage
+de lignes (période) et par intervalle de valeurs, et lecture des seules lignes
+de la page demandée.
+
+Les permutations sont parcourues par blocs : la mémoire de travail d'une
+requête est bornée par BLOCK, quelle que soit la taille de la période."""
+import threading
+
+import numpy as np
+
+BLOCK = 65536
+PAGE_SIZES = (50, 100, 500)
+
+
+class TableIndex:
+    def __init__(self, df):
+        self.df = df
+        # Stockage dans l'ordre chronologique : vérifié une fois, pas à chaque page
+        self.date_sorted = bool(df['Date'].is_monotonic_increasing)
+        self._perms = {}
+        self._lock = threading.Lock()
+
+    # Permutation triant la colonne par ordre croissant (tri stable, NaN en fin)
+    # et nombre de valeurs non manquantes
+    def permutation(self, column):
+        with self._lock:
+            entry = self._perms.get(column)
+        if entry is None:
+            values = self.df[column].to_numpy()
+            perm = np.argsort(values, kind='stable')
+            valid = int(np.count_nonzero(~np.isnan(values))) if values.dtype.kind == 'f' else len(values)
+            entry = (perm, valid)
+            with self._lock:
+                self._perms[column] = entry
+        return entry
+
+    # Numéros de ligne dans l'ordre demandé, par blocs. En ordre décroissant, les
+    # valeurs manquantes restent en fin (comme DataFrame.sort_values).
+    def _ordered_blocks(self, column, ascending):
+        perm, valid = self.permutation(column)
+        if ascending:
+            for start in range(0, len(perm), BLOCK):
+                yield perm[start:start + BLOCK]
+            return
+        for stop in range(valid, 0, -BLOCK):
+            yield perm[max(stop - BLOCK, 0):stop][::-1]
+        for start in range(valid, len(perm), BLOCK):
+            yield perm[start:start + BLOCK]
+
+    def _keep(self, rows, lo, hi, value_filter):
+        keep = (rows >= lo) & (rows < hi)
+        if value_filter is not None:
+            column, vmin, vmax = value_filter
+            values = self.df[column].to_numpy()[rows]
+            keep &= (values >= vmin) & (values <= vmax)
+        return keep
+
+    # Nombre de lignes de [lo, hi) retenues par le filtre de valeurs
+    def count(self, lo, hi, value_filter=None):
+        if value_filter is None:
+            return hi - lo
+        column, vmin, vmax = value_filter
+        values = self.df[column].to_numpy()
+        total = 0
+        for start in range(lo, hi, BLOCK):
+            chunk = values[start:min(start + BLOCK, hi)]
+            total += int(np.count_nonzero((chunk >= vmin) & (chunk <= vmax)))
+        return total
+
+    # Numéros des lignes de la page : lignes [lo, hi) (période), filtrées par
+    # value_filter = (colonne, min, max), triées par sort_by, à partir de offset
+    def page_rows(self, lo, hi, sort_by, ascending=True, offset=0, limit=PAGE_SIZES[0], value_filter=None):
+        if value_filter is None and sort_by == 'Date' and self.date_sorted:
+            # Ordre naturel du stockage : la page est une tranche contiguë
+            if ascending:
+                return np.arange(lo + offset, min(lo + offset + limit, hi))
+            top = hi - offset
+            return np.arange(top - 1, max(top - limit, lo) - 1, -1)
+
+        skipped = 0
+        pages = []
+        collected = 0
+        for rows in self._ordered_blocks(sort_by, ascending):
+            rows = rows[self._keep(rows, lo, hi, value_filter)]
+            if skipped + len(rows) <= offset:
+                skipped += len(rows)
+                continue
+            rows = rows[max(offset - skipped, 0):]
+            skipped = offset
+            pages.append(rows[:limit - collected])
+            collected += len(pages[-1])
+            if collected >= limit:
+                break
+        return np.concatenate(pages) if pages else np.empty(0, dtype=np.intp)
+
+    def page(self, lo, hi, sort_by, ascending=True, offset=0, limit=PAGE_SIZES[0], value_filter=None):
+        rows = self.page_rows(lo, hi, sort_by, ascending, offset, limit, value_filter)
+        return self.df.take(rows)
@@ -1,45 +1,33 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from common import show_header
+from common import show_header, load_data, select_ticker, start_profiling, show_profile, backtest_grid, price_levels
+from dataviz.analysis import analyze, SR_WINDOW
+from dataviz.backtest import best_pair
+from dataviz.downsample import decimate
+from dataviz.figures import line_trace, date_axes
+from dataviz.levels import nearest_levels
 
-show_header()
+prof = start_profiling("Analyses")
 
-# Chargement des données
-@st.cache_data
-def load_data():
-    df = pd.read_csv('BOUYGUES_historical_price.csv', sep=';')
-    
-    # Conversion des colonnes numériques
-    numeric_cols = ['Open', 'High', 'Low', 'Last', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover', 'vwap']
-    for col in numeric_cols:
-        df[col] = df[col].astype(str).str.replace(',', '.').astype(float)
-    
-    # Conversion de la date
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values('Date').reset_index(drop=True)
-    
-    return df
+ticker = select_ticker()
+show_header(ticker)
 
-df = load_data()
+# Données et indicateurs (Daily_Return, MA20, MA50, Volatility_20d, Cumulative_Return),
+# calculés une fois par version des données et partagés en lecture seule
+df = load_data(ticker, with_indicators=True)
 
-# Calculs pour l'analyse
-df['Daily_Return'] = df['Close'].pct_change() * 100
-df['MA20'] = df['Close'].rolling(window=20).mean()
-df['MA50'] = df['Close'].rolling(window=50).mean()
-df['Volatility_20d'] = df['Close'].rolling(window=20).std()
-df['Cumulative_Return'] = (1 + df['Close'].pct_change()).cumprod() - 1
+# Conclusions calculées hors Streamlit (voir dataviz.analysis)
+result = analyze(df)
 
 st.header("Analyses et Conclusions Operationnelles")
 st.markdown("---")
 
 # SECTION 1: Tendance de Prix
+prof.step("1. Tendance")
 st.header("1. Analyse de la Tendance des Prix")
 
-latest_price = df['Close'].iloc[-1]
-first_price = df['Close'].iloc[0]
-total_return = ((latest_price - first_price) / first_price) * 100
+latest_price = result['latest_price']
+first_price = result['first_price']
+total_return = result['total_return']
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -54,14 +42,14 @@ st.markdown("---")
 # Conclusion sur la tendance
 if total_return > 0:
     st.success(f"""
-    **CONCLUSION POSITIVE :** L'action BOUYGUES a realise une performance positive de {total_return:.2f}% 
+    **CONCLUSION POSITIVE :** L'action {ticker} a realise une performance positive de {total_return:.2f}% 
     sur la periode analysee. 
     **Recommandation :** Maintenir ou augmenter les positions. La tendance haussiere indique 
     une bonne performance de l'entreprise.
     """)
 else:
     st.error(f"""
-    **CONCLUSION NEGATIVE :** L'action BOUYGUES a perdu {abs(total_return):.2f}% sur la periode analysee.
+    **CONCLUSION NEGATIVE :** L'action {ticker} a perdu {abs(total_return):.2f}% sur la periode analysee.
     **Recommandation :** Surveiller de pres les indicateurs financiers et la strategie de l'entreprise 
     avant de prendre des decisions d'investissement.
     """)
@@ -69,10 +57,11 @@ else:
 st.markdown("---")
 
 # SECTION 2: Analyse de Volatilite
+prof.step("2. Volatilite")
 st.header("2. Analyse de la Volatilite et du Risque")
 
-volatility = df['Daily_Return'].std()
-avg_volatility = df['Volatility_20d'].mean()
+volatility = result['volatility']
+avg_volatility = result['avg_volatility']
 
 col1, col2 = st.columns(2)
 with col1:
@@ -80,11 +69,13 @@ with col1:
 with col2:
     st.metric("Ecart-type du Prix", f"{avg_volatility:.2f}€")
 
-# Graphique de volatilite
+# Graphique de volatilite (plotly n'est importé qu'au premier graphique)
+import plotly.graph_objects as go
+
 fig_vol = go.Figure()
-fig_vol.add_trace(go.Scatter(
-    x=df['Date'],
-    y=df['Daily_Return'],
+fig_vol.add_trace(line_trace(
+    df['Date'],
+    df['Daily_Return'],
     mode='lines',
     name='Rendements Journaliers',
     line=dict(color='blue', width=1)
@@ -99,6 +90,7 @@ fig_vol.update_layout(
     yaxis_title='Rendement (%)',
     height=400
 )
+date_axes(fig_vol)
 st.plotly_chart(fig_vol, use_container_width=True)
 
 # Conclusion sur la volatilite
@@ -124,13 +116,13 @@ else:
 st.markdown("---")
 
 # SECTION 3: Analyse des Signaux de Trading
+prof.step("3. Signaux")
 st.header("3. Signaux de Trading et Points d'Entree/Sortie")
 
 # Derniers signaux
-current_price = df['Close'].iloc[-1]
-current_ma20 = df['MA20'].iloc[-1]
-current_ma50 = df['MA50'].iloc[-1]
-current_vwap = df['vwap'].iloc[-1]
+current_price = result['latest_price']
+current_ma20 = result['ma20']
+current_ma50 = result['ma50']
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -142,21 +134,22 @@ with col3:
 
 # Graphique avec MA
 fig_ma = go.Figure()
-fig_ma.add_trace(go.Scatter(x=df['Date'], y=df['Close'], name='Prix', line=dict(color='blue', width=2)))
-fig_ma.add_trace(go.Scatter(x=df['Date'], y=df['MA20'], name='MA 20', line=dict(color='orange', width=1.5)))
-fig_ma.add_trace(go.Scatter(x=df['Date'], y=df['MA50'], name='MA 50', line=dict(color='green', width=1.5)))
+fig_ma.add_trace(line_trace(df['Date'], df['Close'], name='Prix', line=dict(color='blue', width=2)))
+fig_ma.add_trace(line_trace(df['Date'], df['MA20'], name='MA 20', line=dict(color='orange', width=1.5)))
+fig_ma.add_trace(line_trace(df['Date'], df['MA50'], name='MA 50', line=dict(color='green', width=1.5)))
 fig_ma.update_layout(
     title='Prix et Moyennes Mobiles - Identification des Signaux',
     xaxis_title='Date',
     yaxis_title='Prix (€)',
     height=500
 )
+date_axes(fig_ma)
 st.plotly_chart(fig_ma, use_container_width=True)
 
 # Signaux de trading
 st.subheader("Signaux Actuels")
 
-if current_price > current_ma20 and current_ma20 > current_ma50:
+if result['signal'] == 'ACHAT':
     st.success(f"""
     **SIGNAL HAUSSIER FORT :** Prix ({current_price:.2f}€) > MA20 ({current_ma20:.2f}€) > MA50 ({current_ma50:.2f}€)
     
@@ -165,7 +158,7 @@ if current_price > current_ma20 and current_ma20 > current_ma50:
     - Momentum positif
     - Maintenir les positions existantes
     """)
-elif current_price > current_ma20:
+elif result['signal'] == 'ATTENTION':
     st.warning(f"""
     **SIGNAL MIXTE :** Prix ({current_price:.2f}€) > MA20 ({current_ma20:.2f}€) mais MA20 < MA50 ({current_ma50:.2f}€)
     
@@ -174,7 +167,7 @@ elif current_price > current_ma20:
     - Attendre le croisement des moyennes
     - Surveiller le support actuel
     """)
-elif current_price < current_ma20 and current_ma20 < current_ma50:
+elif result['signal'] == 'VENTE':
     st.error(f"""
     **SIGNAL BAISSIER FORT :** Prix ({current_price:.2f}€) < MA20 ({current_ma20:.2f}€) < MA50 ({current_ma50:.2f}€)
     
@@ -196,12 +189,13 @@ else:
 st.markdown("---")
 
 # SECTION 4: Points critiques (Support/Resistance)
+prof.step("4. Supports et resistances")
 st.header("4. Identification des Supports et Resistances")
 
 # Calcul des supports et resistances sur 30 derniers jours
-df_recent = df.tail(30)
-support_level = df_recent['Low'].min()
-resistance_level = df_recent['High'].max()
+df_recent = df.tail(SR_WINDOW)
+support_level = result['support']
+resistance_level = result['resistance']
 
 col1, col2 = st.columns(2)
 with col1:
@@ -210,7 +204,7 @@ with col2:
     st.metric("Resistance Actuelle (30 jours)", f"{resistance_level:.2f}€")
 
 fig_sr = go.Figure()
-fig_sr.add_trace(go.Scatter(x=df_recent['Date'], y=df_recent['Close'], name='Prix', line=dict(color='blue', width=2)))
+fig_sr.add_trace(line_trace(df_recent['Date'], df_recent['Close'], name='Prix', line=dict(color='blue', width=2)))
 fig_sr.add_hline(y=support_level, line_dash="dash", line_color="green", 
                 annotation_text=f"Support: {support_level:.2f}€", annotation_position="bottom right")
 fig_sr.add_hline(y=resistance_level, line_dash="dash", line_color="red", 
@@ -221,13 +215,14 @@ fig_sr.update_layout(
     yaxis_title='Prix (€)',
     height=400
 )
+date_axes(fig_sr)
 st.plotly_chart(fig_sr, use_container_width=True)
 
 # Conclusion sur les supports/resistances
-distance_to_support = ((current_price - support_level) / current_price) * 100
-distance_to_resistance = ((resistance_level - current_price) / current_price) * 100
+distance_to_support = result['distance_to_support']
+distance_to_resistance = result['distance_to_resistance']
 
-if current_price > support_level * 1.02 and current_price < resistance_level * 0.98:
+if result['position'] == 'SECURE':
     st.success(f"""
     **POSITION SECURE :** Le prix ({current_price:.2f}€) est dans la zone de securite.
     
@@ -236,7 +231,7 @@ if current_price > support_level * 1.02 and current_price < resistance_level * 0
     
     **DECISION :** Maintenir les positions. Zone d'equilibre saine.
     """)
-elif current_price <= support_level * 1.02:
+elif result['position'] == 'SUPPORT':
     st.warning(f"""
     **PROXIMITE DU SUPPORT :** Le prix ({current_price:.2f}€) est proche du support ({support_level:.2f}€).
     
@@ -251,21 +246,67 @@ else:
     Considerer la vente partielle pour securiser les gains.
     """)
 
+# Niveaux detectes sur plusieurs fenetres : pivots hauts et bas regroupes par prix,
+# ponderes par le nombre de contacts et le volume (voir dataviz.levels)
+st.subheader("Niveaux Multi-Fenetres")
+
+LEVEL_PERIODS = {"6 mois": 126, "1 an": 252, "3 ans": 756, "5 ans": 1260, "Tout l'historique": 0}
+col1, col2 = st.columns(2)
+with col1:
+    level_period = st.selectbox("Periode de detection", list(LEVEL_PERIODS), index=1)
+with col2:
+    level_count = st.slider("Nombre de niveaux", 2, 20, 8)
+
+lookback = LEVEL_PERIODS[level_period]
+levels = price_levels(ticker, lookback, level_count)
+df_levels = df.tail(lookback) if lookback else df
+near_support, near_resistance = nearest_levels(levels, current_price)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Support le plus proche", f"{near_support:.2f}€" if near_support is not None else "aucun")
+with col2:
+    st.metric("Resistance la plus proche", f"{near_resistance:.2f}€" if near_resistance is not None else "aucune")
+with col3:
+    st.metric("Niveaux detectes", len(levels))
+
+fig_levels = go.Figure()
+close_x, close_y = decimate(df_levels['Date'].to_numpy(), df_levels['Close'].to_numpy())
+fig_levels.add_trace(line_trace(close_x, close_y, name='Prix', line=dict(color='blue', width=2)))
+top_score = levels['Score'].max() if len(levels) else 1.0
+for level in levels.itertuples(index=False):
+    fig_levels.add_hline(
+        y=level.Niveau,
+        line_color="green" if level.Type == 'support' else "red",
+        line_width=1 + 3 * level.Score / top_score,
+        opacity=0.4 + 0.6 * level.Score / top_score,
+        annotation_text=f"{level.Niveau:.2f}€ ({level.Contacts} contacts)",
+        annotation_position="top left"
+    )
+fig_levels.update_layout(
+    title=f'Supports et Resistances ({level_period.lower()})',
+    xaxis_title='Date',
+    yaxis_title='Prix (€)',
+    height=500
+)
+date_axes(fig_levels)
+st.plotly_chart(fig_levels, use_container_width=True)
+
+st.dataframe(
+    levels.style.format({'Niveau': '{:.2f}€', 'Volume': '{:,.0f}', 'Score': '{:.1f}'}),
+    use_container_width=True,
+    hide_index=True
+)
+st.caption("L'epaisseur des lignes est proportionnelle au score du niveau (contacts, force des pivots, volume echange).")
+
 st.markdown("---")
 
 # SECTION 5: Recommandations Globales
+prof.step("5. Synthese")
 st.header("5. Synthese et Recommandations Globales")
 
 # Score global
-score = 0
-if total_return > 0:
-    score += 2
-if volatility < 4:
-    score += 1
-if current_price > current_ma20:
-    score += 1
-if current_price > support_level * 1.02:
-    score += 1
+score = result['score']
 
 st.subheader(f"Score Global : {score}/5")
 
@@ -292,7 +333,7 @@ with col3:
     else:
         st.error("Tendance: BAISSIERE")
 
-if score >= 4:
+if result['recommendation'] == 'ACHETER':
     st.success(f"""
     **RECOMMANDATION PRINCIPALE :** ACHETER / AUGMENTER LES POSITIONS
     
@@ -304,7 +345,7 @@ if score >= 4:
     
     **Action concrete :** Ouvrir ou augmenter les positions avec un stop-loss sous {support_level:.2f}€
     """)
-elif score >= 2:
+elif result['recommendation'] == 'MAINTENIR':
     st.warning(f"""
     **RECOMMANDATION PRINCIPALE :** MAINTENIR / OBSERVER
     
@@ -329,4 +370,74 @@ else:
 
 st.markdown("---")
 
-st.caption("Analyses realisees automatiquement sur les donnees historiques BOUYGUES. Pour des decisions financieres importantes, consultez un conseiller en investissement.")
+# SECTION 6: Backtest des croisements de moyennes mobiles
+prof.step("6. Backtest")
+st.header("6. Backtest des Croisements de Moyennes Mobiles")
+
+st.markdown("""
+Regle testee sur tout l'historique : position acheteuse quand la moyenne courte est au-dessus
+de la moyenne longue, aucune position sinon. Chaque couple de fenetres de la grille est evalue.
+""")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    short_range = st.slider("Fenetres courtes", 2, 100, (5, 60))
+with col2:
+    long_range = st.slider("Fenetres longues", 10, 300, (20, 250))
+    long_step = st.select_slider("Pas des fenetres longues", [1, 2, 5, 10], value=5)
+with col3:
+    fee_bps = st.number_input("Frais par transaction (pb)", 0.0, 100.0, 5.0, 1.0)
+
+shorts = list(range(short_range[0], short_range[1] + 1))
+longs = list(range(long_range[0], long_range[1] + 1, long_step))
+grid = backtest_grid(ticker, shorts, longs, fee_bps / 10000)
+
+best = best_pair(grid, shorts, longs)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Achat-conservation", f"{total_return:+.2f}%")
+with col2:
+    if 20 in shorts and 50 in longs:
+        i, j = shorts.index(20), longs.index(50)
+        st.metric("Croisement MA20/MA50", f"{grid['total_return'][i, j] * 100:+.2f}%",
+                  f"drawdown {grid['max_drawdown'][i, j] * 100:.1f}%", delta_color="off")
+    else:
+        st.metric("Croisement MA20/MA50", "hors grille")
+with col3:
+    if best:
+        i, j = shorts.index(best[0]), longs.index(best[1])
+        st.metric(f"Meilleur couple MA{best[0]}/MA{best[1]}", f"{best[2] * 100:+.2f}%",
+                  f"drawdown {grid['max_drawdown'][i, j] * 100:.1f}%", delta_color="off")
+
+tab_pnl, tab_dd = st.tabs(["Rendement total", "Drawdown maximal"])
+for tab, metric, title, scale in (
+    (tab_pnl, 'total_return', "Rendement total (%)", 'RdYlGn'),
+    (tab_dd, 'max_drawdown', "Drawdown maximal (%)", 'Reds_r'),
+):
+    with tab:
+        fig_grid = go.Figure(go.Heatmap(
+            z=grid[metric] * 100,
+            x=longs,
+            y=shorts,
+            colorscale=scale,
+            zmid=0 if metric == 'total_return' else None,
+            colorbar=dict(title='%'),
+            hovertemplate='MA%{y} / MA%{x}<br>%{z:.2f}%<extra></extra>'
+        ))
+        fig_grid.update_layout(
+            title=title,
+            xaxis_title='Fenetre longue',
+            yaxis_title='Fenetre courte',
+            height=500
+        )
+        st.plotly_chart(fig_grid, use_container_width=True)
+
+st.caption("Rendements hors dividendes ; les frais sont preleves a chaque changement de position. "
+           "Un meilleur couple passe ne garantit pas les performances futures.")
+
+st.markdown("---")
+
+st.caption(f"Analyses realisees automatiquement sur les donnees historiques {ticker}. Pour des decisions financieres importantes, consultez un conseiller en investissement.")
+
+show_profile(prof)
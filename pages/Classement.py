@@ -0,0 +1,97 @@
+import streamlit as st
+from common import show_header, screen_universe, start_profiling, show_profile
+
+prof = start_profiling("Classement")
+
+show_header()
+
+st.header("Classement des Titres par Score Global")
+
+st.markdown("""
+Score Global de la page Analyses (0 a 5) calcule pour tous les titres du stockage :
+rendement total positif (+2), volatilite journaliere < 4% (+1), prix au-dessus de la MA20 (+1)
+et prix au-dessus du support 30 jours de plus de 2% (+1).
+""")
+
+prof.step("Classement")
+ranking = screen_universe()
+
+# Filtres
+prof.step("Filtres")
+st.sidebar.header("⚙️ Filtres")
+min_score = st.sidebar.slider("Score minimum", 0, 5, 0)
+recommendations = st.sidebar.multiselect(
+    "Recommandation", ['ACHETER', 'MAINTENIR', 'VENDRE'], default=['ACHETER', 'MAINTENIR', 'VENDRE']
+)
+signals = st.sidebar.multiselect(
+    "Signal des moyennes mobiles", ['ACHAT', 'ATTENTION', 'MAINTENIR', 'VENTE'],
+    default=['ACHAT', 'ATTENTION', 'MAINTENIR', 'VENTE']
+)
+
+SORT_COLUMNS = {
+    "Score": 'score',
+    "Rendement total": 'total_return',
+    "Volatilite": 'volatility',
+    "Dernier prix": 'latest_price',
+    "Symbole": 'symbol',
+}
+col1, col2 = st.columns([3, 1])
+with col1:
+    sort_label = st.selectbox("Trier par", list(SORT_COLUMNS))
+with col2:
+    descending = st.toggle("Decroissant", value=sort_label != "Symbole")
+
+view = ranking[
+    (ranking['score'] >= min_score)
+    & ranking['recommendation'].isin(recommendations)
+    & ranking['signal'].isin(signals)
+]
+sort_by = SORT_COLUMNS[sort_label]
+if sort_by != 'score':
+    view = view.sort_values(sort_by, ascending=not descending, kind='stable', na_position='last')
+elif not descending:
+    view = view.iloc[::-1]
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Titres retenus", f"{len(view)} / {len(ranking)}")
+with col2:
+    st.metric("A acheter", int((view['recommendation'] == 'ACHETER').sum()))
+with col3:
+    st.metric("A maintenir", int((view['recommendation'] == 'MAINTENIR').sum()))
+with col4:
+    st.metric("A vendre", int((view['recommendation'] == 'VENDRE').sum()))
+
+prof.step("Tableau")
+st.dataframe(
+    view.rename(columns={
+        'symbol': 'Symbole',
+        'latest_price': 'Dernier prix (€)',
+        'total_return': 'Rendement total (%)',
+        'volatility': 'Volatilite (%)',
+        'ma20': 'MA20',
+        'ma50': 'MA50',
+        'support': 'Support 30j',
+        'signal': 'Signal',
+        'score': 'Score',
+        'recommendation': 'Recommandation',
+        'sessions': 'Seances',
+        'last_date': 'Derniere seance',
+    }),
+    column_config={
+        'Dernier prix (€)': st.column_config.NumberColumn(format="%.2f"),
+        'Rendement total (%)': st.column_config.NumberColumn(format="%+.2f"),
+        'Volatilite (%)': st.column_config.NumberColumn(format="%.2f"),
+        'MA20': st.column_config.NumberColumn(format="%.2f"),
+        'MA50': st.column_config.NumberColumn(format="%.2f"),
+        'Support 30j': st.column_config.NumberColumn(format="%.2f"),
+        'Score': st.column_config.ProgressColumn(min_value=0, max_value=5, format="%d"),
+        'Derniere seance': st.column_config.DateColumn(format="DD/MM/YYYY"),
+    },
+    use_container_width=True,
+    hide_index=True
+)
+
+st.caption("Classement recalcule a chaque mise a jour des donnees d'un titre. Le score ne constitue pas un conseil en investissement.")
+
+show_profile(prof)
@@ -0,0 +1,102 @@
+import streamlit as st
+import numpy as np
+from common import show_header, select_ticker, start_profiling, show_profile, get_store, rolling_comoments, universe_returns
+from dataviz.correlation import rolling_pair_corr
+from dataviz.figures import line_trace, date_axes
+from dataviz.settings import CORRELATION_PEERS, CORRELATION_DEFAULT_PEERS
+
+prof = start_profiling("Correlations")
+
+ticker = select_ticker()
+show_header(ticker)
+
+st.header("Correlations et Covariances entre Titres")
+
+st.markdown("""
+Matrices calculees sur les rendements journaliers des dernieres seances. Pour chaque paire de titres,
+seuls les jours ou les deux titres ont cote sont pris en compte.
+""")
+
+# Paramètres
+prof.step("Parametres")
+st.sidebar.header("⚙️ Parametres")
+# Seuls les titres journaliers sont comparables (pas les séries intraday SYMBOLE@5m) ;
+# la sélection par défaut est bornée pour garder une matrice lisible
+all_symbols = [s for s in get_store().daily_symbols() if s != ticker]
+default_peers = [s for s in CORRELATION_PEERS if s in all_symbols] or all_symbols[:CORRELATION_DEFAULT_PEERS]
+peers = st.sidebar.multiselect("Titres compares", all_symbols, default=default_peers)
+symbols = [ticker] + [s for s in peers if s != ticker]
+window = st.sidebar.slider("Fenetre (seances)", 20, 250, 60)
+kind = st.sidebar.radio("Matrice", ["Correlation", "Covariance"])
+
+if '@' in ticker:
+    st.info("Les correlations portent sur les seances journalieres : selectionnez un titre sans barres intraday.")
+elif len(symbols) < 2:
+    st.info("Selectionnez au moins un autre titre pour calculer des correlations.")
+else:
+    prof.step("Matrice")
+    engine = rolling_comoments(symbols, window)
+    matrix = engine.corr() if kind == "Correlation" else engine.cov()
+    counts = engine.counts()
+
+    import plotly.graph_objects as go
+
+    st.subheader(f"Matrice de {kind.lower()} ({window} dernieres seances)")
+    if kind == "Correlation":
+        z, zmin, zmax, text = matrix.to_numpy(), -1, 1, '%{z:.2f}'
+    else:
+        # Covariance des rendements journaliers en %²
+        z, zmin, zmax, text = matrix.to_numpy() * 1e4, None, None, '%{z:.3f}'
+    fig_matrix = go.Figure(go.Heatmap(
+        z=z,
+        x=matrix.columns,
+        y=matrix.index,
+        zmin=zmin,
+        zmax=zmax,
+        zmid=0,
+        colorscale='RdBu_r',
+        customdata=counts.to_numpy(),
+        hovertemplate='%{y} / %{x}<br>' + text + '<br>%{customdata} seances communes<extra></extra>'
+    ))
+    fig_matrix.update_layout(
+        height=max(400, min(1200, 18 * len(symbols))),
+        yaxis=dict(autorange='reversed')
+    )
+    st.plotly_chart(fig_matrix, use_container_width=True)
+
+    # Titres les plus et les moins corrélés au titre sélectionné
+    prof.step("Classement des pairs")
+    corr = engine.corr()
+    ranking = corr[ticker].drop(ticker).dropna().sort_values(ascending=False)
+    st.subheader(f"Correlation avec {ticker}")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Plus correles**")
+        st.dataframe(ranking.head(10).rename("Correlation").to_frame().style.format('{:.2f}'),
+                     use_container_width=True)
+    with col2:
+        st.markdown("**Moins correles**")
+        st.dataframe(ranking.tail(10)[::-1].rename("Correlation").to_frame().style.format('{:.2f}'),
+                     use_container_width=True)
+
+    # Corrélation glissante sur tout l'historique commun d'une paire
+    prof.step("Correlation glissante")
+    st.subheader("Correlation Glissante")
+    peer = st.selectbox("Titre compare", symbols[1:])
+    dates, returns = universe_returns(symbols)
+    pair = rolling_pair_corr(returns[:, 0], returns[:, symbols.index(peer)], window)
+    shown = ~np.isnan(pair)
+    fig_pair = go.Figure(line_trace(dates[shown], pair[shown], name='Correlation',
+                                    line=dict(color='blue', width=2)))
+    fig_pair.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig_pair.update_layout(
+        title=f'Correlation glissante {ticker} / {peer} ({window} seances)',
+        xaxis_title='Date',
+        yaxis_title='Correlation',
+        yaxis=dict(range=[-1, 1]),
+        height=400
+    )
+    date_axes(fig_pair)
+    st.plotly_chart(fig_pair, use_container_width=True)
+
+show_profile(prof)
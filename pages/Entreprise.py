@@ -1,5 +1,8 @@
 import streamlit as st
-from common import show_header
+from common import show_header, start_profiling, show_profile, get_company_figures
+from dataviz.company import load_company, format_share
+
+prof = start_profiling("Entreprise")
 
 show_header()
 
@@ -69,35 +72,18 @@ with col4:
 st.markdown("---")
 
 # Répartition géographique
+prof.step("Repartition geographique")
 st.header("Repartition Geographique du CA")
 
-# Création d'un dataframe pour afficher les données
-import pandas as pd
-geo_data = pd.DataFrame({
-    'Zone Géographique': [
-        'France',
-        'Union européenne (hors France)',
-        'Europe (hors UE)',
-        'Amérique du Nord',
-        'Asie-Pacifique',
-        'Afrique',
-        'Amérique Centrale et du Sud',
-        'Moyen-Orient'
-    ],
-    'Part du CA': [
-        '48,7%',
-        '15,0%',
-        '14,8%',
-        '12,3%',
-        '5,0%',
-        '2,6%',
-        '1,1%',
-        '0,5%'
-    ]
-})
+# Données de src/entreprise.json ; les graphiques sont préconstruits (voir dataviz.company)
+company = load_company()
+company_figures = get_company_figures()
 
 st.dataframe(
-    geo_data,
+    {
+        'Zone Géographique': [row['zone'] for row in company['geographie']],
+        'Part du CA': [format_share(row['part']) for row in company['geographie']],
+    },
     use_container_width=True,
     column_config={
         "Zone Géographique": st.column_config.TextColumn("Zone Géographique"),
@@ -107,53 +93,19 @@ st.dataframe(
 )
 
 # Graphique circulaire pour visualisation
-import plotly.express as px
-
-ca_values = [48.7, 15.0, 14.8, 12.3, 5.0, 2.6, 1.1, 0.5]
-ca_zones = geo_data['Zone Géographique'].tolist()
-
-fig = px.pie(
-    values=ca_values,
-    names=ca_zones,
-    title='Répartition Géographique du Chiffre d\'Affaires',
-    color_discrete_sequence=px.colors.qualitative.Set3
-)
-
-fig.update_traces(
-    textposition='inside',
-    textinfo='percent+label',
-    hovertemplate='%{label}<br>%{value}% du CA<extra></extra>'
-)
-
-fig.update_layout(
-    showlegend=False,
-    height=600
-)
-
-st.plotly_chart(fig, use_container_width=True)
+st.plotly_chart(company_figures['geographie'], use_container_width=True)
 
 st.markdown("---")
 
 # Répartition par secteur d'activité
+prof.step("Repartition par secteur")
 st.header("Repartition par Secteur d'Activite")
 
-secteur_data = pd.DataFrame({
-    'Secteur': [
-        'Construction',
-        'Services multitechniques',
-        'Télécommunications',
-        'Médias'
-    ],
-    'Part du CA': [
-        '48,5%',
-        '33,6%',
-        '13,7%',
-        '4,2%'
-    ]
-})
-
 st.dataframe(
-    secteur_data,
+    {
+        'Secteur': [row['secteur'] for row in company['secteurs']],
+        'Part du CA': [format_share(row['part']) for row in company['secteurs']],
+    },
     use_container_width=True,
     column_config={
         "Secteur": st.column_config.TextColumn("Secteur"),
@@ -163,30 +115,7 @@ st.dataframe(
 )
 
 # Graphique barre pour les secteurs
-secteur_values = [48.5, 33.6, 13.7, 4.2]
-secteur_names = secteur_data['Secteur'].tolist()
-
-fig_secteurs = px.bar(
-    x=secteur_values,
-    y=secteur_names,
-    orientation='h',
-    title='Répartition du CA par Secteur d\'Activité',
-    labels={'x': 'Part du CA (%)', 'y': 'Secteur'},
-    color=secteur_values,
-    color_continuous_scale='Blues'
-)
-
-fig_secteurs.update_traces(
-    text=[f'{v}%' for v in secteur_values],
-    textposition='outside'
-)
-
-fig_secteurs.update_layout(
-    height=400,
-    showlegend=False
-)
-
-st.plotly_chart(fig_secteurs, use_container_width=True)
+st.plotly_chart(company_figures['secteurs'], use_container_width=True)
 
 st.markdown("---")
 
@@ -198,3 +127,5 @@ particulièrement en Europe et en Amérique du Nord. Le groupe repose principale
 sur ses activités de construction et de services multitechniques, complétées par 
 les télécommunications et les médias.
 """)
+
+show_profile(prof)
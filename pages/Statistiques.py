@@ -1,33 +1,22 @@
 import streamlit as st
-import pandas as pd
-from common import show_header
+from common import show_header, load_data, range_summary, select_ticker, start_profiling, show_profile
+from dataviz.data import date_index_range
 
-show_header()
+prof = start_profiling("Statistiques")
 
-# Chargement des données
-@st.cache_data
-def load_data():
-    df = pd.read_csv('BOUYGUES_historical_price.csv', sep=';')
-    
-    # Conversion des colonnes numériques (remplacer les virgules par des points)
-    numeric_cols = ['Open', 'High', 'Low', 'Last', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover', 'vwap']
-    for col in numeric_cols:
-        df[col] = df[col].astype(str).str.replace(',', '.').astype(float)
-    
-    # Conversion de la date
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values('Date').reset_index(drop=True)
-    
-    return df
+ticker = select_ticker()
+show_header(ticker)
 
-df = load_data()
+df = load_data(ticker)
 
 # Sidebar pour les filtres
+prof.step("Filtres")
 st.sidebar.header("⚙️ Filtres")
 
 # Sélection de la période
-min_date = df['Date'].min().to_pydatetime()
-max_date = df['Date'].max().to_pydatetime()
+# (colonne Date triée : bornes lues aux extrémités)
+min_date = df['Date'].iloc[0].to_pydatetime()
+max_date = df['Date'].iloc[-1].to_pydatetime()
 
 date_range = st.sidebar.date_input(
     "Période",
@@ -36,31 +25,29 @@ date_range = st.sidebar.date_input(
     max_value=max_date
 )
 
+# Statistiques calculées par blocs sur l'intervalle de lignes de la période
+# (les colonnes ne sont pas chargées en mémoire, voir common.range_summary)
 if len(date_range) == 2:
-    df_filtered = df[(df['Date'].dt.date >= date_range[0]) & (df['Date'].dt.date <= date_range[1])]
+    lo, hi = date_index_range(df['Date'].to_numpy(), date_range[0], date_range[1])
 else:
-    df_filtered = df
+    lo, hi = 0, len(df)
 
 # Statistiques détaillées
+prof.step("Statistiques")
 st.header("Statistiques Detaillees")
 
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Statistiques de Prix")
-    price_stats = pd.DataFrame({
-        'Moyenne': df_filtered[['Open', 'High', 'Low', 'Close']].mean(),
-        'Min': df_filtered[['Open', 'High', 'Low', 'Close']].min(),
-        'Max': df_filtered[['Open', 'High', 'Low', 'Close']].max(),
-        'Écart-type': df_filtered[['Open', 'High', 'Low', 'Close']].std()
-    })
+    price_stats = range_summary(ticker, ['Open', 'High', 'Low', 'Close'], lo, hi)
+    price_stats.columns = ['Moyenne', 'Min', 'Max', 'Écart-type']
     st.dataframe(price_stats.style.format("{:.2f}€"), use_container_width=True)
 
 with col2:
     st.subheader("Statistiques de Volume")
-    volume_stats = pd.DataFrame({
-        'Moyenne': df_filtered[['Number of Shares', 'Number of Trades', 'Turnover']].mean(),
-        'Min': df_filtered[['Number of Shares', 'Number of Trades', 'Turnover']].min(),
-        'Max': df_filtered[['Number of Shares', 'Number of Trades', 'Turnover']].max()
-    })
+    volume_stats = range_summary(ticker, ['Number of Shares', 'Number of Trades', 'Turnover'], lo, hi, ['mean', 'min', 'max'])
+    volume_stats.columns = ['Moyenne', 'Min', 'Max']
     st.dataframe(volume_stats.style.format("{:,.0f}"), use_container_width=True)
+
+show_profile(prof)
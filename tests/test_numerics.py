@@ -0,0 +1,265 @@
+"""Moteurs de calcul comparés à leur référence pandas, sur des données
+aléatoires avec valeurs manquantes."""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataviz import indicators
+from dataviz.store import PriceStore
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_CSV = ROOT / 'BOUYGUES_historical_price.csv'
+
+
+def random_close(n, nans=(), seed=0):
+    close = 100 + np.cumsum(np.random.default_rng(seed).standard_normal(n))
+    close[list(nans)] = np.nan
+    return close
+
+
+def assert_same(actual, expected, rtol=1e-9):
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    assert (np.isnan(actual) == np.isnan(expected)).all()
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=1e-12, equal_nan=True)
+
+
+# Indicateurs prolongés depuis start == recalcul complet (dataviz.indicators)
+@pytest.mark.parametrize('nans', [(), (100,), (100, 101, 130), (79,), (0,), (399,)])
+@pytest.mark.parametrize('start', [1, 20, 80, 100, 101, 250])
+def test_incremental_indicators_match_compute(nans, start):
+    close = random_close(400, nans)
+    full = indicators.compute(close)
+    state = indicators.initial_state(close[:start], full['Cumulative_Return'].to_numpy()[:start])
+    # L'état passe par le JSON des métadonnées
+    state = json.loads(json.dumps(state))
+    incremental = indicators.update(close, start, state)
+    expected = full.iloc[start:].reset_index(drop=True)
+    for name in indicators.INDICATORS:
+        assert_same(incremental[name], expected[name])
+
+
+# Ajout de séances dont une clôture est vide : indicateurs du stockage == recalcul complet
+def test_store_indicators_after_append_with_blank_close(tmp_path):
+    header, *rows = SOURCE_CSV.read_text(encoding='utf-8').splitlines()
+    source = tmp_path / 'data'
+    source.mkdir()
+    csv = source / SOURCE_CSV.name
+    # Export le plus récent en tête : les 5 premières lignes sont ajoutées ensuite
+    csv.write_text('\n'.join([header] + rows[5:]) + '\n', encoding='utf-8')
+    store = PriceStore(tmp_path / 'store', source)
+    store.analysis_frame('BOUYGUES')
+
+    fields = rows[2].split(';')
+    fields[5] = ''
+    rows[2] = ';'.join(fields)
+    csv.write_text('\n'.join([header] + rows) + '\n', encoding='utf-8')
+    frame = store.analysis_frame('BOUYGUES')
+    assert frame['Close'].isna().sum() == 1
+    expected = indicators.compute(frame['Close'])
+    for name in indicators.INDICATORS:
+        assert_same(frame[name], expected[name])
+
+
+# Index de plages == Series.count / sum / mean / min / max / std (dataviz.range_stats)
+def test_range_stats_match_pandas():
+    from dataviz.range_stats import RangeStats
+    rng = np.random.default_rng(1)
+    n = 20_000
+    # Longue série en dérive, faible bruit : cas défavorable aux sommes préfixes de x²
+    drift = np.linspace(10, 1000, n) + rng.standard_normal(n) * 0.01
+    df = pd.DataFrame({'drift': drift, 'close': random_close(n, rng.integers(0, n, 300), seed=2)})
+    df.loc[5000:5600, 'close'] = np.nan
+    index = RangeStats(df, df.columns)
+    ranges = [(0, n), (n - 5, n), (n - 30, n), (5100, 5500), (4990, 5700), (7, 8)]
+    ranges += [tuple(sorted(rng.integers(0, n, 2))) for _ in range(100)]
+    for col in df.columns:
+        for lo, hi in ranges:
+            values = df[col].iloc[lo:hi]
+            for stat, rtol in [('count', 0), ('min', 0), ('max', 0), ('sum', 1e-13), ('mean', 1e-13), ('std', 1e-12)]:
+                assert_same([index.value(col, stat, lo, hi)], [getattr(values, stat)()], rtol)
+
+
+def _store_with_blank_cells(tmp_path, profile):
+    header, *rows = SOURCE_CSV.read_text(encoding='utf-8').splitlines()
+    for i, col in [(3, 5), (40, 5), (41, 2), (100, 6)]:
+        fields = rows[i].split(';')
+        fields[col] = ''
+        rows[i] = ';'.join(fields)
+    source = tmp_path / 'data'
+    source.mkdir()
+    (source / SOURCE_CSV.name).write_text('\n'.join([header] + rows) + '\n', encoding='utf-8')
+    return PriceStore(tmp_path / 'store', source, profile)
+
+
+# Tableaux de la page Statistiques et KPIs du tableau de bord (common.range_summary)
+# == réductions pandas sur les mêmes lignes, bit à bit
+@pytest.mark.parametrize('profile', ['full', 'compact'])
+def test_range_summary_matches_pandas_exactly(tmp_path, monkeypatch, profile):
+    import common
+    from dataviz.cache import shared_cache
+    store = _store_with_blank_cells(tmp_path, profile)
+    # Le cache partagé est propre au processus : pas de résultat d'un autre profil
+    shared_cache.clear()
+    monkeypatch.setattr(common, 'get_store', lambda: store)
+    df = store.open('BOUYGUES')
+    columns = ['Open', 'High', 'Low', 'Close', 'Number of Shares', 'Number of Trades', 'Turnover']
+    stats = ['count', 'sum', 'mean', 'min', 'max', 'std']
+    assert df[columns].isna().sum().sum() == 4
+    for lo, hi in [(0, len(df)), (10, 200), (39, 45), (150, 151)]:
+        result = common.range_summary('BOUYGUES', columns, lo, hi, stats)
+        rows = df[columns].iloc[lo:hi]
+        expected = pd.DataFrame({stat: getattr(rows, stat)() for stat in stats})
+        pd.testing.assert_frame_equal(result, expected, check_exact=True, check_dtype=False)
+
+
+# Moteur par blocs == pandas bit à bit, quelle que soit la taille des blocs
+@pytest.mark.parametrize('chunk_rows', [128, 1000, 1 << 20])
+def test_chunked_summary_matches_pandas_exactly(tmp_path, chunk_rows):
+    from dataviz import chunked, data
+    rng = np.random.default_rng(3)
+    n = 30_011
+    close = random_close(n, rng.integers(0, n, 500), seed=3)
+    df = pd.DataFrame({'Date': pd.date_range('2000-01-01', periods=n, freq='min'), 'Open': close,
+                       'High': close + 1, 'Low': close - 1, 'Last': close, 'Close': close,
+                       'Number of Shares': rng.integers(0, 10 ** 6, n).astype(float),
+                       'Number of Trades': rng.integers(0, 5000, n).astype(float),
+                       'Turnover': rng.random(n) * 1e7, 'vwap': close})
+    columns = ['Close', 'High', 'Number of Shares', 'Turnover']
+    stats = ['count', 'sum', 'mean', 'min', 'max', 'std']
+    for profile in ['full', 'compact']:
+        cache_dir = tmp_path / profile
+        data.write_frame(df, cache_dir, 'v', None, profile)
+        stored = data.read_columns(cache_dir)
+        for lo, hi in [(0, n), (n // 3, n - 17), (5, 5)]:
+            result = chunked.summary(cache_dir, columns, lo, hi, stats, chunk_rows)
+            rows = stored[columns].iloc[lo:hi]
+            expected = pd.DataFrame({stat: getattr(rows, stat)() for stat in stats})
+            pd.testing.assert_frame_equal(result, expected, check_exact=True, check_dtype=False)
+
+
+# Statistiques recomposées depuis les agrégats == moteur exact, à la tolérance
+# annoncée dans dataviz.rollups (1e-12 en float64, 1e-6 en float32)
+@pytest.mark.parametrize('profile, rtol', [('full', 1e-12), ('compact', 1e-6)])
+@pytest.mark.parametrize('freq', ['D', '5min'])
+def test_rollup_summary_within_tolerance(tmp_path, profile, rtol, freq):
+    from dataviz import chunked, data, rollups
+    rng = np.random.default_rng(11)
+    n = 3000 if freq == 'D' else 40_000
+    close = random_close(n, seed=11)
+    shares = rng.integers(0, 1000, n).astype(float)
+    shares[rng.random(n) < 0.2] = 0
+    turnover = shares * close
+    with np.errstate(invalid='ignore'):
+        # vwap intraday NaN sur les barres sans volume
+        vwap = turnover / np.where(shares > 0, shares, np.nan)
+    df = pd.DataFrame({'Date': pd.date_range('2001-01-01', periods=n, freq=freq), 'Open': close,
+                       'High': close + 1, 'Low': close - 1, 'Last': close, 'Close': close.copy(),
+                       'Number of Shares': shares, 'Number of Trades': np.ones(n),
+                       'Turnover': turnover, 'vwap': vwap})
+    df.loc[rng.integers(0, n, n // 30), 'Close'] = np.nan
+    # Plusieurs périodes entières sans valeur
+    df.loc[100:400, 'High'] = np.nan
+    meta = data.write_frame(df, tmp_path, 'v', None, profile)
+    rollups.sync_rollups(tmp_path, meta)
+    columns = ['Close', 'High', 'vwap', 'Number of Shares']
+    stats = ['count', 'sum', 'mean', 'min', 'max', 'std']
+    for lo, hi in [(0, n), (37, n - 59), (150, 350), (n // 3, n // 3 + 2000)]:
+        result = rollups.summary(tmp_path, columns, lo, hi, stats)
+        expected = chunked.summary(tmp_path, columns, lo, hi, stats)
+        for col in columns:
+            assert_same(result.loc[col], expected.loc[col], rtol)
+
+
+# Barres regroupées == groupby(...).agg de pandas (first / max / min / last / sum)
+def test_resample_ohlcv_matches_pandas():
+    from dataviz.downsample import bucket_starts, resample_ohlcv
+    rng = np.random.default_rng(4)
+    n = 10_007
+    close = random_close(n, rng.integers(0, n, 400), seed=4)
+    df = pd.DataFrame({'Date': pd.date_range('2000-01-01', periods=n), 'Open': np.roll(close, 1),
+                       'High': close + 1, 'Low': close - 1, 'Close': close,
+                       'Number of Shares': rng.integers(0, 1000, n).astype(float)})
+    df.loc[rng.integers(0, n, 200), ['Open', 'High', 'Low', 'Number of Shares']] = np.nan
+    # Un seau entier sans valeur
+    df.loc[21:45, ['Open', 'High', 'Low', 'Close']] = np.nan
+    bars = resample_ohlcv(df, 500)
+    bucket = np.repeat(np.arange(len(bucket_starts(n, 500))), np.diff(np.append(bucket_starts(n, 500), n)))
+    expected = df.groupby(bucket).agg({'Date': 'first', 'Open': 'first', 'High': 'max', 'Low': 'min',
+                                       'Close': 'last', 'Number of Shares': 'sum'})
+    for col in expected.columns:
+        if col == 'Date':
+            assert (bars[col].to_numpy() == expected[col].to_numpy()).all()
+        else:
+            assert_same(bars[col], expected[col], rtol=0)
+
+
+# Référence directe de LTTB (une boucle par seau, sans vectorisation)
+def _lttb_reference(x, y, n_out):
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = np.mean(x[nlo:nhi]), np.mean(y[nlo:nhi])
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(lo, hi)]
+        a = lo + int(np.argmax(areas))
+        out.append(a)
+    return np.array(out + [n - 1])
+
+
+def test_lttb_matches_reference():
+    from dataviz.downsample import decimate, lttb_indices
+    rng = np.random.default_rng(5)
+    x = np.arange(5000, dtype=np.float64)
+    y = np.cumsum(rng.standard_normal(5000))
+    idx = lttb_indices(x, y, 300)
+    assert idx[0] == 0 and idx[-1] == 4999 and (np.diff(idx) > 0).all()
+    np.testing.assert_array_equal(idx, _lttb_reference(x, y, 300))
+    # Les NaN sont écartés avant la décimation
+    y[100:400] = np.nan
+    xs, ys = decimate(x, y, 300)
+    assert len(ys) == 300 and not np.isnan(ys).any()
+
+
+# Extrema glissants par blocs (van Herk / Gil-Werman) == rolling().max() / min()
+# de pandas, valeurs manquantes ignorées, NaN tant que la fenêtre n'est pas pleine
+@pytest.mark.parametrize('nans', [(), (3, 4, 5, 6, 7), (95, 96, 97, 98, 99), tuple(range(10, 30))])
+@pytest.mark.parametrize('window', [1, 2, 5, 7, 20])
+def test_rolling_extrema_match_pandas(nans, window):
+    from dataviz.levels import rolling_max, rolling_min
+    x = random_close(100, nans)
+    for engine, method in ((rolling_max, 'max'), (rolling_min, 'min')):
+        expected = getattr(pd.Series(x).rolling(window, min_periods=1), method)().to_numpy().copy()
+        expected[:window - 1] = np.nan
+        assert_same(engine(x, window), expected, rtol=0)
+
+
+# Co-moments glissants (dataviz.correlation) == DataFrame.cov / corr de pandas sur
+# la fenêtre, observations complètes par paire ; mise à jour barre par barre
+# (retraits, recalculs périodiques) ou d'un bloc (reconstruction directe)
+@pytest.mark.parametrize('first', [1, 100])
+def test_rolling_comoments_match_pandas(first):
+    from dataviz.correlation import RollingComoments
+    rng = np.random.default_rng(1)
+    symbols = list('abcd')
+    window = 40
+    returns = rng.standard_normal((300, len(symbols))) * 0.01
+    returns[rng.random(returns.shape) < 0.15] = np.nan
+    returns[100:160, 2] = np.nan
+    dates = pd.date_range('2020-01-01', periods=len(returns)).to_numpy()
+    moments = RollingComoments(symbols, window)
+    for t in range(first, len(returns) + 1):
+        moments.update(dates[:t], returns[:t])
+        frame = pd.DataFrame(returns[max(0, t - window):t], columns=symbols)
+        assert_same(moments.cov(), frame.cov(min_periods=moments.min_periods))
+        assert_same(moments.corr(), frame.corr(min_periods=moments.min_periods))
+        assert_same(moments.counts(), frame.notna().astype(int).T @ frame.notna().astype(int), rtol=0)
+    # Historique corrigé dans la fenêtre : reconstruction
+    returns[-5, 0] = 0.5
+    moments.update(dates, returns)
+    frame = pd.DataFrame(returns[-window:], columns=symbols)
+    assert_same(moments.cov(), frame.cov(min_periods=moments.min_periods))